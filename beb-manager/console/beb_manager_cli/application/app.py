@@ -1,9 +1,8 @@
 import random
 import sys
+import time
 from datetime import datetime
-from typing import List, Optional
-
-import dateparser
+from typing import Dict, Iterable, List, Optional
 
 import beb_lib.model.exceptions as beb_exceptions
 import beb_lib.logger as beb_logger
@@ -11,11 +10,12 @@ from beb_lib.domain_entities.board import Board
 from beb_lib.domain_entities.card import Card
 from beb_lib.domain_entities.card_list import CardsList
 from beb_lib.domain_entities.supporting import AccessType, Priority
-from beb_lib.model.model import Model
 from beb_lib.provider_interfaces import RequestType
 
 import beb_manager_cli.application.config as config
 from beb_manager_cli.application.authorization_manager import AuthorizationManager
+from beb_manager_cli.application.formatters import TEXT_FORMAT, write_records, format_datetime
+from beb_manager_cli.application.session_state import SessionState
 from beb_manager_cli.application.working_board_manager import WorkingBoardManager
 from beb_manager_cli.storage.user import UserInstance
 from beb_manager_cli.storage.user_provider import UserProvider, UserDataRequest, UserProviderErrorCodes
@@ -25,7 +25,7 @@ def check_authorization(func):
     def wrapper(self, *args, **kwargs):
         if self.authorization_manager.get_current_user_id() is None:
             print('Authorize first!')
-            quit(1)
+            sys.exit(1)
         else:
             return func(self, *args, **kwargs)
 
@@ -36,7 +36,7 @@ def check_board(func):
     def wrapper(self, *args, **kwargs):
         if self.working_board_manager.get_current_board_id() is None:
             print('Switch to board first!')
-            quit(1)
+            sys.exit(1)
         else:
             return func(self, *args, **kwargs)
 
@@ -56,13 +56,52 @@ def bordered(text):
 class App:
 
     def __init__(self):
-        beb_logger.init_logging(config.LOG_LEVEL, config.LOG_FILE, config.LOG_FORMAT, config.LOG_DATEFMT)
-        self.lib_model = Model(config.LIB_DATABASE)
+        self._lib_model = None
+        self._user_provider = None
+        self._user_names = None
+        self._tag_names = None
+        # time.monotonic() of the last creation of cards by plans, None until the model is created
+        self.plans_triggered_at = None
+        self.resolve_names = True
+        self.output_format = TEXT_FORMAT
+        self.session_state = SessionState(config.CONFIG_FILE)
+        self.authorization_manager = AuthorizationManager(self.session_state)
+        self.working_board_manager = WorkingBoardManager(self.session_state)
+
+    @property
+    def lib_model(self):
+        """
+        Library model is created on first access, so commands that don't work with boards, lists, cards or tags
+        don't pay for logging setup, database opening and plan triggering
+        """
+        if self._lib_model is None:
+            from beb_lib.model.model import Model
+
+            beb_logger.init_logging(config.LOG_LEVEL, config.LOG_FILE, config.LOG_FORMAT, config.LOG_DATEFMT)
+            self._lib_model = Model(config.LIB_DATABASE)
+            self.trigger_plans()
+        return self._lib_model
+
+    def trigger_plans(self) -> None:
+        """
+        Creates cards by due plans. Creation of the model does it, so it's needed only by long-lived sessions
+        """
         self.lib_model.trigger_card_plan_creation()
-        self.user_provider = UserProvider(config.APP_DATABASE)
-        self.user_provider.open()
-        self.authorization_manager = AuthorizationManager(config.CONFIG_FILE)
-        self.working_board_manager = WorkingBoardManager(config.CONFIG_FILE)
+        self.plans_triggered_at = time.monotonic()
+
+    @property
+    def user_provider(self) -> UserProvider:
+        if self._user_provider is None:
+            self._user_provider = UserProvider(config.APP_DATABASE)
+            self._user_provider.open()
+        return self._user_provider
+
+    def reset_caches(self) -> None:
+        """
+        Drops user and tag names loaded for the previous command
+        """
+        self._user_names = None
+        self._tag_names = None
 
     def get_all_users(self) -> List[UserInstance]:
         request = UserDataRequest(request_id=random.randrange(1000000),
@@ -70,9 +109,21 @@ class App:
                                   name=None,
                                   request_type=RequestType.READ)
         result, error = self.user_provider.execute(request)
+        if error is not None:
+            return []
         users = sorted(result.users, key=lambda user: user.unique_id)
         return users
 
+    def _get_user_names(self) -> Dict[int, str]:
+        if self._user_names is None:
+            self._user_names = {user.unique_id: user.name for user in self.get_all_users()}
+        return self._user_names
+
+    def _get_tag_names(self) -> Dict[int, str]:
+        if self._tag_names is None:
+            self._tag_names = {tag.unique_id: tag.name for tag in self.lib_model.tag_read()}
+        return self._tag_names
+
     def get_user(self, user_id: Optional[int], name: Optional[str]) -> Optional[UserInstance]:
         request = UserDataRequest(request_id=random.randrange(1000000),
                                   id=user_id,
@@ -84,7 +135,7 @@ class App:
             if error.code == UserProviderErrorCodes.USER_DOES_NOT_EXIST:
                 return None
             print("Database error: {}".format(error.description), file=sys.stderr)
-            quit(error.code)
+            sys.exit(error.code)
 
         if not result.users:
             return None
@@ -100,7 +151,7 @@ class App:
 
         if result.users:
             print("This username have been already taken!", file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
         request = UserDataRequest(request_id=random.randrange(1000000),
                                   id=None,
@@ -110,14 +161,14 @@ class App:
 
         if result[1] is not None:
             print(result[1].description)
-            quit(1)
+            sys.exit(1)
 
     def logout_user(self):
         user_id = self.authorization_manager.get_current_user_id()
 
         if user_id is None:
             print("You were not logged in")
-            quit()
+            sys.exit()
 
         user = self.get_user(user_id, None)
 
@@ -137,7 +188,7 @@ class App:
 
         if user is None:
             print("User with provided credentials was not found", file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
         self.authorization_manager.login_user(user.unique_id)
         print("Successfully logged in as {}".format(user.name))
@@ -148,7 +199,7 @@ class App:
             self._print_users(users)
         else:
             print('There are no users')
-            quit()
+            sys.exit()
 
     @check_authorization
     def print_current_user(self) -> None:
@@ -163,7 +214,7 @@ class App:
         for user in users:
             print("UserID: {}   Name: {}".format(user.unique_id, user.name))
 
-    def _print_card(self, card: Card):
+    def _print_card(self, card: Card, child_names: Dict[int, str] = None):
         text = "CardID: {}   Name: {}".format(card.unique_id, card.name)
         if card.description is not None:
             text += "\nDescription: {}".format(card.description)
@@ -174,28 +225,31 @@ class App:
             priority = str(card.priority)
 
         text += ("\nPriority: " + priority)
-        user = self.get_user(card.user_id, None)
-        if user is not None:
-            text += "\nOwner: {} aka {}".format(card.user_id, self.get_user(card.user_id, None).name)
-        else:
-            text += "\nOwner: {}".format(card.user_id)
+        text += "\nOwner: {}".format(self._user_label(card.user_id))
         if card.assignee_id is not None:
-            assignee = self.get_user(card.assignee_id, None)
-            if assignee is not None:
-                text += "\nAssignee: {} aka {}".format(card.assignee_id,
-                                                       self.get_user(card.assignee_id, None).name)
-            else:
-                text += "\nAssignee: {}".format(card.assignee_id)
+            text += "\nAssignee: {}".format(self._user_label(card.assignee_id))
 
         if len(card.children) > 0:
-            text += "\nChildren cards: {}".format(card.children)
+            hidden = 0
+            if child_names is not None:
+                children = ["{} aka {}".format(child, child_names[child]) for child in card.children
+                            if child in child_names]
+                hidden = len(card.children) - len(children)
+            else:
+                children = card.children
+            if children:
+                text += "\nChildren cards: {}".format(children)
+            if hidden:
+                text += "\nChildren cards you can't read: {}".format(hidden)
 
         if len(card.tags) > 0:
-            try:
-                tags = [self.lib_model.tag_read(tag)[0].name for tag in card.tags]
+            if self.resolve_names:
+                tag_names = self._get_tag_names()
+                tags = [tag_names[tag] for tag in card.tags if tag in tag_names]
+            else:
+                tags = card.tags
+            if tags:
                 text += "\nTags: {}".format(tags)
-            except beb_exceptions.TagDoesNotExistError:
-                pass
 
         text += "\nCreated: {}".format(card.created.strftime("%c"))
         text += "\nModified: {}".format(card.last_modified.strftime("%c"))
@@ -206,11 +260,63 @@ class App:
             text += ("\n" + bordered(plan_text))
         print(bordered(text))
 
+    def _card_record(self, card: Card, list_id: Optional[int] = None) -> dict:
+        user_names = self._get_user_names() if self.resolve_names else {}
+        tag_names = self._get_tag_names() if self.resolve_names and card.tags else {}
+        plan = card.plan if card.plan is not None and not isinstance(card.plan, int) else None
+
+        return {
+            'id': card.unique_id,
+            'name': card.name,
+            'list_id': list_id if list_id is not None else card.list_id,
+            'description': card.description,
+            'priority': int(card.priority) if card.priority is not None else None,
+            'owner_id': card.user_id,
+            'owner': user_names.get(card.user_id),
+            'assignee_id': card.assignee_id,
+            'assignee': user_names.get(card.assignee_id),
+            'expiration_date': format_datetime(card.expiration_date),
+            'children': list(card.children),
+            'tag_ids': list(card.tags),
+            'tags': [tag_names[tag] for tag in card.tags if tag in tag_names] if self.resolve_names else None,
+            'created': format_datetime(card.created),
+            'modified': format_datetime(card.last_modified),
+            'plan_interval': plan.interval.total_seconds() if plan is not None else None,
+            'plan_last_created_at': format_datetime(plan.last_created_at) if plan is not None else None
+        }
+
+    def _output_cards(self, cards: Iterable[Card], empty_message: str = None, list_id: Optional[int] = None,
+                      child_names: Dict[int, str] = None) -> int:
+        """
+        Prints cards in the selected output format as they are yielded
+        :param child_names: Names of children cards by their ids, children that aren't there are only counted
+        :return: Number of printed cards
+        """
+        if self.output_format != TEXT_FORMAT:
+            return write_records((self._card_record(card, list_id) for card in cards), self.output_format)
+
+        count = 0
+        for card in cards:
+            self._print_card(card, child_names)
+            count += 1
+        if count == 0 and empty_message is not None:
+            print(empty_message)
+        return count
+
+    def _user_label(self, user_id: int) -> str:
+        name = self._get_user_names().get(user_id) if self.resolve_names else None
+        if name is not None:
+            return "{} aka {}".format(user_id, name)
+        return str(user_id)
+
     def _create_plan(self, repeat: str, start_at: str, card_id: int):
+        # dateparser takes a noticeable time to import, so only commands with plans load it
+        import dateparser
+
         parsed_time = dateparser.parse(repeat)
         if parsed_time is None:
             print("Error. Repeat time is incorrect", file=sys.stderr)
-            quit(1)
+            sys.exit(1)
         else:
             interval = datetime.now() - parsed_time
             last_created_at = datetime.now() - interval
@@ -232,7 +338,7 @@ class App:
             return self.lib_model.board_read(board_id, board_name, self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def _add_rights(self, permissions: str, user_id: int, obj_id: int, object_type: type):
         access_type = AccessType.NONE
@@ -254,8 +360,14 @@ class App:
 
         self.lib_model.remove_right(obj_id, object_type, user_id, access_type)
 
-    @staticmethod
-    def _print_boards(boards: List[Board]) -> None:
+    def _print_boards(self, boards: List[Board]) -> None:
+        if self.output_format != TEXT_FORMAT:
+            write_records(({'id': board.unique_id,
+                            'name': board.name,
+                            'lists': list(board.lists) if board.lists is not None else []}
+                           for board in boards), self.output_format)
+            return
+
         for board in boards:
             print("BoardID: {}   Name: {}".format(board.unique_id, board.name))
 
@@ -264,7 +376,7 @@ class App:
         board_id = self.working_board_manager.get_current_board_id()
         if board_id is None:
             print("You're not currently switched to any board")
-            quit()
+            sys.exit()
         else:
             self.print_board(board_id, None)
 
@@ -272,16 +384,23 @@ class App:
     def print_board(self, board_id: Optional[int], board_name: Optional[str]):
         boards = self._get_board(board_id, board_name)
 
+        if self.output_format != TEXT_FORMAT:
+            self._print_boards(boards)
+            return
+
         if len(boards) > 1:
             print("There are several board with this name:")
         for board in boards:
-            App._print_boards([board])
-            if len(board.lists) > 0:
+            self._print_boards([board])
+            # Only the numbers of the cards are printed, so they are counted without reading the cards
+            snapshot = self.lib_model.board_snapshot(board.unique_id,
+                                                     request_user_id=self.authorization_manager.get_current_user_id(),
+                                                     cards_limit=0)
+            if len(snapshot.lists) > 0:
                 print("\nLists in this board:")
-                card_lists = self.lib_model.list_read(board.unique_id,
-                                                      request_user_id=self.authorization_manager.get_current_user_id())
-                for card_list in card_lists:
-                    print("ListID: {}   Name: {}".format(card_list.unique_id, card_list.name))
+                for card_list in snapshot.lists:
+                    print("ListID: {}   Name: {}   Cards: {}".format(card_list.unique_id, card_list.name,
+                                                                     snapshot.card_count_of(card_list.unique_id)))
             else:
                 print("There are no lists in this board")
 
@@ -289,14 +408,14 @@ class App:
     def print_all_boards(self):
         try:
             boards = self.lib_model.board_read(request_user_id=self.authorization_manager.get_current_user_id())
-            if len(boards) > 0:
-                App._print_boards(boards)
+            if len(boards) > 0 or self.output_format != TEXT_FORMAT:
+                self._print_boards(boards)
             else:
                 print("There are no boards created.")
-                quit()
+                sys.exit()
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def add_board(self, board_name: str) -> None:
@@ -305,7 +424,7 @@ class App:
                                        request_user_id=self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def delete_board(self, board_id: int) -> None:
@@ -313,7 +432,7 @@ class App:
             self.lib_model.board_delete(board_id, None, self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def edit_board(self, board_id: int, new_name: str) -> None:
@@ -322,7 +441,7 @@ class App:
             self.lib_model.board_write(board.unique_id, new_name, self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def switch_board(self, board_id: int):
@@ -330,7 +449,7 @@ class App:
             self.lib_model.board_read(board_id, None, self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
         self.working_board_manager.switch_to_board(board_id)
 
@@ -342,29 +461,48 @@ class App:
 
     @check_board
     def print_all_lists(self):
-        self.print_current_board()
+        if self.output_format == TEXT_FORMAT:
+            self.print_current_board()
+            return
+
+        board_id = self.working_board_manager.get_current_board_id()
+        try:
+            card_lists = self.lib_model.list_read(board_id,
+                                                  request_user_id=self.authorization_manager.get_current_user_id())
+        except beb_exceptions.ListDoesNotExistError:
+            card_lists = []
+        except beb_exceptions.Error as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+
+        write_records(({'id': card_list.unique_id,
+                        'name': card_list.name,
+                        'board_id': board_id,
+                        'cards': list(card_list.cards) if card_list.cards is not None else []}
+                       for card_list in card_lists), self.output_format)
 
     @check_board
     @check_authorization
     def print_list(self, list_id: int, list_name: str):
-        card_lists = self.lib_model.list_read(None, list_id, list_name,
-                                              request_user_id=self.authorization_manager.get_current_user_id())
-        if len(card_lists) > 1:
-            print("There are several lists with this name:")
-        for card_list in card_lists:
-            print("ListID: {}   Name: {}".format(card_list.unique_id, card_list.name))
-            try:
-                cards = self.lib_model.card_read(list_id,
-                                                 request_user_id=self.authorization_manager.get_current_user_id())
+        user_id = self.authorization_manager.get_current_user_id()
+        try:
+            card_lists = self.lib_model.list_read(None, list_id, list_name, request_user_id=user_id)
 
-                if len(cards) > 0:
-                    for card in cards:
-                        self._print_card(card)
-                else:
-                    print("There are no cards in this list")
-            except beb_exceptions.Error as error:
-                print(error, file=sys.stderr)
-                quit(1)
+            if self.output_format != TEXT_FORMAT:
+                records = (self._card_record(card, card_list.unique_id) for card_list in card_lists
+                           for card in self.lib_model.card_stream(card_list.unique_id, request_user_id=user_id))
+                write_records(records, self.output_format)
+                return
+
+            if len(card_lists) > 1:
+                print("There are several lists with this name:")
+            for card_list in card_lists:
+                print("ListID: {}   Name: {}".format(card_list.unique_id, card_list.name))
+                self._output_cards(self.lib_model.card_stream(card_list.unique_id, request_user_id=user_id),
+                                   "There are no cards in this list")
+        except beb_exceptions.Error as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
 
     @check_board
     @check_authorization
@@ -375,7 +513,7 @@ class App:
                                       request_user_id=self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     @check_board
@@ -389,7 +527,7 @@ class App:
                                       self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     @check_board
@@ -398,7 +536,7 @@ class App:
             self.lib_model.list_delete(list_id, None, self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def add_list_rights(self, param: str, user_id: int, list_id: int):
         self._add_rights(param, user_id, list_id, CardsList)
@@ -409,41 +547,56 @@ class App:
     @check_authorization
     def print_card(self, card_id: Optional[int], card_name: Optional[str]):
         try:
-            cards = self.lib_model.card_read(None, card_id, card_name,
-                                             self.authorization_manager.get_current_user_id())
-            if len(cards) > 1:
-                print("There are several cards with this name:")
-            for card in cards:
-                self._print_card(card)
+            user_id = self.authorization_manager.get_current_user_id()
+            cards = self.lib_model.card_read(None, card_id, card_name, request_user_id=user_id)
+            child_names = None
+            if self.output_format == TEXT_FORMAT:
+                if len(cards) > 1:
+                    print("There are several cards with this name:")
+                if self.resolve_names:
+                    child_ids = [child for card in cards for child in card.children]
+                    child_names = {child.unique_id: child.name
+                                   for child in self.lib_model.card_read_many(child_ids, request_user_id=user_id)}
+            self._output_cards(cards, child_names=child_names)
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
+
+    def _stream_cards(self, list_id: Optional[int] = None, card_filter=None, empty_message: str = None) -> None:
+        user_id = self.authorization_manager.get_current_user_id()
+        try:
+            cards = self.lib_model.card_stream(list_id, request_user_id=user_id)
+            if card_filter is not None:
+                cards = (card for card in cards if card_filter(card, user_id))
+            self._output_cards(cards, empty_message)
+        except beb_exceptions.Error as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
 
     @check_authorization
     def print_created(self):
-        for card in self.lib_model.get_cards_owned_by_user(self.authorization_manager.get_current_user_id()):
-            self._print_card(card)
+        self._stream_cards(card_filter=lambda card, user_id: card.user_id == user_id,
+                           empty_message="There are no cards created by you")
 
     @check_authorization
     def print_assigned(self):
-        for card in self.lib_model.get_cards_assigned_user(self.authorization_manager.get_current_user_id()):
-            self._print_card(card)
+        self._stream_cards(card_filter=lambda card, user_id: card.assignee_id == user_id,
+                           empty_message="There are no cards assigned to you")
 
     @check_authorization
     def print_archived(self):
-        self.lib_model.get_archived_cards(self.authorization_manager.get_current_user_id())
+        self._stream_cards(self.lib_model.storage_provider.archived_list_id,
+                           empty_message="There are no archived cards")
 
     @check_authorization
     def print_readable_cards(self):
-        cards = self.lib_model.get_readable_cards(self.authorization_manager.get_current_user_id())
-        for card in cards:
-            self._print_card(card)
+        self._stream_cards(card_filter=lambda card, user_id: bool(card.access & AccessType.READ),
+                           empty_message="There are no cards you can read")
 
     @check_authorization
     def print_writable_cards(self):
-        cards = self.lib_model.get_writable_cards(self.authorization_manager.get_current_user_id())
-        for card in cards:
-            self._print_card(card)
+        self._stream_cards(card_filter=lambda card, user_id: bool(card.access & AccessType.WRITE),
+                           empty_message="There are no cards you can write")
 
     @check_authorization
     def add_card(self, name: str, list_id: int, list_name: str, description: str,
@@ -461,7 +614,7 @@ class App:
                 for card_list in card_lists:
                     print("ListID: {}".format(card_list.unique_id))
                 print("Please, specify one of these ListIDs")
-                quit()
+                sys.exit()
             else:
                 card_list = card_lists[0]
 
@@ -471,7 +624,7 @@ class App:
                     tag_ids = [self.lib_model.tag_read(tag_name=tag_name)[0].unique_id for tag_name in tags]
             except beb_exceptions.TagDoesNotExistError:
                 print('One of the tags does not exist', file=sys.stderr)
-                quit(1)
+                sys.exit(1)
 
             if children is not None:
                 try:
@@ -480,10 +633,10 @@ class App:
                                                  request_user_id=self.authorization_manager.get_current_user_id())
                 except beb_exceptions.CardDoesNotExistError:
                     print('One of the children cards does not exist', file=sys.stderr)
-                    quit(1)
+                    sys.exit(1)
                 except beb_exceptions.AccessDeniedError:
                     print("You can't read one of the children cards", file=sys.stderr)
-                    quit(1)
+                    sys.exit(1)
 
             card = Card(name=name,
                         description=description,
@@ -500,7 +653,7 @@ class App:
 
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def edit_card(self, card_id: int, name: str, list_id: int, list_name: str, description: str,
@@ -520,7 +673,7 @@ class App:
                     for card_list in card_lists:
                         print("ListID: {}".format(card_list.unique_id))
                     print("Please, specify one of these ListIDs")
-                    quit()
+                    sys.exit()
                 else:
                     card_list = card_lists[0].unique_id
 
@@ -537,10 +690,10 @@ class App:
                         card.tags.remove(tag)
             except beb_exceptions.TagDoesNotExistError:
                 print('One of the tags does not exist', file=sys.stderr)
-                quit(1)
+                sys.exit(1)
             except ValueError:
                 print('One of the tags is not in the card', file=sys.stderr)
-                quit(1)
+                sys.exit(1)
 
             try:
                 if add_children is not None:
@@ -553,13 +706,13 @@ class App:
                         card.children.remove(child)
             except beb_exceptions.CardDoesNotExistError:
                 print('One of the children cards does not exist', file=sys.stderr)
-                quit(1)
+                sys.exit(1)
             except beb_exceptions.AccessDeniedError:
                 print("You can't read one of the children cards", file=sys.stderr)
-                quit(1)
+                sys.exit(1)
             except ValueError:
                 print('One of the cards is not a child of this card', file=sys.stderr)
-                quit(1)
+                sys.exit(1)
 
             if name is not None:
                 card.name = name
@@ -579,7 +732,7 @@ class App:
 
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def delete_card(self, card_id: int):
@@ -588,7 +741,7 @@ class App:
                                        request_user_id=self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     @check_authorization
     def archive_card(self, card_id: int):
@@ -596,7 +749,7 @@ class App:
             self.lib_model.archive_card(card_id, request_user_id=self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def add_card_rights(self, param: str, user_id: int, card_id: int):
         self._add_rights(param, user_id, card_id, Card)
@@ -614,18 +767,18 @@ class App:
             self.lib_model.card_write(None, card, request_user_id=self.authorization_manager.get_current_user_id())
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def add_tag(self, name: str):
         try:
             self.lib_model.tag_read(tag_name=name)
             print("Tag already exists!", file=sys.stderr)
-            quit(1)
+            sys.exit(1)
         except beb_exceptions.TagDoesNotExistError:
             pass
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
         self.lib_model.tag_write(tag_name=name)
 
@@ -635,39 +788,39 @@ class App:
             self.lib_model.tag_write(tag_id=tag_id, tag_name=name)
         except beb_exceptions.TagDoesNotExistError:
             print("This tag doesn't exist", file=sys.stderr)
-            quit(1)
+            sys.exit(1)
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def delete_tag(self, tag_id: int):
         try:
             self.lib_model.tag_delete(tag_id)
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
 
     def show_all_tags(self):
         tags = self.lib_model.tag_read()
+        if self.output_format != TEXT_FORMAT:
+            write_records(({'id': tag.unique_id, 'name': tag.name, 'color': tag.color} for tag in tags),
+                          self.output_format)
+            return
+
         if tags:
             for tag in tags:
                 print("TagID: {}    Name: {}".format(tag.unique_id, tag.name))
         else:
             print("There are no tags created")
-            quit()
+            sys.exit()
 
     @check_authorization
     def print_cards_by_tag(self, tag_id: int, tag_name: str):
         try:
             tag = self.lib_model.tag_read(tag_id, tag_name)[0]
-            cards = self.lib_model.card_read(None, tag_id=tag.unique_id,
-                                             request_user_id=self.authorization_manager.get_current_user_id())
-            if cards:
-                for card in cards:
-                    self._print_card(card)
-            else:
-                print("There are no cards with this tag")
-                quit()
+            cards = self.lib_model.card_stream(None, tag_id=tag.unique_id,
+                                               request_user_id=self.authorization_manager.get_current_user_id())
+            self._output_cards(cards, "There are no cards with this tag")
         except beb_exceptions.Error as error:
             print(error, file=sys.stderr)
-            quit(1)
+            sys.exit(1)
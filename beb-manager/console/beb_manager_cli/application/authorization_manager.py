@@ -1,34 +1,22 @@
-import configparser
 from typing import Optional
 
+from beb_manager_cli.application.session_state import SessionState
+
 _LOGGED_USER_SECTION: str = 'LoggedUser'
 
 
 class AuthorizationManager:
 
-    def __init__(self, config_file):
-        self.config_file = config_file
-        self.config_parser = configparser.ConfigParser()
+    def __init__(self, session_state: SessionState):
+        self.session_state = session_state
 
     def login_user(self, user_id: int) -> None:
-        self.config_parser.read(self.config_file)
-        if not self.config_parser.has_section(_LOGGED_USER_SECTION):
-            self.config_parser.add_section(_LOGGED_USER_SECTION)
-        self.config_parser[_LOGGED_USER_SECTION]['unique_id'] = str(user_id)
-        with open(self.config_file, 'w') as configfile:
-            self.config_parser.write(configfile)
+        self.session_state.set(_LOGGED_USER_SECTION, 'unique_id', str(user_id))
 
     def logout_user(self) -> None:
-        self.config_parser.read(self.config_file)
-        self.config_parser[_LOGGED_USER_SECTION] = {}
-        with open(self.config_file, 'w') as configfile:
-            self.config_parser.write(configfile)
+        self.session_state.clear_section(_LOGGED_USER_SECTION)
 
     def get_current_user_id(self) -> Optional[int]:
-        try:
-            self.config_parser.read(self.config_file)
-            user_id = int(self.config_parser[_LOGGED_USER_SECTION]['unique_id'])
-        except KeyError:
-            return None
+        user_id = self.session_state.get(_LOGGED_USER_SECTION, 'unique_id')
 
-        return user_id
+        return int(user_id) if user_id is not None else None
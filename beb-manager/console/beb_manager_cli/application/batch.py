@@ -0,0 +1,93 @@
+"""This module provides execution of many CLI commands in one process"""
+
+from collections import namedtuple
+from typing import Iterable, List
+
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.dispatcher import run_line
+from beb_manager_cli.application.parser import CLIParser
+
+BatchResult = namedtuple('BatchResult', ['line_number', 'command', 'code'])
+
+COMMENT_PREFIX = '#'
+
+
+class _CommandFailed(Exception):
+
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+class _BatchAborted(Exception):
+    pass
+
+
+def run_batch(app: App, parser: CLIParser, lines: Iterable[str], keep_going: bool = False,
+              single_transaction: bool = False) -> (List[BatchResult], bool):
+    """
+    Executes commands one per line. Empty lines and lines starting with '#' are skipped
+    :param app: App instance all commands are executed against
+    :param parser: Parser of the commands grammar
+    :param lines: Commands without "beb-manager" prefix
+    :param keep_going: Continue with the next command when one fails, otherwise stop at the first failure
+    :param single_transaction: Execute all commands in one library database transaction. Failed command is rolled
+    back on its own when keep_going is set, otherwise the whole batch is rolled back
+    :return: Results of the executed commands and whether the changes were rolled back
+    """
+    results = []
+
+    if not single_transaction:
+        _run_commands(app, parser, lines, keep_going, results, in_transaction=False)
+        return results, False
+
+    try:
+        with app.lib_model.transaction():
+            _run_commands(app, parser, lines, keep_going, results, in_transaction=True)
+    except _BatchAborted:
+        return results, True
+
+    return results, False
+
+
+def print_summary(results: List[BatchResult], rolled_back: bool) -> None:
+    failed = [result for result in results if result.code != 0]
+
+    print("\nBatch summary:")
+    for result in results:
+        status = 'OK' if result.code == 0 else 'FAILED({})'.format(result.code)
+        print("Line {:<6} {:<11} {}".format(result.line_number, status, result.command))
+    print("Executed: {}   Succeeded: {}   Failed: {}".format(len(results), len(results) - len(failed), len(failed)))
+    if rolled_back:
+        print("All changes were rolled back")
+
+
+def _run_commands(app: App, parser: CLIParser, lines: Iterable[str], keep_going: bool,
+                  results: List[BatchResult], in_transaction: bool) -> None:
+    for line_number, line in enumerate(lines, 1):
+        command = line.strip()
+        if not command or command.startswith(COMMENT_PREFIX):
+            continue
+
+        if in_transaction:
+            code = _run_in_savepoint(app, parser, command)
+        else:
+            code = run_line(app, parser, command)
+        results.append(BatchResult(line_number=line_number, command=command, code=code))
+
+        if code != 0 and not keep_going:
+            if in_transaction:
+                raise _BatchAborted
+            return
+
+
+def _run_in_savepoint(app: App, parser: CLIParser, command: str) -> int:
+    try:
+        with app.lib_model.transaction():
+            code = run_line(app, parser, command)
+            if code != 0:
+                raise _CommandFailed(code)
+    except _CommandFailed as failure:
+        return failure.code
+
+    return code
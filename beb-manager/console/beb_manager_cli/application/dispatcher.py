@@ -0,0 +1,179 @@
+"""This module maps parsed command line arguments to App calls"""
+
+import shlex
+import sys
+
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.formatters import TEXT_FORMAT
+from beb_manager_cli.application.parser import CLIParser
+
+# Objects that start a session of their own and can't be run from inside another session
+SESSION_OBJECTS = ['shell', 'batch']
+
+
+def execute_command(app: App, args) -> None:
+    """
+    Executes one parsed command
+    :param app: App instance the command is executed against
+    :param args: Namespace returned by CLIParser.parse
+    """
+    app.reset_caches()
+    app.resolve_names = not getattr(args, 'no_resolve', False)
+    app.output_format = getattr(args, 'format', TEXT_FORMAT)
+
+    if args.object == 'user':
+        if args.command == 'current':
+            app.print_current_user()
+        elif args.command == 'add':
+            app.add_user(args.username)
+        elif args.command == 'login':
+            app.login_user(args.username, args.id)
+        elif args.command == 'logout':
+            app.logout_user()
+        elif args.command == 'all':
+            app.print_all_users()
+    elif args.object == 'board':
+        if args.command == 'show':
+            if args.all:
+                app.print_all_boards()
+            elif args.current:
+                app.print_current_board()
+            else:
+                app.print_board(args.id, args.name)
+        elif args.command == 'add':
+            app.add_board(args.name)
+        elif args.command == 'delete':
+            app.delete_board(args.id)
+        elif args.command == 'edit':
+            app.edit_board(args.id, args.name)
+        elif args.command == 'switch':
+            app.switch_board(args.id)
+        elif args.command == 'access':
+            mode = args.mode
+            if mode[0] == "+":
+                app.add_board_rights(mode[1:], args.user_id, args.board_id)
+            elif mode[0] == "~":
+                app.remove_board_rights(mode[1:], args.user_id, args.board_id)
+    elif args.object == 'list':
+        if args.command == 'show':
+            if args.all:
+                app.print_all_lists()
+            else:
+                app.print_list(args.id, args.name)
+        elif args.command == 'add':
+            app.add_list(args.name)
+        elif args.command == 'edit':
+            app.edit_list(args.id, args.name)
+        elif args.command == 'delete':
+            app.delete_list(args.id)
+        elif args.command == 'access':
+            mode = args.mode
+            if mode[0] == "+":
+                app.add_list_rights(mode[1:], args.user_id, args.list_id)
+            elif mode[0] == "~":
+                app.remove_list_rights(mode[1:], args.user_id, args.list_id)
+    elif args.object == 'card':
+        if args.command == 'show':
+            if args.id is not None:
+                app.print_card(args.id, None)
+            elif args.name is not None:
+                app.print_card(None, args.name)
+            elif args.created:
+                app.print_created()
+            elif args.assigned:
+                app.print_assigned()
+            elif args.archived:
+                app.print_archived()
+            elif args.can_read:
+                app.print_readable_cards()
+            elif args.can_write:
+                app.print_writable_cards()
+        elif args.command == 'add':
+            app.add_card(name=args.name,
+                         list_id=args.list_id,
+                         list_name=args.list_name,
+                         description=args.description,
+                         priority=args.priority,
+                         tags=args.tags,
+                         children=args.children,
+                         exp_date=args.expiration_date,
+                         repeat=args.repeat,
+                         start=args.start_repeat_at)
+        elif args.command == 'edit':
+            app.edit_card(card_id=args.card_id,
+                          name=args.name,
+                          list_id=args.list_id,
+                          list_name=args.list_name,
+                          description=args.description,
+                          priority=args.priority,
+                          add_tags=args.add_tags,
+                          remove_tags=args.remove_tags,
+                          add_children=args.add_children,
+                          remove_children=args.remove_children,
+                          exp_date=args.expiration_date,
+                          delete_plan=args.delete_plan,
+                          repeat=args.repeat,
+                          start=args.start_repeat_at)
+        elif args.command == 'delete':
+            app.delete_card(args.id)
+        elif args.command == 'archive':
+            app.archive_card(args.id)
+        elif args.command == 'assign':
+            app.assign_card(args.card_id, args.user_id)
+        elif args.command == 'access':
+            mode = args.mode
+            if mode[0] == "+":
+                app.add_card_rights(mode[1:], args.user_id, args.list_id)
+            elif mode[0] == "~":
+                app.remove_card_rights(mode[1:], args.user_id, args.list_id)
+    elif args.object == 'tag':
+        if args.command == 'show':
+            if args.all:
+                app.show_all_tags()
+            else:
+                app.print_cards_by_tag(args.id, args.name)
+        elif args.command == 'add':
+            app.add_tag(args.name)
+        elif args.command == 'edit':
+            app.edit_tag(args.id, args.name)
+        elif args.command == 'delete':
+            app.delete_tag(args.id)
+
+
+def run_line(app: App, parser: CLIParser, line: str) -> int:
+    """
+    Parses one line with the CLI grammar and executes it. Errors don't terminate the process, they are reported with
+    the exit code the standalone command would have, unexpected exceptions with 1
+    :return: Exit code of the command
+    """
+    try:
+        argv = shlex.split(line)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    if not argv:
+        return 0
+
+    try:
+        args = parser.parse(argv)
+        if args.object in SESSION_OBJECTS:
+            print("'{}' can't be used inside a session".format(args.object), file=sys.stderr)
+            return 2
+        execute_command(app, args)
+    except SystemExit as exit_error:
+        return _exit_code(exit_error.code)
+    except Exception as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
@@ -0,0 +1,86 @@
+"""This module provides machine-readable output of CLI listings"""
+
+import json
+import sys
+from typing import Iterable, Optional
+
+TEXT_FORMAT = 'text'
+JSON_FORMAT = 'json'
+NDJSON_FORMAT = 'ndjson'
+TSV_FORMAT = 'tsv'
+
+OUTPUT_FORMATS = [TEXT_FORMAT, JSON_FORMAT, NDJSON_FORMAT, TSV_FORMAT]
+
+
+def write_records(records: Iterable[dict], output_format: str, stream=None) -> int:
+    """
+    Writes records as soon as they are produced, nothing is buffered except the current record
+    :param records: Flat dictionaries. Values may be strings, numbers, None or lists of them
+    :param output_format: One of JSON_FORMAT, NDJSON_FORMAT or TSV_FORMAT
+    :param stream: File-like object, standard output by default
+    :return: Number of written records
+    """
+    stream = stream if stream is not None else sys.stdout
+    writer = _WRITERS[output_format]
+    return writer(records, stream)
+
+
+def _write_json(records: Iterable[dict], stream) -> int:
+    count = 0
+    stream.write('[')
+    for record in records:
+        stream.write(',\n' if count else '\n')
+        stream.write(json.dumps(record, ensure_ascii=False))
+        count += 1
+    stream.write('\n]\n' if count else ']\n')
+    stream.flush()
+    return count
+
+
+def _write_ndjson(records: Iterable[dict], stream) -> int:
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write('\n')
+        stream.flush()
+        count += 1
+    return count
+
+
+def _write_tsv(records: Iterable[dict], stream) -> int:
+    count = 0
+    fields = None
+    for record in records:
+        if fields is None:
+            fields = list(record)
+            stream.write('\t'.join(fields) + '\n')
+        stream.write('\t'.join(_tsv_value(record.get(field)) for field in fields) + '\n')
+        stream.flush()
+        count += 1
+    return count
+
+
+def _tsv_value(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        # Items are separated by ',', so commas inside them are escaped like tabs
+        return ','.join(_tsv_value(item).replace(',', '\\,') for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def format_datetime(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+_WRITERS = {
+    JSON_FORMAT: _write_json,
+    NDJSON_FORMAT: _write_ndjson,
+    TSV_FORMAT: _write_tsv
+}
@@ -1,6 +1,8 @@
 import argparse
 from datetime import datetime
 
+from beb_manager_cli.application.formatters import OUTPUT_FORMATS, TEXT_FORMAT
+
 
 class ValidateDateAction(argparse.Action):
     def __call__(self, parser, namespace, values, option_string=None):
@@ -46,6 +48,7 @@ class CLIParser:
                                                             metavar="<object>",
                                                             title="available objects are")
         self.object_subparsers.required = True
+        self.command_subparsers = {}
 
         self._add_all_parsers()
 
@@ -53,12 +56,24 @@ class CLIParser:
         args = self.parser.parse_args(args)
         return args
 
+    @staticmethod
+    def _add_no_resolve_argument(show_parser):
+        show_parser.add_argument('-nr', '--no_resolve', action='store_true',
+                                 help="print ids of users and tags without looking up their names")
+
+    @staticmethod
+    def _add_format_argument(show_parser):
+        show_parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default=TEXT_FORMAT,
+                                 help="output format. Cards are written as soon as they are read in all formats")
+
     def _add_all_parsers(self):
         self._add_user_parser()
         self._add_board_parser()
         self._add_list_parser()
         self._add_card_parser()
         self._add_tag_parser()
+        self._add_shell_parser()
+        self._add_batch_parser()
 
     def _add_card_parser(self):
         card_parser = self.object_subparsers.add_parser('card',
@@ -70,6 +85,7 @@ class CLIParser:
                                                      metavar="<command>",
                                                      title="commands that applicable to cards")
         card_subparsers.required = True
+        self.command_subparsers['card'] = card_subparsers
 
         cards_creation_parser = card_subparsers.add_parser('add', description='Add card', help='add card')
         cards_creation_list_group = cards_creation_parser.add_mutually_exclusive_group()
@@ -158,6 +174,8 @@ class CLIParser:
                                             action='store_true')
         parser_show_card_group.add_argument('-cw', '--can_write', help='show cards that user can write',
                                             action='store_true')
+        CLIParser._add_no_resolve_argument(card_show_parser)
+        CLIParser._add_format_argument(card_show_parser)
 
         card_assign_parser = card_subparsers.add_parser('assign', description='Assign card', help='assign card')
         card_assign_parser.add_argument('-cid', '--card_id', type=int,
@@ -183,6 +201,7 @@ class CLIParser:
                                                    metavar="<command>",
                                                    title="commands that applicable to tags")
         tag_subparsers.required = True
+        self.command_subparsers['tag'] = tag_subparsers
 
         parser_show_tag = tag_subparsers.add_parser('show',
                                                     description='Show tags', help='show tags')
@@ -192,6 +211,8 @@ class CLIParser:
         parser_show_tag_group.add_argument('-a', '--all', help='show all tags', action='store_true')
         parser_show_tag_group.add_argument('-i', '--id', type=int, help='show cards with this TagID')
         parser_show_tag_group.add_argument('-n', '--name', help='show cards with this tag name')
+        CLIParser._add_no_resolve_argument(parser_show_tag)
+        CLIParser._add_format_argument(parser_show_tag)
 
         parser_add_tag = tag_subparsers.add_parser('add', description='Add tag', help='add tag')
         parser_add_tag.add_argument('name', help='name of the tag')
@@ -214,6 +235,7 @@ class CLIParser:
                                                      metavar="<command>",
                                                      title="commands that applicable to users")
         user_subparsers.required = True
+        self.command_subparsers['user'] = user_subparsers
 
         user_subparsers.add_parser('current', description='Show current user', help='show current user')
 
@@ -244,6 +266,7 @@ class CLIParser:
                                                      metavar="<command>",
                                                      title="commands that applicable to lists")
         list_subparsers.required = True
+        self.command_subparsers['list'] = list_subparsers
 
         parser_show_list = list_subparsers.add_parser('show',
                                                       description='Show lists', help='show lists')
@@ -254,6 +277,8 @@ class CLIParser:
                                             action='store_true')
         parser_show_list_group.add_argument('-i', '--id', type=int, help='show lists with the particular id')
         parser_show_list_group.add_argument('-n', '--name', help='show lists with the particular name')
+        CLIParser._add_no_resolve_argument(parser_show_list)
+        CLIParser._add_format_argument(parser_show_list)
 
         parser_add_list = list_subparsers.add_parser('add', description='Add list', help='add list')
         parser_add_list.add_argument('name', help='name of the list')
@@ -281,6 +306,7 @@ class CLIParser:
                                                        metavar="<command>",
                                                        title="commands that applicable to boards")
         board_subparsers.required = True
+        self.command_subparsers['board'] = board_subparsers
 
         parser_show_board = board_subparsers.add_parser('show',
                                                         description='Show boards', help='show boards')
@@ -291,6 +317,7 @@ class CLIParser:
         parser_show_board_group.add_argument('-a', '--all', help='show all boards', action='store_true')
         parser_show_board_group.add_argument('-i', '--id', type=int, help='show board with the particular id')
         parser_show_board_group.add_argument('-n', '--name', help='show board with the particular name')
+        CLIParser._add_format_argument(parser_show_board)
 
         parser_add_board = board_subparsers.add_parser('add', description='Add board', help='add board')
         parser_add_board.add_argument('name', help='name of the board')
@@ -313,3 +340,27 @@ class CLIParser:
         parser_access_board.add_argument('-uid', '--user_id', help='the id of the user').required = True
         parser_access_board.add_argument('mode', metavar="\033[4mmode\033[0m", help='access mode (+rw, ~rw)',
                                          action=ValidateAccessModeAction)
+
+    def _add_shell_parser(self):
+        self.object_subparsers.add_parser('shell',
+                                          description='Start interactive session. Commands are typed without '
+                                                      '"beb-manager" prefix, e.g. "card show -i 1". Type "exit" or '
+                                                      'press Ctrl-D to leave',
+                                          help='Start interactive session that keeps the database open between '
+                                               'commands')
+
+    def _add_batch_parser(self):
+        batch_parser = self.object_subparsers.add_parser('batch',
+                                                         description='Execute commands from file, one per line. '
+                                                                     'Commands are written without "beb-manager" '
+                                                                     'prefix, empty lines and lines starting with '
+                                                                     '"#" are skipped',
+                                                         help='Execute many commands from file in one process')
+        batch_parser.add_argument('file', type=argparse.FileType('r'),
+                                  help='file with commands, "-" to read them from standard input')
+        batch_parser.add_argument('-k', '--keep_going', action='store_true',
+                                  help='continue with the next command when one fails (stops by default)')
+        batch_parser.add_argument('-t', '--transaction', action='store_true',
+                                  help='execute all commands in one transaction of the library database. Without '
+                                       '--keep_going the first failure rolls back the whole batch. Users are stored '
+                                       'separately and are not rolled back')
@@ -0,0 +1,65 @@
+import configparser
+import os
+import tempfile
+from typing import Optional
+
+
+class SessionState:
+    """
+    Keeps the config file parsed for the whole process. The file is parsed again only when its modification time
+    changes and is written atomically through a temporary file, so other processes never read it half-written
+    """
+
+    def __init__(self, config_file: str):
+        self.config_file = config_file
+        self._config_parser = configparser.ConfigParser()
+        self._modification_time = None
+
+    def get(self, section: str, key: str) -> Optional[str]:
+        self._reload_if_changed()
+        try:
+            return self._config_parser[section][key]
+        except KeyError:
+            return None
+
+    def set(self, section: str, key: str, value: str) -> None:
+        self._reload_if_changed()
+        if not self._config_parser.has_section(section):
+            self._config_parser.add_section(section)
+        self._config_parser[section][key] = value
+        self._write()
+
+    def clear_section(self, section: str) -> None:
+        self._reload_if_changed()
+        self._config_parser[section] = {}
+        self._write()
+
+    def _get_modification_time(self) -> Optional[int]:
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _reload_if_changed(self) -> None:
+        modification_time = self._get_modification_time()
+        if modification_time is not None and modification_time == self._modification_time:
+            return
+
+        config_parser = configparser.ConfigParser()
+        config_parser.read(self.config_file)
+        self._config_parser = config_parser
+        self._modification_time = modification_time
+
+    def _write(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as temp_file:
+                self._config_parser.write(temp_file)
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._modification_time = self._get_modification_time()
@@ -0,0 +1,178 @@
+"""This module provides interactive session that runs CLI commands against one long-lived App"""
+
+import os
+import shlex
+import sys
+import time
+from typing import List, Optional
+
+try:
+    import readline
+except ImportError:
+    # History and completion are unavailable on platforms without readline, the session itself still works
+    readline = None
+
+import beb_lib.model.exceptions as beb_exceptions
+
+import beb_manager_cli.application.config as config
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.dispatcher import run_line, SESSION_OBJECTS
+from beb_manager_cli.application.parser import CLIParser
+
+PROMPT = 'beb-manager> '
+EXIT_COMMANDS = ['exit', 'quit']
+HISTORY_LENGTH = 1000
+# Standalone commands create cards from due plans on every start, the session does it at most once per interval
+PLAN_TRIGGER_INTERVAL = 60
+
+_ID_OPTIONS = {
+    '-bid': 'board', '--board_id': 'board',
+    '-lid': 'list', '--list_id': 'list',
+    '-cid': 'card', '--card_id': 'card',
+    '-ac': 'card', '--add_children': 'card',
+    '-rc': 'card', '--remove_children': 'card',
+    '-uid': 'user', '--user_id': 'user',
+}
+
+_OBJECT_ID_OPTIONS = ['-i', '--id']
+
+_POSITIONAL_ID_COMMANDS = ['edit', 'delete', 'switch', 'archive']
+
+
+class Shell:
+    """
+    Reads commands line by line and executes them with the same grammar as `beb-manager` does. Database stays open
+    between commands, so every command costs only its own work
+    """
+
+    def __init__(self, app: App, parser: CLIParser, history_file: str = config.HISTORY_FILE):
+        self.app = app
+        self.parser = parser
+        self.history_file = history_file
+        self._id_cache = {}
+        self._matches = []
+
+    def run(self) -> None:
+        self._setup_readline()
+        try:
+            while True:
+                try:
+                    line = input(PROMPT)
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+
+                if line.strip() in EXIT_COMMANDS:
+                    break
+                self.execute(line)
+        finally:
+            self._save_history()
+
+    def execute(self, line: str) -> int:
+        """
+        :return: Exit code of the command
+        """
+        # Until the model is created plans aren't triggered, its creation triggers them
+        triggered_at = self.app.plans_triggered_at
+        if triggered_at is not None and time.monotonic() - triggered_at > PLAN_TRIGGER_INTERVAL:
+            self.app.trigger_plans()
+
+        code = run_line(self.app, self.parser, line)
+        self._id_cache.clear()
+        return code
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            self._matches = [candidate + ' ' for candidate in self._candidates(line, text)]
+        return self._matches[state] if state < len(self._matches) else None
+
+    def _candidates(self, line: str, text: str) -> List[str]:
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            return []
+        if text and words:
+            words = words[:-1]
+
+        if not words:
+            options = [name for name in self.parser.object_subparsers.choices if name not in SESSION_OBJECTS]
+            options += EXIT_COMMANDS
+        elif len(words) == 1:
+            subparsers = self.parser.command_subparsers.get(words[0])
+            options = list(subparsers.choices) if subparsers is not None else []
+        else:
+            options = self._ids(self._id_kind(words))
+
+        return sorted(option for option in options if option.startswith(text))
+
+    @staticmethod
+    def _id_kind(words: List[str]) -> Optional[str]:
+        previous = words[-1]
+        if previous in _ID_OPTIONS:
+            return _ID_OPTIONS[previous]
+        if previous in _OBJECT_ID_OPTIONS:
+            return words[0]
+        if len(words) == 2 and previous in _POSITIONAL_ID_COMMANDS:
+            return words[0]
+        if words[:2] == ['card', 'add'] and previous in ['-c', '--children']:
+            return 'card'
+        return None
+
+    def _ids(self, kind: Optional[str]) -> List[str]:
+        if kind is None:
+            return []
+        if kind not in self._id_cache:
+            try:
+                self._id_cache[kind] = [str(unique_id) for unique_id in self._load_ids(kind)]
+            except (beb_exceptions.Error, SystemExit):
+                self._id_cache[kind] = []
+        return self._id_cache[kind]
+
+    def _load_ids(self, kind: str) -> List[int]:
+        user_id = self.app.authorization_manager.get_current_user_id()
+        board_id = self.app.working_board_manager.get_current_board_id()
+        model = self.app.lib_model
+
+        if kind == 'board':
+            return [board.unique_id for board in model.board_read(request_user_id=user_id)]
+        elif kind == 'list' and board_id is not None:
+            return [card_list.unique_id for card_list in model.list_read(board_id, request_user_id=user_id)]
+        elif kind == 'card':
+            return [card.unique_id for card in model.card_read(None, board_id=board_id, request_user_id=user_id)]
+        elif kind == 'tag':
+            return [tag.unique_id for tag in model.tag_read()]
+        elif kind == 'user':
+            return [user.unique_id for user in self.app.get_all_users()]
+        return []
+
+    def _setup_readline(self) -> None:
+        if readline is None:
+            return
+
+        try:
+            readline.read_history_file(self.history_file)
+        except OSError:
+            pass
+        readline.set_history_length(HISTORY_LENGTH)
+        readline.set_completer(self.complete)
+        readline.set_completer_delims(' \t\n')
+        if readline.__doc__ is not None and 'libedit' in readline.__doc__:
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+
+    def _save_history(self) -> None:
+        if readline is None:
+            return
+
+        try:
+            directory = os.path.dirname(self.history_file)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            readline.write_history_file(self.history_file)
+        except OSError as error:
+            print("Can't save shell history: {}".format(error), file=sys.stderr)
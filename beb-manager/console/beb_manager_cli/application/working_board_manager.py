@@ -1,28 +1,19 @@
-import configparser
 from typing import Optional
 
+from beb_manager_cli.application.session_state import SessionState
+
 _WORKING_BOARD_KEY: str = 'WorkingBoard'
 
 
 class WorkingBoardManager:
 
-    def __init__(self, config_file):
-        self.config_file = config_file
-        self.config_parser = configparser.ConfigParser()
+    def __init__(self, session_state: SessionState):
+        self.session_state = session_state
 
     def switch_to_board(self, board_id: int) -> None:
-        self.config_parser.read(self.config_file)
-        if not self.config_parser.has_section(_WORKING_BOARD_KEY):
-            self.config_parser.add_section(_WORKING_BOARD_KEY)
-        self.config_parser[_WORKING_BOARD_KEY]['unique_id'] = str(board_id)
-        with open(self.config_file, 'w') as configfile:
-            self.config_parser.write(configfile)
+        self.session_state.set(_WORKING_BOARD_KEY, 'unique_id', str(board_id))
 
     def get_current_board_id(self) -> Optional[int]:
-        try:
-            self.config_parser.read(self.config_file)
-            user_id = self.config_parser[_WORKING_BOARD_KEY]['unique_id']
-        except KeyError:
-            return None
+        board_id = self.session_state.get(_WORKING_BOARD_KEY, 'unique_id')
 
-        return user_id
+        return int(board_id) if board_id is not None else None
@@ -8,7 +8,8 @@ setup(
     author_email="gleb_linnik@icloud.com",
     url='https://bitbucket.org/GLinnik/isp',
     install_requires=['peewee', 'beb_lib', 'dateparser'],
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests']),
+    test_suite='tests.run_tests',
     entry_points='''
     [console_scripts]
     beb-manager=beb_manager_cli.application.main:main'''
@@ -0,0 +1,95 @@
+import contextlib
+import datetime
+import io
+import json
+import unittest
+from unittest import mock
+
+from beb_lib.domain_entities.board import Board
+from beb_lib.domain_entities.board_snapshot import BoardSnapshot
+from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.card_list import CardsList
+from beb_lib.domain_entities.supporting import Priority
+from beb_lib.domain_entities.tag import Tag
+
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.dispatcher import run_line
+from beb_manager_cli.application.parser import CLIParser
+from beb_manager_cli.storage.user import UserInstance
+
+
+class NameResolutionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = App()
+        self.app.authorization_manager = mock.Mock()
+        self.app.authorization_manager.get_current_user_id.return_value = 1
+        self.app._lib_model = mock.Mock()
+        self.app._lib_model.tag_read.return_value = [Tag('urgent', 1), Tag('home', 2)]
+
+        now = datetime.datetime.now()
+        self.app._lib_model.card_stream.side_effect = lambda *args, **kwargs: iter([
+            Card('Card {}'.format(i), i, 1, 2, priority=Priority.MEDIUM, children=[], tags=[1, 2], created=now,
+                 last_modified=now) for i in range(5)])
+
+        patcher = mock.patch.object(App, 'get_all_users',
+                                    return_value=[UserInstance('owner', 1), UserInstance('assignee', 2)])
+        self.get_all_users = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.parser = CLIParser()
+
+    def run_line(self, line: str) -> str:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(run_line(self.app, self.parser, line), 0)
+        return stdout.getvalue()
+
+    def test_names_are_read_once_per_command(self):
+        output = self.run_line('card show --created')
+
+        self.assertEqual(output.count('owner'), 5)
+        self.assertEqual(output.count('urgent'), 5)
+        self.get_all_users.assert_called_once_with()
+        self.app._lib_model.tag_read.assert_called_once_with()
+
+        records = [json.loads(line) for line in self.run_line('card show --created --format ndjson').splitlines()]
+
+        self.assertEqual({(record['owner'], record['assignee']) for record in records}, {('owner', 'assignee')})
+        self.assertEqual({tuple(record['tags']) for record in records}, {('urgent', 'home')})
+        self.assertEqual(self.get_all_users.call_count, 2)
+        self.assertEqual(self.app._lib_model.tag_read.call_count, 2)
+
+    def test_no_resolve(self):
+        output = self.run_line('card show --created --no_resolve')
+        records = [json.loads(line) for line in
+                   self.run_line('card show --created --no_resolve --format ndjson').splitlines()]
+
+        self.assertEqual(output.count('CardID'), 5)
+        self.assertNotIn('owner', output)
+        self.assertEqual(len(records), 5)
+        self.assertIsNone(records[0]['owner'])
+        self.assertIsNone(records[0]['tags'])
+        self.get_all_users.assert_not_called()
+        self.app._lib_model.tag_read.assert_not_called()
+
+    def test_unreadable_children_are_counted(self):
+        now = datetime.datetime.now()
+        self.app._lib_model.card_read.return_value = [Card('Parent', 1, 1, children=[10, 11, 12], tags=[],
+                                                           created=now, last_modified=now)]
+        self.app._lib_model.card_read_many.return_value = [Card('Child', 10)]
+
+        output = self.run_line('card show --id 1')
+
+        self.assertIn("Children cards: ['10 aka Child']", output)
+        self.assertIn("Children cards you can't read: 2", output)
+
+    def test_board_lists_count_cards(self):
+        self.app._lib_model.board_read.return_value = [Board('Board', 1, lists=[1])]
+        self.app._lib_model.board_snapshot.return_value = BoardSnapshot(Board('Board', 1, lists=[1]),
+                                                                        [CardsList('List', 1)], {1: []}, [],
+                                                                        card_counts={1: 7})
+
+        output = self.run_line('board show --id 1')
+
+        self.assertIn('Cards: 7', output)
+        self.app._lib_model.board_snapshot.assert_called_once_with(1, request_user_id=1, cards_limit=0)
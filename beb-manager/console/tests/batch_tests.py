@@ -0,0 +1,115 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import beb_lib.model.exceptions as beb_exceptions
+from beb_lib.model.model import Model
+
+from beb_manager_cli.application import main as main_module
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.batch import run_batch, print_summary
+from beb_manager_cli.application.parser import CLIParser
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = App()
+        self.app.authorization_manager = mock.Mock()
+        self.app.authorization_manager.get_current_user_id.return_value = 1
+        self.app._lib_model = Model(os.path.join(self.directory.name, 'beb.sqlite3'))
+        self.parser = CLIParser()
+
+    def tearDown(self):
+        self.app._lib_model.storage_provider.close()
+        self.directory.cleanup()
+
+    def run_batch(self, lines: list, keep_going: bool = False, single_transaction: bool = False):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return run_batch(self.app, self.parser, lines, keep_going, single_transaction)
+
+    def board_names(self) -> list:
+        try:
+            return sorted(board.name for board in self.app.lib_model.board_read(request_user_id=1))
+        except beb_exceptions.Error:
+            return []
+
+    def partly_failing_delete(self, board_id: int, *args) -> None:
+        """
+        Replaces App.delete_board with a command that writes before it fails
+        """
+        self.app.lib_model.board_write(board_name='Partial', request_user_id=1)
+        sys.exit(1)
+
+    def test_stop_at_first_failure(self):
+        results, rolled_back = self.run_batch(['board add A', 'board unknown', 'board add B'])
+
+        self.assertEqual([(result.line_number, result.code) for result in results], [(1, 0), (2, 2)])
+        self.assertFalse(rolled_back)
+        self.assertEqual(self.board_names(), ['A'])
+
+    def test_keep_going(self):
+        results, rolled_back = self.run_batch(['board add A', 'board unknown', 'board add B'], keep_going=True)
+
+        self.assertEqual([result.code for result in results], [0, 2, 0])
+        self.assertFalse(rolled_back)
+        self.assertEqual(self.board_names(), ['A', 'B'])
+
+    def test_transaction_rolls_back_whole_batch(self):
+        results, rolled_back = self.run_batch(['board add A', 'board unknown', 'board add B'],
+                                              single_transaction=True)
+
+        self.assertEqual([result.code for result in results], [0, 2])
+        self.assertTrue(rolled_back)
+        self.assertEqual(self.board_names(), [])
+
+    def test_transaction_rolls_back_failed_command(self):
+        with mock.patch.object(self.app, 'delete_board', self.partly_failing_delete):
+            results, rolled_back = self.run_batch(['board add A', 'board delete 1', 'board add B'],
+                                                  keep_going=True, single_transaction=True)
+
+        self.assertEqual([result.code for result in results], [0, 1, 0])
+        self.assertFalse(rolled_back)
+        self.assertEqual(self.board_names(), ['A', 'B'])
+
+    def test_comments_and_empty_lines(self):
+        results, _ = self.run_batch(['# boards', '', '   ', 'board add A', '  # done'])
+
+        self.assertEqual([(result.line_number, result.command) for result in results], [(4, 'board add A')])
+
+    def test_summary(self):
+        results, rolled_back = self.run_batch(['board add A', 'board unknown', 'board add B'],
+                                              keep_going=True, single_transaction=True)
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            print_summary(results, rolled_back)
+
+        self.assertIn('Executed: 3   Succeeded: 2   Failed: 1', stdout.getvalue())
+        self.assertIn('FAILED(2)', stdout.getvalue())
+        self.assertNotIn('rolled back', stdout.getvalue())
+
+    def run_main(self, lines: list) -> int:
+        batch_file = os.path.join(self.directory.name, 'commands.txt')
+        with open(batch_file, 'w') as file:
+            file.write('\n'.join(lines))
+
+        with mock.patch.object(main_module, 'App', return_value=self.app), \
+                mock.patch.object(main_module.config, 'APP_DATA_DIRECTORY', self.directory.name), \
+                mock.patch.object(sys, 'argv', ['beb-manager', 'batch', batch_file, '--transaction']), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                main_module.main()
+            except SystemExit as exit_error:
+                return exit_error.code
+        return 0
+
+    def test_exit_code(self):
+        self.assertEqual(self.run_main(['board add A']), 0)
+        self.assertEqual(self.run_main(['board add B', 'board unknown']), 1)
+        self.assertEqual(self.board_names(), ['A'])
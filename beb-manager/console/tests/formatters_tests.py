@@ -0,0 +1,54 @@
+import io
+import json
+import unittest
+
+from beb_manager_cli.application.formatters import JSON_FORMAT, NDJSON_FORMAT, TSV_FORMAT, write_records
+
+
+class FormattersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'id': 1, 'name': 'first', 'tags': ['a', 'b']},
+                        {'id': 2, 'name': 'tab\there', 'tags': []}]
+
+    def test_json(self):
+        stream = io.StringIO()
+
+        self.assertEqual(write_records(iter(self.records), JSON_FORMAT, stream), 2)
+        self.assertEqual(json.loads(stream.getvalue()), self.records)
+
+    def test_json_empty(self):
+        stream = io.StringIO()
+
+        self.assertEqual(write_records(iter([]), JSON_FORMAT, stream), 0)
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+    def test_ndjson(self):
+        stream = io.StringIO()
+
+        write_records(iter(self.records), NDJSON_FORMAT, stream)
+        self.assertEqual([json.loads(line) for line in stream.getvalue().splitlines()], self.records)
+
+    def test_tsv(self):
+        stream = io.StringIO()
+
+        write_records(iter(self.records), TSV_FORMAT, stream)
+        self.assertEqual(stream.getvalue().splitlines(), ['id\tname\ttags',
+                                                          '1\tfirst\ta,b',
+                                                          '2\ttab\\there\t'])
+
+    def test_tsv_list_with_commas(self):
+        stream = io.StringIO()
+
+        write_records(iter([{'tags': ['a,b', 'c\\d']}]), TSV_FORMAT, stream)
+        self.assertEqual(stream.getvalue().splitlines(), ['tags', 'a\\,b,c\\\\d'])
+
+    def test_records_are_written_as_produced(self):
+        stream = io.StringIO()
+
+        def records():
+            yield self.records[0]
+            self.assertEqual(len(stream.getvalue().splitlines()), 1)
+            yield self.records[1]
+
+        write_records(records(), NDJSON_FORMAT, stream)
@@ -0,0 +1,23 @@
+import unittest
+
+
+def run_tests():
+    test_modules = [
+        'tests.app_tests',
+        'tests.batch_tests',
+        'tests.formatters_tests',
+        'tests.session_state_tests',
+        'tests.shell_tests',
+        'tests.startup_tests'
+    ]
+
+    suite = unittest.TestSuite()
+
+    for t in test_modules:
+        suite.addTests(unittest.defaultTestLoader.loadTestsFromName(t))
+
+    unittest.TextTestRunner().run(suite)
+
+
+if __name__ == "tests.run_tests":
+    run_tests()
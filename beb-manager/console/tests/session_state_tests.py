@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from beb_manager_cli.application.session_state import SessionState
+
+
+class SessionStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.directory.name, 'config.ini')
+        self.session_state = SessionState(self.config_file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_missing_value(self):
+        self.assertIsNone(self.session_state.get('LoggedUser', 'unique_id'))
+
+    def test_set_and_get(self):
+        self.session_state.set('LoggedUser', 'unique_id', '7')
+
+        self.assertEqual(self.session_state.get('LoggedUser', 'unique_id'), '7')
+        self.assertEqual(SessionState(self.config_file).get('LoggedUser', 'unique_id'), '7')
+
+    def test_file_is_parsed_once(self):
+        self.session_state.set('LoggedUser', 'unique_id', '7')
+
+        with mock.patch('configparser.ConfigParser.read') as read:
+            for _ in range(10):
+                self.session_state.get('LoggedUser', 'unique_id')
+
+        read.assert_not_called()
+
+    def test_reload_after_external_change(self):
+        self.session_state.set('LoggedUser', 'unique_id', '7')
+
+        other_state = SessionState(self.config_file)
+        other_state.set('LoggedUser', 'unique_id', '8')
+        stat = os.stat(self.config_file)
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        self.assertEqual(self.session_state.get('LoggedUser', 'unique_id'), '8')
+
+    def test_clear_section(self):
+        self.session_state.set('LoggedUser', 'unique_id', '7')
+        self.session_state.set('WorkingBoard', 'unique_id', '3')
+
+        self.session_state.clear_section('LoggedUser')
+
+        self.assertIsNone(self.session_state.get('LoggedUser', 'unique_id'))
+        self.assertEqual(self.session_state.get('WorkingBoard', 'unique_id'), '3')
+
+    def test_write_leaves_no_temporary_files(self):
+        self.session_state.set('LoggedUser', 'unique_id', '7')
+        self.session_state.set('WorkingBoard', 'unique_id', '3')
+
+        self.assertEqual(os.listdir(self.directory.name), ['config.ini'])
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from beb_manager_cli.application.app import App
+from beb_manager_cli.application.dispatcher import run_line
+from beb_manager_cli.application.parser import CLIParser
+from beb_manager_cli.application.shell import Shell, PLAN_TRIGGER_INTERVAL
+
+
+class ShellTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = mock.Mock(spec=App)
+        self.app.print_current_user.side_effect = RuntimeError('database is locked')
+        self.app.plans_triggered_at = None
+        self.parser = CLIParser()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_failing_command(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = run_line(self.app, self.parser, 'user current')
+
+        self.assertEqual(code, 1)
+        self.assertIn('database is locked', stderr.getvalue())
+
+    def test_session_survives_failing_command(self):
+        shell = Shell(self.app, self.parser, os.path.join(self.directory.name, 'history'))
+        lines = ['user current', 'user all', EOFError()]
+
+        stderr = io.StringIO()
+        with mock.patch('beb_manager_cli.application.shell.readline', None), \
+                mock.patch('builtins.input', side_effect=lines), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            shell.run()
+
+        self.assertIn('database is locked', stderr.getvalue())
+        self.app.print_all_users.assert_called_once_with()
+
+    def test_plans_triggered_by_model_creation(self):
+        app = App()
+        with mock.patch('beb_lib.model.model.Model') as model, mock.patch('beb_lib.logger.init_logging'):
+            app.lib_model
+            app.lib_model
+
+        model.return_value.trigger_card_plan_creation.assert_called_once_with()
+        self.assertIsNotNone(app.plans_triggered_at)
+
+    def test_plans_triggered_after_interval(self):
+        shell = Shell(self.app, self.parser, os.path.join(self.directory.name, 'history'))
+
+        shell.execute('')
+        self.app.plans_triggered_at = time.monotonic()
+        shell.execute('')
+        self.app.trigger_plans.assert_not_called()
+
+        self.app.plans_triggered_at -= PLAN_TRIGGER_INTERVAL + 1
+        shell.execute('')
+        self.app.trigger_plans.assert_called_once_with()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+# Wall time in seconds that `beb-manager user current` may take, including interpreter start
+STARTUP_BUDGET = float(os.environ.get('BEB_STARTUP_BUDGET', '0.6'))
+
+HEAVY_MODULES = ['dateparser', 'beb_lib.model.model', 'beb_lib.storage.provider']
+
+_PROBE_SCRIPT = """
+import sys
+from beb_manager_cli.application.main import main
+
+sys.argv = ['beb-manager'] + sys.argv[1:]
+try:
+    main()
+except SystemExit:
+    pass
+print('LOADED:' + ','.join(name for name in {modules} if name in sys.modules))
+"""
+
+
+class StartupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ, HOME=self.home.name)
+
+    def tearDown(self):
+        self.home.cleanup()
+
+    def run_cli(self, *args) -> (float, list):
+        script = _PROBE_SCRIPT.format(modules=HEAVY_MODULES)
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', script] + list(args),
+                                env=self.env,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL,
+                                universal_newlines=True).stdout
+        elapsed = time.perf_counter() - started
+
+        loaded_line = [line for line in output.splitlines() if line.startswith('LOADED:')][-1]
+        loaded = [name for name in loaded_line[len('LOADED:'):].split(',') if name]
+        return elapsed, loaded
+
+    def test_user_current_skips_heavy_imports(self):
+        _, loaded = self.run_cli('user', 'current')
+
+        self.assertEqual(loaded, [])
+
+    def test_user_current_startup_budget(self):
+        self.run_cli('user', 'current')
+        elapsed = min(self.run_cli('user', 'current')[0] for _ in range(3))
+
+        self.assertLess(elapsed, STARTUP_BUDGET,
+                        "'user current' took {:.3f}s, budget is {:.3f}s".format(elapsed, STARTUP_BUDGET))
+
+    def test_card_commands_load_model(self):
+        _, loaded = self.run_cli('tag', 'show', '-a')
+
+        self.assertIn('beb_lib.model.model', loaded)
+        self.assertNotIn('dateparser', loaded)
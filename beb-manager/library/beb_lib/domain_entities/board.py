@@ -1,6 +1,7 @@
 from typing import List
 
 from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.domain_entities.unique_object import UniqueObject
 
 
@@ -13,15 +14,18 @@ class Board(UniqueObject):
     def __init__(self,
                  name: str,
                  unique_id: int = None,
-                 lists: List[int] = None):
+                 lists: List[int] = None,
+                 access: AccessType = None):
         """
 
         :param name: Name of the list
         :param unique_id: Unique identifier of card. If None is passed a new UUID would be generated
         :param lists: Unique lists
+        :param access: Effective access of the user who has read the board. None if the board wasn't read from storage
         """
         super(Board, self).__init__(name, unique_id)
         self._lists = lists
+        self.access = access
 
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional
+
+from beb_lib.domain_entities.board import Board
+from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.card_list import CardsList
+from beb_lib.domain_entities.tag import Tag
+
+
+class BoardSnapshot:
+    """
+    Everything that is needed to show a whole board, read at once
+    """
+
+    def __init__(self,
+                 board: Board,
+                 lists: List[CardsList],
+                 cards: Dict[int, List[Card]],
+                 tags: Dict[int, Tag],
+                 next_cursors: Optional[Dict[int, str]] = None,
+                 card_counts: Optional[Dict[int, int]] = None):
+        """
+
+        :param board: The board itself
+        :param lists: Lists of the board the user can read
+        :param cards: Cards the user can read by the id of their list, ordered as card_read orders them
+        :param tags: All tags by their ids. Cards refer to them by id
+        :param next_cursors: Cursors of the next pages by list id for lists that have more cards than the snapshot has
+        read, see Model.card_page
+        :param card_counts: Number of all cards the user can read by list id, including the ones that weren't read
+        """
+        self.board = board
+        self.lists = lists
+        self.cards = cards
+        self.tags = tags
+        self.next_cursors = next_cursors if next_cursors is not None else {}
+        self.card_counts = card_counts if card_counts is not None else {}
+
+    def cards_of(self, list_id: int) -> List[Card]:
+        return self.cards.get(list_id, [])
+
+    def next_cursor_of(self, list_id: int) -> Optional[str]:
+        return self.next_cursors.get(list_id)
+
+    def card_count_of(self, list_id: int) -> int:
+        return self.card_counts.get(list_id, len(self.cards_of(list_id)))
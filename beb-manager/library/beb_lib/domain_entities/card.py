@@ -1,6 +1,7 @@
 import datetime
 from typing import List
 
+from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.domain_entities.unique_object import UniqueObject
 
 
@@ -21,7 +22,9 @@ class Card(UniqueObject):
                  tags: List[int] = None,
                  created: datetime = None,
                  last_modified: datetime = None,
-                 plan: int = None
+                 plan: int = None,
+                 access: AccessType = None,
+                 list_id: int = None
                  ):
         """
 
@@ -38,6 +41,8 @@ class Card(UniqueObject):
         :param created: Date when the task was created
         :param last_modified: Date when the task was last edited
         :param plan: The id of plan instance that is used to create periodic tasks
+        :param access: Effective access of the user who has read the card. None if the card wasn't read from storage
+        :param list_id: The id of the list the card is in. None if the card wasn't read from storage
         """
         super(Card, self).__init__(name, unique_id)
         self.user_id = user_id
@@ -50,6 +55,8 @@ class Card(UniqueObject):
         self.created = created
         self.last_modified = last_modified
         self.plan = plan
+        self.access = access
+        self.list_id = list_id
 
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
@@ -1,6 +1,7 @@
 from typing import List
 
 from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.domain_entities.unique_object import UniqueObject
 
 
@@ -13,15 +14,18 @@ class CardsList(UniqueObject):
     def __init__(self,
                  name: str,
                  unique_id: int = None,
-                 cards: List[int] = None):
+                 cards: List[int] = None,
+                 access: AccessType = None):
         """
 
         :param name: Name of the list
         :param unique_id: Unique identifier of card. If None is passed a new UUID would be generated
         :param cards: Unique cards
+        :param access: Effective access of the user who has read the list. None if the list wasn't read from storage
         """
         super(CardsList, self).__init__(name, unique_id)
         self._cards = cards
+        self.access = access
 
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
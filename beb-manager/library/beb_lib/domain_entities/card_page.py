@@ -0,0 +1,20 @@
+from typing import List, Optional
+
+from beb_lib.domain_entities.card import Card
+
+
+class CardPage:
+    """
+    Part of the cards of a list. Pages are requested one after another with the cursor of the previous page
+    """
+
+    def __init__(self,
+                 cards: List[Card],
+                 next_cursor: Optional[str] = None):
+        """
+
+        :param cards: Cards the user can read, ordered as card_read orders them
+        :param next_cursor: Pass it to get the next page. None if there are no more cards
+        """
+        self.cards = cards
+        self.next_cursor = next_cursor
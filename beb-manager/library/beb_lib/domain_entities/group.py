@@ -0,0 +1,29 @@
+from typing import List
+
+from beb_lib.domain_entities.unique_object import UniqueObject
+
+
+class Group(UniqueObject):
+    """
+    Named set of users. Access given to a group is given to every its member unless the member has own access
+    """
+
+    def __init__(self,
+                 name: str,
+                 unique_id: int = None,
+                 user_ids: List[int] = None):
+        """
+
+        :param name: Name of the group
+        :param unique_id: Unique identifier of the group. If None is passed a new UUID would be generated
+        :param user_ids: The ids of the members
+        """
+        super(Group, self).__init__(name, unique_id)
+        self._user_ids = user_ids
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+    @property
+    def user_ids(self):
+        return self._user_ids
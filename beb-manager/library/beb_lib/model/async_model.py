@@ -0,0 +1,223 @@
+"""
+This module provides asyncio interface to the library
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from beb_lib.model.model import Model
+
+# Methods of Model that only read, they run concurrently. All other public methods are writes and run one by one
+READ_METHODS = frozenset(['ping',
+                          'get_right',
+                          'get_rights_matrix',
+                          'board_read',
+                          'board_snapshot',
+                          'board_version',
+                          'card_board_versions',
+                          'boards_of',
+                          'list_read',
+                          'card_read',
+                          'card_read_many',
+                          'card_page',
+                          'card_search',
+                          'tag_read',
+                          'tag_search',
+                          'group_read',
+                          'plan_read',
+                          'get_cards_in_board',
+                          'get_list_of_card',
+                          'get_cards_owned_by_user',
+                          'get_cards_assigned_user',
+                          'get_archived_cards',
+                          'get_readable_cards',
+                          'get_writable_cards'])
+
+# Methods of Model that AsyncModel implements on its own instead of mirroring
+_OWN_METHODS = frozenset(['transaction', 'memoized_reads', 'card_stream', 'disconnect'])
+
+STREAM_CHUNK_SIZE = 100
+
+# AsyncModel whose transaction the current task is in
+_TRANSACTION = contextvars.ContextVar('beb_lib_transaction', default=None)
+
+
+class AsyncModel:
+    """
+    Coroutine versions of all public methods of Model with the same arguments and results. Reads run concurrently on
+    a bounded pool of threads, writes run one by one on a single writer thread, so the event loop is never blocked.
+    Peewee keeps a connection per thread, so each thread uses its own one. Use a database file: every connection to
+    ':memory:' is a separate database.
+
+        >>> async_model = AsyncModel(Model('beb.sqlite3'))
+        >>> board = await async_model.board_write(board_name="Hello board", request_user_id=1)
+
+    A write that is cancelled while it runs may still be saved, wrap writes into transaction() to avoid it.
+    Model.memoized_reads has no async version, the memo belongs to one thread.
+    """
+
+    def __init__(self, model: Model, max_readers: int = 4, max_streams: int = 4):
+        """
+
+        :param model: Model to run the methods of
+        :param max_readers: Maximum number of reads that run at once
+        :param max_streams: Maximum number of card streams that are open at once, each has its own thread
+        """
+        self.model = model
+        self.max_readers = max_readers
+        self.max_streams = max_streams
+        self._readers = ThreadPoolExecutor(max_readers, 'beb-lib-reader', initializer=model.ping)
+        self._writer = ThreadPoolExecutor(1, 'beb-lib-writer', initializer=model.ping)
+        self._write_lock = None
+        self._stream_semaphore = None
+        self._closed = False
+
+    def _lock(self) -> asyncio.Lock:
+        # Created on first use, so that it belongs to the running event loop
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+    def _streams(self) -> asyncio.Semaphore:
+        if self._stream_semaphore is None:
+            self._stream_semaphore = asyncio.Semaphore(self.max_streams)
+        return self._stream_semaphore
+
+    def _in_transaction(self) -> bool:
+        return _TRANSACTION.get() is self
+
+    def _run(self, executor: ThreadPoolExecutor, call) -> asyncio.Future:
+        return asyncio.get_event_loop().run_in_executor(executor, call)
+
+    async def _read(self, call):
+        # Inside a transaction reads go to the writer thread to see the changes that aren't committed yet
+        if self._in_transaction():
+            return await self._run(self._writer, call)
+        return await self._run(self._readers, call)
+
+    async def _write(self, call):
+        if self._in_transaction():
+            return await self._run(self._writer, call)
+        async with self._lock():
+            return await self._run(self._writer, call)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        """
+        Async version of Model.transaction. Calls made inside it by the task run on the writer thread, writes of other
+        tasks wait until it ends. If the task is cancelled inside it, the changes are rolled back
+
+            >>> async with async_model.transaction():
+            ...     board = await async_model.board_write(board_name="Hello board", request_user_id=1)
+            ...     await async_model.list_write(board.unique_id, list_name="Backlog", request_user_id=1)
+        """
+        if self._in_transaction():
+            async with self._transaction_on_writer():
+                yield
+            return
+
+        async with self._lock():
+            token = _TRANSACTION.set(self)
+            try:
+                async with self._transaction_on_writer():
+                    yield
+            finally:
+                _TRANSACTION.reset(token)
+
+    @contextlib.asynccontextmanager
+    async def _transaction_on_writer(self):
+        transaction = self.model.transaction()
+        begin = self._run(self._writer, transaction.__enter__)
+        try:
+            await asyncio.shield(begin)
+        except asyncio.CancelledError:
+            # The transaction begins anyway, the writer thread runs calls in order, so it ends right after that
+            self._run(self._writer, functools.partial(transaction.__exit__, asyncio.CancelledError,
+                                                      asyncio.CancelledError(), None))
+            raise
+
+        try:
+            yield
+        except BaseException as error:
+            await asyncio.shield(self._run(self._writer, functools.partial(transaction.__exit__, type(error),
+                                                                           error, error.__traceback__)))
+            raise
+        else:
+            await asyncio.shield(self._run(self._writer, functools.partial(transaction.__exit__, None, None, None)))
+
+    async def card_stream(self, *args, **kwargs):
+        """
+        Async iterator version of Model.card_stream. Cards are read by STREAM_CHUNK_SIZE on a thread of the stream,
+        so that its cursor stays with one connection. At most max_streams streams are open at once, others wait
+
+            >>> async for card in async_model.card_stream(list_id=1, request_user_id=1):
+            ...     print(card.name)
+        """
+        in_transaction = self._in_transaction()
+        if in_transaction:
+            executor = self._writer
+        else:
+            await self._streams().acquire()
+            executor = ThreadPoolExecutor(1, 'beb-lib-stream')
+        cards = None
+        try:
+            cards = await self._run(executor, functools.partial(self.model.card_stream, *args, **kwargs))
+            while True:
+                chunk = await self._run(executor, functools.partial(list, itertools.islice(cards, STREAM_CHUNK_SIZE)))
+                for card in chunk:
+                    yield card
+                if len(chunk) < STREAM_CHUNK_SIZE:
+                    break
+        finally:
+            if not in_transaction:
+                # Runs after the reads of the stream, the thread ends once it's done
+                executor.submit(self._end_stream, cards)
+                executor.shutdown(wait=False)
+                self._streams().release()
+
+    def _end_stream(self, cards) -> None:
+        if cards is not None:
+            cards.close()
+        self.model.disconnect()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Closes the connections of the threads and stops them. Calls made after it fail, repeated calls do nothing
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        # Every reader thread has to take one of the calls, so each of them waits for the others
+        readers = threading.Barrier(self.max_readers)
+        for _ in range(self.max_readers):
+            self._readers.submit(self._disconnect_reader, readers)
+        self._writer.submit(self.model.disconnect)
+        self._readers.shutdown(wait)
+        self._writer.shutdown(wait)
+
+    def _disconnect_reader(self, readers: threading.Barrier) -> None:
+        readers.wait()
+        self.model.disconnect()
+
+
+def _mirror(name: str):
+    is_read = name in READ_METHODS
+
+    async def coroutine(self, *args, **kwargs):
+        call = functools.partial(getattr(self.model, name), *args, **kwargs)
+        return await (self._read(call) if is_read else self._write(call))
+
+    coroutine.__name__ = name
+    coroutine.__qualname__ = '{}.{}'.format(AsyncModel.__name__, name)
+    coroutine.__doc__ = 'Async version of Model.{}{}'.format(name, '' if is_read else ', runs on the writer thread')
+    return coroutine
+
+
+for _name in dir(Model):
+    if not _name.startswith('_') and _name not in _OWN_METHODS and callable(getattr(Model, _name)):
+        setattr(AsyncModel, _name, _mirror(_name))
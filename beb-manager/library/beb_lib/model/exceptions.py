@@ -46,3 +46,9 @@ class PlanDoesNotExistError(UniqueObjectDoesNotExistError):
 
     def __init__(self, reason):
         super().__init__(reason)
+
+
+class GroupDoesNotExistError(UniqueObjectDoesNotExistError):
+
+    def __init__(self, reason):
+        super().__init__(reason)
@@ -1,29 +1,48 @@
 """
 This module provides all methods to work with library
 """
+import contextlib
 import datetime
 import random
-from typing import List, Optional
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from beb_lib.logger import log_func, LIBRARY_LOGGER_NAME
 from beb_lib.domain_entities.board import Board
+from beb_lib.domain_entities.board_snapshot import BoardSnapshot
 from beb_lib.domain_entities.card import Card
 from beb_lib.domain_entities.card_list import CardsList
+from beb_lib.domain_entities.card_page import CardPage
+from beb_lib.domain_entities.group import Group
 from beb_lib.domain_entities.plan import Plan
 from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.domain_entities.tag import Tag
+from beb_lib.model.read_memo import ReadMemo
 from beb_lib.provider_interfaces import RequestType
 from beb_lib.storage.provider import StorageProvider, StorageProviderErrors
 from beb_lib.storage.provider_protocol import IStorageProviderProtocol
 from beb_lib.storage.provider_requests import (BoardDataRequest,
                                                CardDataRequest,
+                                               CardStreamRequest,
                                                ListDataRequest,
                                                AddAccessRightRequest,
                                                RemoveAccessRightRequest,
                                                PlanDataRequest,
                                                TagDataRequest,
                                                GetAccessRightRequest,
-                                               PlanTriggerRequest
+                                               GetAccessRightsMatrixRequest,
+                                               SetAccessRightsRequest,
+                                               SetGroupAccessRightsRequest,
+                                               GroupDataRequest,
+                                               PlanTriggerRequest,
+                                               BoardSnapshotRequest,
+                                               BoardVersionRequest,
+                                               CardBoardVersionsRequest,
+                                               BoardsOfObjectsRequest,
+                                               CardsByIdRequest,
+                                               CardPageRequest,
+                                               CardSearchRequest,
+                                               TagSearchRequest
                                                )
 from beb_lib.model.exceptions import (BoardDoesNotExistError,
                                       ListDoesNotExistError,
@@ -32,7 +51,8 @@ from beb_lib.model.exceptions import (BoardDoesNotExistError,
                                       Error,
                                       TagDoesNotExistError,
                                       PlanDoesNotExistError,
-                                      UniqueObjectDoesNotExistError
+                                      UniqueObjectDoesNotExistError,
+                                      GroupDoesNotExistError
                                       )
 
 
@@ -47,21 +67,137 @@ class Model:
         else:
             self.storage_provider = StorageProvider(path_to_db)
         self.storage_provider.open()
+        self._memo = threading.local()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Context manager that saves all changes made inside it at once or, if an exception is raised, none of them.
+        Transactions may be nested, then only the inner one is rolled back on error.
+
+            >>> with model.transaction():
+            ...     board = model.board_write(board_name="Hello board", request_user_id=1)
+            ...     model.list_write(board.unique_id, list_name="Backlog", request_user_id=1)
+        """
+        with self.storage_provider.transaction():
+            try:
+                yield
+            except BaseException:
+                # Reads memoized inside saw the changes that are rolled back
+                memo = getattr(self._memo, 'current', None)
+                if memo is not None:
+                    memo.clear()
+                raise
+
+    @contextlib.contextmanager
+    def memoized_reads(self):
+        """
+        Context manager that answers repeated reads made inside it by the calling thread without going to the storage.
+        Any write made inside it forgets everything read before. Changes made by other threads or processes meanwhile
+        aren't seen, so keep it short, e.g. one web request. Yields ReadMemo with the numbers of hits and misses
+
+            >>> with model.memoized_reads() as memo:
+            ...     model.tag_read(tag_id=1)
+            ...     model.tag_read(tag_id=1)
+            >>> memo.hits
+            1
+        """
+        previous = getattr(self._memo, 'current', None)
+        memo = ReadMemo()
+        self._memo.current = memo
+        try:
+            yield memo
+        finally:
+            self._memo.current = previous
+
+    def _execute(self, request):
+        memo = getattr(self._memo, 'current', None)
+        if memo is None:
+            return self.storage_provider.execute(request)
+        return memo.execute(self.storage_provider, request)
+
+    def ping(self) -> bool:
+        """
+        :return: True if the storage answers requests made from the calling thread
+        """
+        return self.storage_provider.ping()
+
+    def disconnect(self) -> None:
+        """
+        Closes the connection of the calling thread, for threads that stop using the model
+        """
+        self.storage_provider.disconnect()
 
     @log_func(LIBRARY_LOGGER_NAME)
     def get_right(self, object_id: int, object_type: type, user_id: int) -> AccessType:
+        """
+        Objects returned by board_read, list_read and card_read already have the access of the request user in their
+        `access` attribute, use this method only for other users or objects that weren't read
+        """
         request = GetAccessRightRequest(request_id=random.randrange(1000000),
                                         request_type=RequestType.READ,
                                         object_id=object_id,
                                         object_type=object_type,
                                         user_id=user_id)
-        access_type = self.storage_provider.execute(request)
+        access_type = self._execute(request)
 
         if access_type is None:
             raise UniqueObjectDoesNotExistError
 
         return access_type
 
+    @log_func(LIBRARY_LOGGER_NAME)
+    def get_rights_matrix(self, object_type: type, object_id: int,
+                          user_ids: Iterable[int] = None) -> Dict[int, AccessType]:
+        """
+        Same as get_right for many users at once, the number of database queries doesn't depend on the number of users
+        :param user_ids: None for the users that have access rows on the object or its parents, directly or by groups.
+        All other users have the default READ_WRITE access
+        :return: Access of each of the users by their ids
+        """
+        request = GetAccessRightsMatrixRequest(request_id=random.randrange(1000000),
+                                               request_type=RequestType.READ,
+                                               object_type=object_type,
+                                               object_id=object_id,
+                                               user_ids=list(user_ids) if user_ids is not None else None)
+        matrix = self._execute(request)
+
+        if matrix is None:
+            raise UniqueObjectDoesNotExistError("{} doesn't exist".format(object_type.__name__))
+
+        return matrix
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def set_rights(self, object_type: type, object_id: int, rights: Dict[int, Optional[AccessType]]) -> None:
+        """
+        Sets access of many users at once in one transaction. Use it instead of add_right and remove_right per user
+        :param rights: Access by user id. Pass None to remove explicit access of the user, then the default one is used
+        """
+        request = SetAccessRightsRequest(request_id=random.randrange(1000000),
+                                         request_type=RequestType.WRITE,
+                                         object_type=object_type,
+                                         object_id=object_id,
+                                         rights=rights)
+
+        if self._execute(request) is None:
+            raise UniqueObjectDoesNotExistError("{} doesn't exist".format(object_type.__name__))
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def set_group_rights(self, object_type: type, object_id: int, rights: Dict[int, Optional[AccessType]]) -> None:
+        """
+        Sets access of groups. A user without own access gets access of all their groups combined, so sharing with a
+        group costs one row whatever the number of its members is
+        :param rights: Access by group id. Pass None to remove access of the group
+        """
+        request = SetGroupAccessRightsRequest(request_id=random.randrange(1000000),
+                                              request_type=RequestType.WRITE,
+                                              object_type=object_type,
+                                              object_id=object_id,
+                                              rights=rights)
+
+        if self._execute(request) is None:
+            raise UniqueObjectDoesNotExistError("{} doesn't exist".format(object_type.__name__))
+
     @log_func(LIBRARY_LOGGER_NAME)
     def add_right(self, object_id: int, object_type: type, user_id: int, access_type: AccessType) -> None:
         request = AddAccessRightRequest(request_id=random.randrange(1000000),
@@ -71,7 +207,7 @@ class Model:
                                         user_id=user_id,
                                         access_type=access_type)
 
-        self.storage_provider.execute(request)
+        self._execute(request)
 
     @log_func(LIBRARY_LOGGER_NAME)
     def remove_right(self, object_id: int, object_type: type, user_id: int, access_type: AccessType) -> None:
@@ -82,7 +218,7 @@ class Model:
                                            user_id=user_id,
                                            access_type=access_type)
 
-        self.storage_provider.execute(request)
+        self._execute(request)
 
     @log_func(LIBRARY_LOGGER_NAME)
     def board_read(self, board_id: int = None, board_name: str = None, request_user_id: int = None) -> List[Board]:
@@ -92,7 +228,7 @@ class Model:
                                    name=board_name,
                                    request_type=RequestType.READ)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -113,7 +249,7 @@ class Model:
                                    name=board_name,
                                    request_type=RequestType.WRITE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -132,7 +268,7 @@ class Model:
                                    name=board_name,
                                    request_type=RequestType.DELETE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -143,6 +279,80 @@ class Model:
                 raise Error("""Undefined DB exception! 
                 Code: {} Description: {}""".format(error.code, error.description))
 
+    @log_func(LIBRARY_LOGGER_NAME)
+    def board_snapshot(self, board_id: int, request_user_id: int = None, cards_limit: int = None) -> BoardSnapshot:
+        """
+        Reads the board together with its lists, cards, tags and access of the user to all of them. The number of
+        database queries doesn't depend on the size of the board, so use it instead of list_read and card_read per list
+        to show the whole board. Card plans are ids here, use plan_read for details
+        :param cards_limit: Read not more than this number of cards per list, get the rest with card_page and
+        the cursors of the snapshot. The numbers of all cards are in card_counts anyway, so pass 0 to only count them
+        """
+        request = BoardSnapshotRequest(request_id=random.randrange(1000000),
+                                       request_user_id=request_user_id,
+                                       board_id=board_id,
+                                       cards_limit=cards_limit,
+                                       request_type=RequestType.READ)
+
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.ACCESS_DENIED:
+                raise AccessDeniedError(error.description)
+            elif error.code == StorageProviderErrors.BOARD_DOES_NOT_EXIST:
+                raise BoardDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                                Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.snapshot
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def board_version(self, board_id: int) -> int:
+        """
+        Version of the board grows with every change of the board, its lists, cards, their tags, children, plans and
+        access, so compare it with the previously seen one instead of reading the board again. Access of the user isn't
+        checked, the version tells nothing about the board content
+        """
+        request = BoardVersionRequest(request_id=random.randrange(1000000),
+                                      request_type=RequestType.READ,
+                                      board_id=board_id)
+        version = self._execute(request)
+
+        if version is None:
+            raise BoardDoesNotExistError("Board doesn't exist")
+
+        return version
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def card_board_versions(self, card_id: int) -> Dict[int, int]:
+        """
+        Versions of the board of the card and of the boards of its children by board ids. The card with its children
+        stays the same while they do. Access isn't checked, like in board_version
+        """
+        request = CardBoardVersionsRequest(request_id=random.randrange(1000000),
+                                           request_type=RequestType.READ,
+                                           card_id=card_id)
+        return self._execute(request)
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def boards_of(self, object_type: type, object_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Ids of the boards the cards or lists are on, by their ids. Objects that don't exist or aren't on a board, like
+        archived cards, are missing
+        :param object_type: Card or CardsList
+        """
+        request = BoardsOfObjectsRequest(request_id=random.randrange(1000000),
+                                         request_type=RequestType.READ,
+                                         object_type=object_type,
+                                         object_ids=list(object_ids))
+        boards = self._execute(request)
+
+        if boards is None:
+            raise Error("Only cards and lists are on boards")
+
+        return boards
+
     @log_func(LIBRARY_LOGGER_NAME)
     def list_read(self, board_id: Optional[int], list_id: int = None, list_name: str = None,
                   request_user_id: int = None) -> List[CardsList]:
@@ -153,7 +363,7 @@ class Model:
                                   name=list_name,
                                   request_type=RequestType.READ)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -176,7 +386,7 @@ class Model:
                                   name=list_name,
                                   request_type=RequestType.WRITE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -201,7 +411,7 @@ class Model:
                                   name=list_name,
                                   request_type=RequestType.DELETE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -229,7 +439,7 @@ class Model:
                                   board_id=board_id,
                                   request_type=RequestType.READ)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -241,13 +451,127 @@ class Model:
                                 Code: {} Description: {}""".format(error.code, error.description))
 
         for card in response.cards:
-            try:
-                card.plan = self.plan_read(card.user_id, request_user_id)
-            except Error:
-                pass
+            self._attach_plan(card, request_user_id)
 
         return response.cards
 
+    @log_func(LIBRARY_LOGGER_NAME)
+    def card_read_many(self, card_ids: Iterable[int], request_user_id: int = None) -> List[Card]:
+        """
+        Reads the cards by their ids, e.g. children of a card, with a few queries whatever the number of cards is. Cards
+        that don't exist or can't be read by the user are skipped instead of raising. Card plans are ids here, use
+        plan_read for details
+        :return: Cards in the order of the ids
+        """
+        request = CardsByIdRequest(request_id=random.randrange(1000000),
+                                   request_type=RequestType.READ,
+                                   request_user_id=request_user_id,
+                                   ids=list(card_ids))
+        response, error = self._execute(request)
+
+        if error is not None:
+            raise Error("""Undefined DB exception! 
+                            Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.cards
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def card_page(self, list_id: int, after: str = None, limit: int = 50, request_user_id: int = None) -> CardPage:
+        """
+        Reads cards of the list page by page. Pages are found by the cursor, not by the offset, so reading of a page
+        doesn't get slower further in the list and cards added or removed meanwhile don't shift pages
+        :param after: next_cursor of the previous page or of a board snapshot, None for the first page
+        :param limit: Maximum number of cards on the page
+        """
+        request = CardPageRequest(request_id=random.randrange(1000000),
+                                  request_type=RequestType.READ,
+                                  request_user_id=request_user_id,
+                                  list_id=list_id,
+                                  after=after,
+                                  limit=limit)
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.ACCESS_DENIED:
+                raise AccessDeniedError(error.description)
+            elif error.code == StorageProviderErrors.LIST_DOES_NOT_EXIST:
+                raise ListDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                                Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.page
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def card_search(self, board_id: int, prefix: str, limit: int = 20, request_user_id: int = None) -> List[Card]:
+        """
+        Cards of the board whose names start with the prefix, for autocompletion. Only up to limit cards are read
+        whatever the size of the board
+        """
+        request = CardSearchRequest(request_id=random.randrange(1000000),
+                                    request_type=RequestType.READ,
+                                    request_user_id=request_user_id,
+                                    board_id=board_id,
+                                    prefix=prefix,
+                                    limit=limit)
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.ACCESS_DENIED:
+                raise AccessDeniedError(error.description)
+            elif error.code == StorageProviderErrors.BOARD_DOES_NOT_EXIST:
+                raise BoardDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                                Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.cards
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def card_stream(self, list_id: Optional[int] = None, card_id: int = None, card_name: str = None,
+                    tag_id: int = None, board_id: int = None, request_user_id: int = None) -> Iterator[Card]:
+        """
+        Same as card_read, but yields cards one by one as they are read from the database, so the memory usage doesn't
+        depend on the number of cards. Nothing is yielded if there are no cards the user can read
+        """
+        request = CardStreamRequest(request_id=random.randrange(1000000),
+                                    id=card_id,
+                                    request_user_id=request_user_id,
+                                    name=card_name,
+                                    description=None,
+                                    expiration_date=None,
+                                    priority=None,
+                                    assignee=None,
+                                    children=None,
+                                    tags=[tag_id] if tag_id is not None else [],
+                                    list_id=list_id,
+                                    board_id=board_id,
+                                    request_type=RequestType.READ)
+
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.LIST_DOES_NOT_EXIST:
+                raise ListDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                                Code: {} Description: {}""".format(error.code, error.description))
+
+        return self._attach_plans(response.cards, request_user_id)
+
+    def _attach_plans(self, cards: Iterator[Card], request_user_id: int) -> Iterator[Card]:
+        for card in cards:
+            self._attach_plan(card, request_user_id)
+            yield card
+
+    def _attach_plan(self, card: Card, request_user_id: int) -> None:
+        if card.plan is None:
+            return
+        try:
+            card.plan = self.plan_read(card.unique_id, request_user_id)
+        except Error:
+            pass
+
     @log_func(LIBRARY_LOGGER_NAME)
     def card_write(self, list_id: Optional[int], card_instance: Card, request_user_id: int = None) -> Card:
         request = CardDataRequest(request_id=random.randrange(1000000),
@@ -264,7 +588,7 @@ class Model:
                                   board_id=None,
                                   request_type=RequestType.WRITE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -292,7 +616,7 @@ class Model:
                                   board_id=None,
                                   request_type=RequestType.DELETE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -311,7 +635,7 @@ class Model:
                                  color=None,
                                  request_type=RequestType.READ)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.TAG_DOES_NOT_EXIST:
@@ -322,6 +646,23 @@ class Model:
 
         return response.tags
 
+    @log_func(LIBRARY_LOGGER_NAME)
+    def tag_search(self, prefix: str, limit: int = 20) -> List[Tag]:
+        """
+        Tags whose names start with the prefix, for autocompletion
+        """
+        request = TagSearchRequest(request_id=random.randrange(1000000),
+                                   request_type=RequestType.READ,
+                                   prefix=prefix,
+                                   limit=limit)
+        response, error = self._execute(request)
+
+        if error is not None:
+            raise Error("""Undefined DB exception! 
+                Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.tags
+
     @log_func(LIBRARY_LOGGER_NAME)
     def tag_write(self, tag_id: int = None, tag_name: str = None, color: int = None) -> Tag:
         request = TagDataRequest(request_id=random.randrange(1000000),
@@ -330,7 +671,7 @@ class Model:
                                  color=color,
                                  request_type=RequestType.WRITE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             raise Error("""Undefined DB exception! 
@@ -346,7 +687,7 @@ class Model:
                                  color=None,
                                  request_type=RequestType.DELETE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.TAG_DOES_NOT_EXIST:
@@ -355,6 +696,62 @@ class Model:
                 raise Error("""Undefined DB exception! 
                 Code: {} Description: {}""".format(error.code, error.description))
 
+    @log_func(LIBRARY_LOGGER_NAME)
+    def group_read(self, group_id: int = None, group_name: str = None) -> List[Group]:
+        request = GroupDataRequest(request_id=random.randrange(1000000),
+                                   id=group_id,
+                                   name=group_name,
+                                   user_ids=None,
+                                   request_type=RequestType.READ)
+
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.GROUP_DOES_NOT_EXIST:
+                raise GroupDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.groups
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def group_write(self, group_id: int = None, group_name: str = None, user_ids: List[int] = None) -> Group:
+        """
+        Creates a group or changes an existing one
+        :param user_ids: New members of the group. Members are not changed if None is passed
+        """
+        request = GroupDataRequest(request_id=random.randrange(1000000),
+                                   id=group_id,
+                                   name=group_name,
+                                   user_ids=user_ids,
+                                   request_type=RequestType.WRITE)
+
+        response, error = self._execute(request)
+
+        if error is not None:
+            raise Error("""Undefined DB exception! 
+            Code: {} Description: {}""".format(error.code, error.description))
+
+        return response.groups[0]
+
+    @log_func(LIBRARY_LOGGER_NAME)
+    def group_delete(self, group_id: int = None, group_name: str = None) -> None:
+        request = GroupDataRequest(request_id=random.randrange(1000000),
+                                   id=group_id,
+                                   name=group_name,
+                                   user_ids=None,
+                                   request_type=RequestType.DELETE)
+
+        response, error = self._execute(request)
+
+        if error is not None:
+            if error.code == StorageProviderErrors.GROUP_DOES_NOT_EXIST:
+                raise GroupDoesNotExistError(error.description)
+            else:
+                raise Error("""Undefined DB exception! 
+                Code: {} Description: {}""".format(error.code, error.description))
+
     @log_func(LIBRARY_LOGGER_NAME)
     def plan_read(self, card_id: int, request_user_id: int) -> Plan:
         request = PlanDataRequest(request_id=random.randrange(1000000),
@@ -364,7 +761,7 @@ class Model:
                                   card_id=card_id,
                                   request_type=RequestType.READ)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -389,7 +786,7 @@ class Model:
                                   card_id=card_id,
                                   request_type=RequestType.WRITE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -411,7 +808,7 @@ class Model:
                                   card_id=card_id,
                                   request_type=RequestType.DELETE)
 
-        response, error = self.storage_provider.execute(request)
+        response, error = self._execute(request)
 
         if error is not None:
             if error.code == StorageProviderErrors.ACCESS_DENIED:
@@ -427,7 +824,7 @@ class Model:
     @log_func(LIBRARY_LOGGER_NAME)
     def trigger_card_plan_creation(self):
         request = PlanTriggerRequest(request_id=random.randrange(1000000), request_type=RequestType.WRITE)
-        self.storage_provider.execute(request)
+        self._execute(request)
 
     # region convenience methods
     @log_func(LIBRARY_LOGGER_NAME)
@@ -467,10 +864,10 @@ class Model:
     @log_func(LIBRARY_LOGGER_NAME)
     def get_readable_cards(self, user_id: int) -> List[Card]:
         cards = self.card_read(None, request_user_id=user_id)
-        return list(filter(lambda card: bool(self.get_right(card.unique_id, Card, user_id) & AccessType.READ), cards))
+        return list(filter(lambda card: bool(card.access & AccessType.READ), cards))
 
     @log_func(LIBRARY_LOGGER_NAME)
     def get_writable_cards(self, user_id: int) -> List[Card]:
         cards = self.card_read(None, request_user_id=user_id)
-        return list(filter(lambda card: bool(self.get_right(card.unique_id, Card, user_id) & AccessType.WRITE), cards))
+        return list(filter(lambda card: bool(card.access & AccessType.WRITE), cards))
     # end region
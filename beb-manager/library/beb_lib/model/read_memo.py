@@ -0,0 +1,67 @@
+"""
+This module provides memoization of storage reads for a short unit of work, like one web request
+"""
+import copy
+from collections import namedtuple
+
+from beb_lib.provider_interfaces import RequestType, IProvider
+from beb_lib.storage.provider_requests import CardStreamRequest
+
+# Responses of these requests are iterators, they can't be read twice
+_NOT_MEMOIZED_REQUESTS = (CardStreamRequest,)
+
+
+class ReadMemo:
+    """
+    Keeps responses of read requests by their parameters. Any other request may change what was read, so it drops all
+    of them. Callers get copies of the kept responses and may change them freely
+    """
+
+    def __init__(self):
+        self._responses = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(request: namedtuple):
+        """
+        :return: Request type and parameters except the id, lists are turned into tuples
+        :raise TypeError: If the parameters can't be hashed
+        """
+        values = tuple(tuple(value) if isinstance(value, list) else value
+                       for field, value in zip(request._fields, request) if field != 'request_id')
+        key = (type(request),) + values
+        hash(key)
+        return key
+
+    def execute(self, provider: IProvider, request: namedtuple):
+        if type(request) in _NOT_MEMOIZED_REQUESTS:
+            return provider.execute(request)
+
+        if request.request_type != RequestType.READ:
+            self.clear()
+            return provider.execute(request)
+
+        try:
+            key = self._key(request)
+        except TypeError:
+            self.misses += 1
+            return provider.execute(request)
+
+        if key in self._responses:
+            self.hits += 1
+            return copy.deepcopy(self._responses[key])
+
+        self.misses += 1
+        response = provider.execute(request)
+        self._responses[key] = copy.deepcopy(response)
+        return response
+
+    def clear(self) -> None:
+        if self._responses:
+            self._responses.clear()
+            self.invalidations += 1
+
+    def __repr__(self):
+        return 'ReadMemo(hits={}, misses={}, invalidations={})'.format(self.hits, self.misses, self.invalidations)
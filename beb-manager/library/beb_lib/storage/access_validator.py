@@ -1,4 +1,5 @@
-from typing import Optional
+from collections import namedtuple
+from typing import Dict, Iterable, Optional
 import peewee
 from peewee import DoesNotExist
 
@@ -7,48 +8,155 @@ from beb_lib.domain_entities.card import Card
 from beb_lib.domain_entities.card_list import CardsList
 from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.provider_interfaces import RequestType
-from beb_lib.storage.models import (BaseModel,
+from beb_lib.storage.board_version import bump_board, bump_board_of_list, bump_board_of_card
+from beb_lib.storage.models import (DATABASE_PROXY,
+                                    BaseModel,
                                     BoardModel,
                                     CardListModel,
                                     BoardUserAccess,
                                     CardListUserAccess,
                                     CardModel,
-                                    CardUserAccess
+                                    CardUserAccess,
+                                    GroupMembership,
+                                    BoardGroupAccess,
+                                    CardListGroupAccess,
+                                    CardGroupAccess,
+                                    MAX_QUERY_VARIABLES
                                     )
 
+_AccessTables = namedtuple('_AccessTables', ['object_model', 'user_access', 'user_field', 'group_access',
+                                             'group_field'])
 
-def _create_access_type(query: peewee.ModelSelect):
-    if query.count() == 0:
-        return AccessType.READ_WRITE
-    else:
-        return AccessType(query[0].access_type)
+_BOARD_ACCESS = _AccessTables(BoardModel, BoardUserAccess, BoardUserAccess.board,
+                              BoardGroupAccess, BoardGroupAccess.board)
+_LIST_ACCESS = _AccessTables(CardListModel, CardListUserAccess, CardListUserAccess.card_list,
+                             CardListGroupAccess, CardListGroupAccess.card_list)
+_CARD_ACCESS = _AccessTables(CardModel, CardUserAccess, CardUserAccess.card,
+                             CardGroupAccess, CardGroupAccess.card)
 
 
-def check_access_to_board(board: BoardModel, user_id: int) -> AccessType:
-    query = (BoardUserAccess
-             .select()
-             .join(BoardModel)
-             .where((BoardUserAccess.user_id == user_id) & (BoardUserAccess.board == board)))
+def _access_tables(object_type: object) -> Optional[_AccessTables]:
+    class_name = object_type.__name__
 
-    return _create_access_type(query)
+    if class_name == Board.__name__:
+        return _BOARD_ACCESS
+    elif class_name == CardsList.__name__:
+        return _LIST_ACCESS
+    elif class_name == Card.__name__:
+        return _CARD_ACCESS
+    return None
 
 
-def check_access_to_list(card_list: CardListModel, user_id: int) -> AccessType:
-    query = (CardListUserAccess
-             .select()
-             .join(CardListModel)
-             .where((CardListUserAccess.user_id == user_id) & (CardListUserAccess.card_list == card_list)))
+def _matches(field: peewee.Field, objects):
+    if isinstance(objects, peewee.SelectBase):
+        return field.in_(objects)
+    return field == objects
+
+
+def _access_rows(tables: _AccessTables, objects, user_id: int = None, with_user_rows: bool = True):
+    """
+    Reads access rows of users and rows of the groups they are members of with a single query
+    :param objects: Id of the object or query that selects ids of the objects
+    :param user_id: Read rows of this user only
+    :param with_user_rows: Read only group rows if False
+    :return: Query of (object_id, user_id, is_user_row, access_type) tuples
+    """
+    query = (tables.group_access
+             .select(tables.group_field, GroupMembership.user_id, peewee.Value(0), tables.group_access.access_type)
+             .join(GroupMembership, on=(tables.group_access.group == GroupMembership.group))
+             .where(_matches(tables.group_field, objects)))
+    if user_id is not None:
+        query = query.where(GroupMembership.user_id == user_id)
+
+    if with_user_rows:
+        user_query = (tables.user_access
+                      .select(tables.user_field, tables.user_access.user_id, peewee.Value(1),
+                              tables.user_access.access_type)
+                      .where(_matches(tables.user_field, objects)))
+        if user_id is not None:
+            user_query = user_query.where(tables.user_access.user_id == user_id)
+        query = user_query + query
+
+    return query.tuples()
+
+
+def _resolve_access(rows) -> Dict[tuple, AccessType]:
+    """
+    Own row of a user wins over the groups, otherwise access of all their groups is combined
+    :return: Access by (object_id, user_id) for the pairs that have any rows, the rest have the default access
+    """
+    user_access = {}
+    group_access = {}
+    for object_id, user_id, is_user_row, access_type in rows:
+        if is_user_row:
+            user_access.setdefault((object_id, user_id), AccessType(access_type))
+        else:
+            key = (object_id, user_id)
+            group_access[key] = group_access.get(key, AccessType.NONE) | AccessType(access_type)
+
+    group_access.update(user_access)
+    return group_access
+
+
+def _access_of_user(tables: _AccessTables, objects, user_id: int) -> Dict[int, AccessType]:
+    return {object_id: access_type
+            for (object_id, _), access_type in _resolve_access(_access_rows(tables, objects, user_id)).items()}
+
+
+def _access_to_object(tables: _AccessTables, object_id: Optional[int], user_id: int) -> AccessType:
+    return _access_of_user(tables, object_id, user_id).get(object_id, AccessType.READ_WRITE)
+
+
+def check_access_to_board(board: BoardModel, user_id: int) -> AccessType:
+    return _access_to_object(_BOARD_ACCESS, board.id if board is not None else None, user_id)
 
-    return _create_access_type(query) & check_access_to_board(card_list.board, user_id)
+
+def check_access_to_list(card_list: CardListModel, user_id: int) -> AccessType:
+    return (_access_to_object(_LIST_ACCESS, card_list.id, user_id)
+            & _access_to_object(_BOARD_ACCESS, card_list.board_id, user_id))
 
 
 def check_access_to_card(card: CardModel, user_id: int) -> AccessType:
-    query = (CardUserAccess
-             .select()
-             .join(CardModel)
-             .where((CardUserAccess.user_id == user_id) & (CardUserAccess.card == card)))
+    return _access_to_object(_CARD_ACCESS, card.id, user_id) & check_access_to_list(card.list, user_id)
+
+
+def check_access_to_boards(boards_query: peewee.ModelSelect, user_id: int) -> Dict[int, AccessType]:
+    """
+    Same as check_access_to_board for many boards at once with a single query
+    :param boards_query: Query that selects ids of the boards
+    :return: Access to each board that has access rows, boards without them are READ_WRITE
+    """
+    return _access_of_user(_BOARD_ACCESS, boards_query, user_id)
+
+
+def check_access_to_lists(lists_query: peewee.ModelSelect, board_access: AccessType,
+                          user_id: int) -> Dict[int, AccessType]:
+    """
+    Same as check_access_to_list for all lists of one board at once with a single query
+    :param lists_query: Query that selects ids of the lists
+    :param board_access: Access of the user to the board of the lists
+    :return: Access to each list that has its own access rows, lists without them have board_access
+    """
+    access_map = _access_of_user(_LIST_ACCESS, lists_query, user_id)
+    return {list_id: access_type & board_access for list_id, access_type in access_map.items()}
+
+
+def check_access_to_cards(cards_query: peewee.ModelSelect, user_id: int) -> Dict[int, AccessType]:
+    """
+    Own access of the user to the cards with a single query. Combine with the list access to get the effective one
+    :param cards_query: Query that selects ids of the cards
+    :return: Access to each card that has its own access rows
+    """
+    return _access_of_user(_CARD_ACCESS, cards_query, user_id)
+
 
-    return _create_access_type(query) & check_access_to_list(card.list, user_id)
+def _bump_board_of_object(tables: _AccessTables, object_id: int) -> None:
+    if tables is _BOARD_ACCESS:
+        bump_board(object_id)
+    elif tables is _LIST_ACCESS:
+        bump_board_of_list(object_id)
+    elif tables is _CARD_ACCESS:
+        bump_board_of_card(object_id)
 
 
 def map_request_to_access_types(request_type: RequestType) -> AccessType:
@@ -95,6 +203,7 @@ def add_right(object_type: object, object_id: int, user_id: int, access_type: Ac
         a_type = AccessType(orm_model.access_type)
         orm_model.access_type = (a_type | access_type).value
         orm_model.save()
+        _bump_board_of_object(_access_tables(object_type), object_id)
 
 
 def remove_right(object_type: object, object_id: int, user_id: int, access_type: AccessType) -> None:
@@ -113,6 +222,7 @@ def remove_right(object_type: object, object_id: int, user_id: int, access_type:
         a_type |= access_type
         orm_model.access_type = (a_type ^ access_type).value
         orm_model.save()
+        _bump_board_of_object(_access_tables(object_type), object_id)
 
 
 def get_right(object_type: object, object_id: int, user_id: int) -> Optional[AccessType]:
@@ -134,3 +244,138 @@ def get_right(object_type: object, object_id: int, user_id: int) -> Optional[Acc
             return check_access_to_card(CardModel.get(CardModel.id == object_id), user_id)
     except DoesNotExist:
         return None
+
+
+def _access_by_user(tables: _AccessTables, object_id: Optional[int],
+                    with_user_rows: bool = True) -> Dict[int, AccessType]:
+    return {user_id: access_type
+            for (_, user_id), access_type in _resolve_access(_access_rows(tables, object_id,
+                                                                          with_user_rows=with_user_rows)).items()}
+
+
+def get_rights_matrix(object_type: object, object_id: int,
+                      user_ids: Optional[Iterable[int]]) -> Optional[Dict[int, AccessType]]:
+    """
+    Same as get_right for many users at once. Reads only access rows of the object and its parents, one query per
+    level, users without rows of their own or of their groups inherit the default
+    :param object_type: Pass here class from domain_entities
+    :param object_id: The id of the ORM object
+    :param user_ids: The ids of the users whose access levels are needed to be known. None for the users that have
+    rows of their own or of their groups on any level, the rest have the default access
+    :return: Access of each user or None if the object doesn't exist
+    """
+    class_name = object_type.__name__
+
+    try:
+        if class_name == Board.__name__:
+            board_id = BoardModel.get(BoardModel.id == object_id).id
+            levels = []
+        elif class_name == CardsList.__name__:
+            board_id = CardListModel.get(CardListModel.id == object_id).board_id
+            levels = [_access_by_user(_LIST_ACCESS, object_id)]
+        elif class_name == Card.__name__:
+            card = CardModel.get(CardModel.id == object_id)
+            card_list = CardListModel.get_or_none(CardListModel.id == card.list_id)
+            board_id = card_list.board_id if card_list is not None else None
+            levels = [_access_by_user(_CARD_ACCESS, object_id),
+                      _access_by_user(_LIST_ACCESS, card.list_id)]
+        else:
+            return None
+    except DoesNotExist:
+        return None
+
+    levels.append(_access_by_user(_BOARD_ACCESS, board_id))
+
+    if user_ids is None:
+        user_ids = set().union(*levels)
+
+    matrix = {}
+    for user_id in user_ids:
+        access_type = AccessType.READ_WRITE
+        for level in levels:
+            access_type &= level.get(user_id, AccessType.READ_WRITE)
+        matrix[user_id] = access_type
+    return matrix
+
+
+def _set_rows(tables: _AccessTables, access_model, principal_field: peewee.Field, object_id: int,
+              rights: Dict[int, Optional[AccessType]], inherited: Dict[int, AccessType]) -> Optional[bool]:
+    if tables.object_model.get_or_none(tables.object_model.id == object_id) is None:
+        return None
+
+    object_field = tables.user_field if access_model is tables.user_access else tables.group_field
+
+    stored = {}
+    query = (access_model
+             .select(principal_field, access_model.access_type)
+             .where(object_field == object_id)
+             .tuples())
+    for principal_id, access_type in query:
+        stored.setdefault(principal_id, set()).add(access_type)
+
+    to_delete = []
+    to_update = {}
+    to_insert = []
+    for principal_id, access_type in rights.items():
+        rows = stored.get(principal_id)
+        if access_type is None or access_type == inherited.get(principal_id):
+            if rows:
+                to_delete.append(principal_id)
+        elif not rows:
+            to_insert.append({principal_field.name: principal_id,
+                              'access_type': access_type.value,
+                              object_field.name: object_id})
+        elif rows != {access_type.value}:
+            to_update.setdefault(access_type.value, []).append(principal_id)
+
+    with DATABASE_PROXY.atomic():
+        for chunk in peewee.chunked(to_delete, MAX_QUERY_VARIABLES):
+            access_model.delete().where((object_field == object_id) & principal_field.in_(chunk)).execute()
+        for access_type, principal_ids in to_update.items():
+            for chunk in peewee.chunked(principal_ids, MAX_QUERY_VARIABLES):
+                (access_model
+                 .update(access_type=access_type)
+                 .where((object_field == object_id) & principal_field.in_(chunk))
+                 .execute())
+        for rows in peewee.chunked(to_insert, MAX_QUERY_VARIABLES // 3):
+            access_model.insert_many(rows).execute()
+        if to_delete or to_update or to_insert:
+            _bump_board_of_object(tables, object_id)
+
+    return True
+
+
+def set_rights(object_type: object, object_id: int, rights: Dict[int, Optional[AccessType]]) -> Optional[bool]:
+    """
+    Replaces own access rows of the users with the given ones. Only rows that differ are changed, all changes are made
+    in one transaction with a few bulk statements. No row is kept for a user whose access is the same as the one they
+    would get from their groups or by default
+    :param object_type: Pass here class from domain_entities
+    :param object_id: The id of the ORM object
+    :param rights: Access by user id. None removes the row of the user, so access of their groups or the default one
+    is used
+    :return: True or None if the object doesn't exist
+    """
+    tables = _access_tables(object_type)
+    if tables is None:
+        return None
+
+    inherited = _access_by_user(tables, object_id, with_user_rows=False)
+    for user_id in rights:
+        inherited.setdefault(user_id, AccessType.READ_WRITE)
+
+    return _set_rows(tables, tables.user_access, tables.user_access.user_id, object_id, rights, inherited)
+
+
+def set_group_rights(object_type: object, object_id: int,
+                     rights: Dict[int, Optional[AccessType]]) -> Optional[bool]:
+    """
+    Same as set_rights for groups. Every member of a group without own row gets access of all their groups combined
+    :param rights: Access by group id. None removes the row of the group
+    :return: True or None if the object doesn't exist
+    """
+    tables = _access_tables(object_type)
+    if tables is None:
+        return None
+
+    return _set_rows(tables, tables.group_access, tables.group_access.group, object_id, rights, {})
@@ -0,0 +1,80 @@
+"""
+Every change of a board, its lists, cards, their relations and access increases the version of the board, so clients
+can find out whether anything has changed with a single query. Call these functions in the transaction of the change
+"""
+from typing import Dict, Iterable, Optional
+
+from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.card_list import CardsList
+from beb_lib.storage.models import BoardModel, CardListModel, CardModel, ParentChild
+
+
+def _bump(condition) -> None:
+    BoardModel.update(version=BoardModel.version + 1).where(condition).execute()
+
+
+def bump_board(board_id: Optional[int]) -> None:
+    if board_id is not None:
+        _bump(BoardModel.id == board_id)
+
+
+def bump_board_of_list(list_id: Optional[int]) -> None:
+    if list_id is not None:
+        _bump(BoardModel.id.in_(CardListModel.select(CardListModel.board).where(CardListModel.id == list_id)))
+
+
+def bump_board_of_card(card_id: Optional[int]) -> None:
+    if card_id is not None:
+        _bump(BoardModel.id.in_(CardListModel
+                                .select(CardListModel.board)
+                                .join(CardModel)
+                                .where(CardModel.id == card_id)))
+
+
+def bump_all_boards() -> None:
+    """
+    For changes that may be seen on any board, e.g. tags
+    """
+    _bump(True)
+
+
+def read_board_version(board_id: int) -> Optional[int]:
+    """
+    :return: Version of the board or None if the board doesn't exist
+    """
+    row = BoardModel.select(BoardModel.version).where(BoardModel.id == board_id).tuples().first()
+    return row[0] if row is not None else None
+
+
+def read_boards_of(object_type: type, object_ids: Iterable[int]) -> Optional[Dict[int, int]]:
+    """
+    :param object_type: Card or CardsList
+    :return: Board ids by ids of the objects. Objects that don't exist or aren't on a board, like archived cards, are
+    missing. None for other object types
+    """
+    object_ids = list(object_ids)
+    if object_type is CardsList:
+        query = (CardListModel
+                 .select(CardListModel.id, CardListModel.board)
+                 .where(CardListModel.id.in_(object_ids)))
+    elif object_type is Card:
+        query = (CardModel
+                 .select(CardModel.id, CardListModel.board)
+                 .join(CardListModel)
+                 .where(CardModel.id.in_(object_ids)))
+    else:
+        return None
+    return {object_id: board_id for object_id, board_id in query.tuples() if board_id is not None}
+
+
+def read_card_board_versions(card_id: int) -> Dict[int, int]:
+    """
+    :return: Versions by board ids of the board of the card and the boards of its children, that the card page shows
+    """
+    card_ids = (CardModel.select(CardModel.id).where(CardModel.id == card_id) |
+                ParentChild.select(ParentChild.child).where(ParentChild.parent == card_id))
+    boards = (CardListModel
+              .select(CardListModel.board)
+              .join(CardModel)
+              .where(CardModel.id.in_(card_ids)))
+    return dict(BoardModel.select(BoardModel.id, BoardModel.version).where(BoardModel.id.in_(boards)).tuples())
@@ -13,6 +13,9 @@ from beb_lib.domain_entities.supporting import Priority, AccessType
 
 DATABASE_PROXY = Proxy()
 
+# Number of ids or values that one statement binds at most, keeps it below the SQLite variables limit
+MAX_QUERY_VARIABLES = 500
+
 
 class BaseModel(Model):
     """
@@ -29,7 +32,7 @@ class BaseNameModel(BaseModel):
 
 
 class BoardModel(BaseNameModel):
-    pass
+    version = IntegerField(default=0)
 
 
 class CardListModel(BaseNameModel):
@@ -94,3 +97,33 @@ class BoardUserAccess(BaseModel):
     user_id = IntegerField(null=True)
     access_type = IntegerField(default=AccessType.READ_WRITE.value)
     board = ForeignKeyField(BoardModel)
+
+
+class GroupModel(BaseNameModel):
+    pass
+
+
+class GroupMembership(BaseModel):
+    """
+    Made for many-to-many relation
+    """
+    group = ForeignKeyField(GroupModel, backref='memberships')
+    user_id = IntegerField()
+
+
+class CardGroupAccess(BaseModel):
+    group = ForeignKeyField(GroupModel)
+    access_type = IntegerField(default=AccessType.READ_WRITE.value)
+    card = ForeignKeyField(CardModel)
+
+
+class CardListGroupAccess(BaseModel):
+    group = ForeignKeyField(GroupModel)
+    access_type = IntegerField(default=AccessType.READ_WRITE.value)
+    card_list = ForeignKeyField(CardListModel)
+
+
+class BoardGroupAccess(BaseModel):
+    group = ForeignKeyField(GroupModel)
+    access_type = IntegerField(default=AccessType.READ_WRITE.value)
+    board = ForeignKeyField(BoardModel)
@@ -8,9 +8,11 @@ from beb_lib.domain_entities.card import CARD_LIST_DEFAULTS
 from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.provider_interfaces import RequestType, BaseError
 from beb_lib.storage.access_validator import check_access_to_board
+from beb_lib.storage.board_version import bump_board
 from beb_lib.storage.models import (CardListModel,
                                     BoardModel,
-                                    BoardUserAccess
+                                    BoardUserAccess,
+                                    BoardGroupAccess
                                     )
 from beb_lib.storage.provider import BoardDataResponse, StorageProviderErrors
 from beb_lib.storage.provider_requests import BoardDataRequest
@@ -25,7 +27,7 @@ METHOD_MAP = {
 def _create_board_with_defaults(board_name: str, user_id: int) -> Board:
     board = BoardModel.create(name=board_name)
     BoardUserAccess.create(user_id=user_id, board=board)
-    board_response = Board(board.name, board.id)
+    board_response = Board(board.name, board.id, access=AccessType.READ_WRITE)
 
     for name in CARD_LIST_DEFAULTS:
         CardListModel.create(name=name, board=board)
@@ -37,11 +39,13 @@ def write_board(request: BoardDataRequest, user_id: int) -> (List[Board], BaseEr
     try:
         board = BoardModel.get(BoardModel.id == request.id)
 
-        if bool(check_access_to_board(board, user_id) & AccessType.WRITE):
+        access = check_access_to_board(board, user_id)
+        if bool(access & AccessType.WRITE):
             board.name = request.name
-            board.save()
+            board.save(only=[BoardModel.name])
+            bump_board(board.id)
             lists = [list_id for list_id in board.card_lists]
-            return [Board(board.name, board.id, lists)], None
+            return [Board(board.name, board.id, lists, access)], None
         else:
             return None, BaseError(StorageProviderErrors.ACCESS_DENIED, "This user can't write to this board")
     except DoesNotExist:
@@ -62,9 +66,10 @@ def read_board(request: BoardDataRequest, user_id: int) -> (List[Board], BaseErr
                                description="Board doesn't exist")
 
     for board in query:
-        if bool(check_access_to_board(board, user_id) & AccessType.READ):
+        access = check_access_to_board(board, user_id)
+        if bool(access & AccessType.READ):
             lists = [card_list.id for card_list in board.card_lists]
-            board_response += [Board(board.name, board.id, lists)]
+            board_response += [Board(board.name, board.id, lists, access)]
 
     if not board_response:
         return None, BaseError(code=StorageProviderErrors.ACCESS_DENIED,
@@ -79,6 +84,7 @@ def delete_board(request: BoardDataRequest, user_id: int) -> (List[Board], BaseE
         access = check_access_to_board(board, user_id)
         if bool(access & AccessType.WRITE):
             BoardUserAccess.delete().where(BoardUserAccess.board == board).execute()
+            BoardGroupAccess.delete().where(BoardGroupAccess.board == board).execute()
             for card_list in board.card_lists:
                 list_processor._delete_list(card_list)
             board.delete_instance()
@@ -1,25 +1,38 @@
-from collections import namedtuple
-from typing import List
+from collections import defaultdict, namedtuple
+from typing import Iterator, List, Optional
 
-from peewee import DoesNotExist
+from peewee import DoesNotExist, chunked
 
 import beb_lib.storage.provider as provider
 from beb_lib.domain_entities.card import Card
+from beb_lib.domain_entities.card_page import CardPage
 from beb_lib.domain_entities.supporting import AccessType, Priority
 from beb_lib.provider_interfaces import RequestType, BaseError
-from beb_lib.storage.access_validator import (check_access_to_list,
-                                              check_access_to_card
+from beb_lib.storage.access_validator import (check_access_to_board,
+                                              check_access_to_list,
+                                              check_access_to_card,
+                                              check_access_to_boards,
+                                              check_access_to_lists,
+                                              check_access_to_cards
                                               )
+from beb_lib.storage.board_version import bump_board_of_card, bump_board_of_list
 from beb_lib.storage.models import (CardListModel,
                                     TagModel,
                                     CardModel,
                                     TagCard,
                                     ParentChild,
                                     CardUserAccess,
+                                    CardGroupAccess,
                                     PlanModel,
-                                    BoardModel
+                                    BoardModel,
+                                    MAX_QUERY_VARIABLES
                                     )
-from beb_lib.storage.provider_requests import (CardDataRequest)
+from beb_lib.storage.provider_requests import (CardDataRequest,
+                                               CardStreamRequest,
+                                               CardsByIdRequest,
+                                               CardPageRequest,
+                                               CardSearchRequest
+                                               )
 
 METHOD_MAP = {
     RequestType.WRITE: lambda request, user_id, list_model: write_card(request, user_id, list_model),
@@ -30,13 +43,14 @@ METHOD_MAP = {
 
 def _delete_card(card: CardModel):
     CardUserAccess.delete().where(CardUserAccess.card == card).execute()
+    CardGroupAccess.delete().where(CardGroupAccess.card == card).execute()
     TagCard.delete().where(TagCard.card == card).execute()
     ParentChild.delete().where(ParentChild.parent == card).execute()
     PlanModel.delete().where(PlanModel.card == card).execute()
     card.delete_instance()
 
 
-def _create_card_from_orm(card_model: CardModel) -> Card:
+def _create_card_from_orm(card_model: CardModel, access: AccessType = None) -> Card:
     children = []
     for parent_child in ParentChild.select().where(ParentChild.parent == card_model):
         children += [parent_child.child.id]
@@ -52,19 +66,52 @@ def _create_card_from_orm(card_model: CardModel) -> Card:
                 card_model.assignee_id, card_model.description,
                 card_model.expiration_date, card_model.priority,
                 children, tags, card_model.created,
-                card_model.last_modified, plan_id)
+                card_model.last_modified, plan_id, access, card_model.list_id)
+
+
+def _group_by_card(query) -> dict:
+    groups = defaultdict(list)
+    for card_id, value in query.tuples():
+        groups[card_id].append(value)
+    return groups
+
+
+CardRelations = namedtuple('CardRelations', ['tags', 'children', 'plans'])
+
+
+def read_relations(cards_query) -> CardRelations:
+    """
+    Reads tags, children and plans of all the cards with three queries
+    :param cards_query: Query that selects ids of the cards
+    """
+    tags = _group_by_card(TagCard.select(TagCard.card, TagCard.tag).where(TagCard.card.in_(cards_query)))
+    children = _group_by_card(ParentChild
+                              .select(ParentChild.parent, ParentChild.child)
+                              .where(ParentChild.parent.in_(cards_query)))
+    plans = dict(PlanModel.select(PlanModel.card, PlanModel.id).where(PlanModel.card.in_(cards_query)).tuples())
+    return CardRelations(tags, children, plans)
+
+
+def create_card_with_relations(card_model: CardModel, relations: CardRelations, access: AccessType) -> Card:
+    return Card(card_model.name, card_model.id, card_model.user_id,
+                card_model.assignee_id, card_model.description,
+                card_model.expiration_date, card_model.priority,
+                relations.children[card_model.id], relations.tags[card_model.id], card_model.created,
+                card_model.last_modified, relations.plans.get(card_model.id), access, card_model.list_id)
 
 
 def write_card(request: CardDataRequest, user_id: int, card_list: CardListModel) -> (List[Card], BaseError):
     try:
         card = CardModel.get(CardModel.id == request.id)
 
-        if bool(check_access_to_card(card, user_id) & AccessType.WRITE):
+        access = check_access_to_card(card, user_id)
+        if bool(access & AccessType.WRITE):
             card.name = request.name
             card.description = request.description
             card.expiration_date = request.expiration_date
             card.priority = request.priority if request.priority is not None else Priority.MEDIUM
             card.assignee_id = request.assignee
+            bump_board_of_card(card.id)
             if card_list is not None:
                 card.list = card_list
 
@@ -91,11 +138,14 @@ def write_card(request: CardDataRequest, user_id: int, card_list: CardListModel)
                         TagCard.get_or_create(tag=tag, card=card)
 
             card.save()
-            return [_create_card_from_orm(card)], None
+            if card_list is not None:
+                bump_board_of_list(card_list.id)
+            return [_create_card_from_orm(card, access)], None
         else:
             return None, BaseError(provider.StorageProviderErrors.ACCESS_DENIED, "This user can't write to this card")
     except DoesNotExist:
-        if bool(check_access_to_list(card_list, user_id) & AccessType.WRITE):
+        list_access = check_access_to_list(card_list, user_id)
+        if bool(list_access & AccessType.WRITE):
             card = CardModel.create(name=request.name,
                                     description=request.description,
                                     expiration_date=request.expiration_date,
@@ -103,6 +153,7 @@ def write_card(request: CardDataRequest, user_id: int, card_list: CardListModel)
                                     assignee_id=request.assignee,
                                     list=card_list,
                                     user_id=user_id)
+            bump_board_of_list(card_list.id)
 
             if request.tags is not None:
                 for tag in TagModel.select().where(TagModel.id.in_(request.tags)):
@@ -114,14 +165,13 @@ def write_card(request: CardDataRequest, user_id: int, card_list: CardListModel)
                     if bool(check_access_to_card(iter_card, user_id) & AccessType.READ) and not (iter_card == card):
                         ParentChild.create(parent=card, child=iter_card)
 
-            return [_create_card_from_orm(card)], None
+            return [_create_card_from_orm(card, list_access)], None
         else:
             return None, BaseError(provider.StorageProviderErrors.ACCESS_DENIED, "This user has not enough rights for "
                                                                                  "this list")
 
 
-def read_card(request: CardDataRequest, user_id: int, card_list: CardListModel) -> (List[Card], BaseError):
-    card_response = []
+def _create_card_query(request: CardDataRequest, card_list: CardListModel):
     query = CardModel.select()
 
     if request.id is not None:
@@ -135,15 +185,21 @@ def read_card(request: CardDataRequest, user_id: int, card_list: CardListModel)
     if request.tags:
         query = query.switch(CardModel).join(TagCard).join(TagModel).where(TagModel.id == request.tags[0])
 
-    query = query.order_by(-CardModel.priority)
+    return query.order_by(-CardModel.priority, CardModel.id)
+
+
+def read_card(request: CardDataRequest, user_id: int, card_list: CardListModel) -> (List[Card], BaseError):
+    card_response = []
+    query = _create_card_query(request, card_list)
 
     if query.count() == 0:
         return None, BaseError(code=provider.StorageProviderErrors.CARD_DOES_NOT_EXIST,
                                description="Card doesn't exist")
 
     for card in query:
-        if bool(check_access_to_card(card, user_id) & AccessType.READ):
-            card_response += [_create_card_from_orm(card)]
+        access = check_access_to_card(card, user_id)
+        if bool(access & AccessType.READ):
+            card_response += [_create_card_from_orm(card, access)]
 
     if not card_response:
         return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
@@ -152,11 +208,179 @@ def read_card(request: CardDataRequest, user_id: int, card_list: CardListModel)
         return card_response, None
 
 
+def stream_card(request: CardStreamRequest, user_id: int, card_list: CardListModel) -> Iterator[Card]:
+    """
+    Yields cards readable by the user one by one without loading the whole result into memory
+    """
+    for card in _create_card_query(request, card_list).iterator():
+        access = check_access_to_card(card, user_id)
+        if bool(access & AccessType.READ):
+            yield _create_card_from_orm(card, access)
+
+
+def read_cards_by_id(request: CardsByIdRequest, user_id: int) -> List[Card]:
+    """
+    Reads the cards with a fixed number of queries per MAX_QUERY_VARIABLES ids. Cards that don't exist or can't be read by
+    the user are skipped, the rest keep the order of the ids
+    """
+    cards = {}
+    ids = list(dict.fromkeys(request.ids))
+
+    for ids_chunk in chunked(ids, MAX_QUERY_VARIABLES):
+        cards_query = CardModel.select(CardModel.id).where(CardModel.id.in_(ids_chunk))
+        lists_query = CardModel.select(CardModel.list).where(CardModel.id.in_(ids_chunk))
+
+        board_of_list = dict(CardListModel
+                             .select(CardListModel.id, CardListModel.board)
+                             .where(CardListModel.id.in_(lists_query))
+                             .tuples())
+        board_access = check_access_to_boards(CardListModel
+                                              .select(CardListModel.board)
+                                              .where(CardListModel.id.in_(lists_query)), user_id)
+        list_access = check_access_to_lists(lists_query, AccessType.READ_WRITE, user_id)
+        card_access = check_access_to_cards(cards_query, user_id)
+        relations = read_relations(cards_query)
+
+        for card in CardModel.select().where(CardModel.id.in_(ids_chunk)):
+            access = (card_access.get(card.id, AccessType.READ_WRITE) &
+                      list_access.get(card.list_id, AccessType.READ_WRITE) &
+                      board_access.get(board_of_list.get(card.list_id), AccessType.READ_WRITE))
+            if bool(access & AccessType.READ):
+                cards[card.id] = create_card_with_relations(card, relations, access)
+
+    return [cards[card_id] for card_id in ids if card_id in cards]
+
+
+def encode_cursor(card_model: CardModel) -> str:
+    """
+    Cards are ordered by priority descending and then by id, the cursor keeps both of the last card of a page
+    """
+    return '{}:{}'.format(card_model.priority, card_model.id)
+
+
+def _after_cursor(cursor: Optional[str]):
+    """
+    :return: Condition for cards that follow the cursor
+    :raise ValueError: If the cursor is malformed
+    """
+    if cursor is None:
+        return True
+    priority, card_id = (int(part) for part in cursor.split(':'))
+    return (CardModel.priority < priority) | ((CardModel.priority == priority) & (CardModel.id > card_id))
+
+
+def read_card_page(request: CardPageRequest, user_id: int) -> (CardPage, BaseError):
+    """
+    Reads up to request.limit cards of the list that follow the cursor. Cards the user can't read are skipped, so a page
+    may be shorter than the limit only if it's the last one
+    """
+    try:
+        card_list = CardListModel.get(CardListModel.id == request.list_id)
+    except DoesNotExist:
+        return None, BaseError(code=provider.StorageProviderErrors.LIST_DOES_NOT_EXIST,
+                               description="List doesn't exist")
+
+    list_access = check_access_to_list(card_list, user_id)
+    if not bool(list_access & AccessType.READ):
+        return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
+                               description="This user can't read this list")
+
+    if request.limit is None or request.limit < 1:
+        return None, BaseError(code=provider.StorageProviderErrors.INVALID_REQUEST,
+                               description="Page size should be positive")
+    try:
+        condition = _after_cursor(request.after)
+    except ValueError:
+        return None, BaseError(code=provider.StorageProviderErrors.INVALID_REQUEST,
+                               description="Invalid cursor")
+
+    cards = []
+    has_more = True
+    while has_more and len(cards) < request.limit:
+        batch_size = request.limit - len(cards)
+        candidates = list(CardModel
+                          .select()
+                          .where((CardModel.list == card_list) & condition)
+                          .order_by(-CardModel.priority, CardModel.id)
+                          .limit(batch_size + 1))
+        has_more = len(candidates) > batch_size
+        candidates = candidates[:batch_size]
+        if not candidates:
+            break
+
+        cards_query = CardModel.select(CardModel.id).where(CardModel.id.in_([card.id for card in candidates]))
+        card_access = check_access_to_cards(cards_query, user_id)
+        relations = read_relations(cards_query)
+        for card in candidates:
+            access = card_access.get(card.id, AccessType.READ_WRITE) & list_access
+            if bool(access & AccessType.READ):
+                cards.append(create_card_with_relations(card, relations, access))
+
+        last = candidates[-1]
+        condition = _after_cursor(encode_cursor(last))
+
+    return CardPage(cards, encode_cursor(last) if has_more else None), None
+
+
+def search_cards(request: CardSearchRequest, user_id: int) -> (List[Card], BaseError):
+    """
+    Finds up to request.limit cards of the board whose names start with request.prefix, case insensitive for ASCII.
+    Cards are ordered by name, the ones the user can't read are skipped
+    """
+    try:
+        board = BoardModel.get(BoardModel.id == request.board_id)
+    except DoesNotExist:
+        return None, BaseError(code=provider.StorageProviderErrors.BOARD_DOES_NOT_EXIST,
+                               description="Board doesn't exist")
+
+    board_access = check_access_to_board(board, user_id)
+    if not bool(board_access & AccessType.READ):
+        return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
+                               description="This user can't read this board")
+
+    if request.limit is None or request.limit < 1:
+        return None, BaseError(code=provider.StorageProviderErrors.INVALID_REQUEST,
+                               description="Limit should be positive")
+
+    lists_query = CardListModel.select(CardListModel.id).where(CardListModel.board == board)
+    list_access = check_access_to_lists(lists_query, board_access, user_id)
+    condition = CardModel.list.in_(lists_query) & CardModel.name.startswith(request.prefix or '')
+
+    cards = []
+    has_more = True
+    after = True
+    while has_more and len(cards) < request.limit:
+        batch_size = request.limit - len(cards)
+        candidates = list(CardModel
+                          .select()
+                          .where(condition & after)
+                          .order_by(CardModel.name, CardModel.id)
+                          .limit(batch_size + 1))
+        has_more = len(candidates) > batch_size
+        candidates = candidates[:batch_size]
+        if not candidates:
+            break
+
+        cards_query = CardModel.select(CardModel.id).where(CardModel.id.in_([card.id for card in candidates]))
+        card_access = check_access_to_cards(cards_query, user_id)
+        relations = read_relations(cards_query)
+        for card in candidates:
+            access = card_access.get(card.id, AccessType.READ_WRITE) & list_access.get(card.list_id, board_access)
+            if bool(access & AccessType.READ):
+                cards.append(create_card_with_relations(card, relations, access))
+
+        last = candidates[-1]
+        after = (CardModel.name > last.name) | ((CardModel.name == last.name) & (CardModel.id > last.id))
+
+    return cards, None
+
+
 def delete_card(request: CardDataRequest, user_id: int) -> (List[Card], BaseError):
     try:
         card = CardModel.get(CardModel.id == request.id)
         access = check_access_to_card(card, user_id)
         if bool(access & AccessType.WRITE):
+            bump_board_of_card(card.id)
             _delete_card(card)
         else:
             return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
@@ -177,3 +401,29 @@ def process_card_call(request: CardDataRequest) -> (namedtuple, BaseError):
     except DoesNotExist:
         return None, BaseError(code=provider.StorageProviderErrors.LIST_DOES_NOT_EXIST,
                                description="List or board doesn't exist")
+
+
+def process_card_stream_call(request: CardStreamRequest) -> (namedtuple, BaseError):
+    try:
+        card_list = CardListModel.get(CardListModel.id == request.list_id) if request.list_id is not None else None
+        cards = stream_card(request, request.request_user_id, card_list)
+
+        return provider.CardDataResponse(cards=cards, request_id=request.request_id), None
+    except DoesNotExist:
+        return None, BaseError(code=provider.StorageProviderErrors.LIST_DOES_NOT_EXIST,
+                               description="List doesn't exist")
+
+
+def process_cards_by_id_call(request: CardsByIdRequest) -> (namedtuple, BaseError):
+    cards = read_cards_by_id(request, request.request_user_id)
+    return provider.CardDataResponse(cards=cards, request_id=request.request_id), None
+
+
+def process_card_page_call(request: CardPageRequest) -> (namedtuple, BaseError):
+    page, error = read_card_page(request, request.request_user_id)
+    return provider.CardPageResponse(page=page, request_id=request.request_id), error
+
+
+def process_card_search_call(request: CardSearchRequest) -> (namedtuple, BaseError):
+    cards, error = search_cards(request, request.request_user_id)
+    return provider.CardDataResponse(cards=cards, request_id=request.request_id), error
@@ -0,0 +1,100 @@
+from collections import namedtuple
+from typing import List
+
+from peewee import DoesNotExist, chunked
+
+import beb_lib.storage.provider as provider
+from beb_lib.domain_entities.group import Group
+from beb_lib.provider_interfaces import BaseError, RequestType
+from beb_lib.storage.board_version import bump_all_boards
+from beb_lib.storage.models import (DATABASE_PROXY,
+                                    GroupModel,
+                                    GroupMembership,
+                                    BoardGroupAccess,
+                                    CardListGroupAccess,
+                                    CardGroupAccess,
+                                    MAX_QUERY_VARIABLES
+                                    )
+from beb_lib.storage.provider_requests import GroupDataRequest
+
+METHOD_MAP = {
+    RequestType.WRITE: lambda request: write_group(request),
+    RequestType.READ: lambda request: read_group(request),
+    RequestType.DELETE: lambda request: delete_group(request)
+}
+
+
+def _create_group_from_orm(group_model: GroupModel) -> Group:
+    user_ids = [membership.user_id for membership in group_model.memberships.order_by(GroupMembership.user_id)]
+    return Group(group_model.name, group_model.id, user_ids)
+
+
+def _set_members(group_model: GroupModel, user_ids: List[int]) -> None:
+    stored = {membership.user_id for membership in group_model.memberships}
+    requested = set(user_ids)
+
+    for user_ids_chunk in chunked(stored - requested, MAX_QUERY_VARIABLES):
+        (GroupMembership
+         .delete()
+         .where((GroupMembership.group == group_model) & GroupMembership.user_id.in_(user_ids_chunk))
+         .execute())
+
+    added = [{'group': group_model.id, 'user_id': user_id} for user_id in requested - stored]
+    for rows in chunked(added, MAX_QUERY_VARIABLES // 2):
+        GroupMembership.insert_many(rows).execute()
+
+
+def write_group(request: GroupDataRequest) -> (List[Group], BaseError):
+    with DATABASE_PROXY.atomic():
+        try:
+            group_model = GroupModel.get(GroupModel.id == request.id)
+            if request.name is not None:
+                group_model.name = request.name
+                group_model.save()
+        except DoesNotExist:
+            group_model = GroupModel.create(name=request.name)
+
+        if request.user_ids is not None:
+            _set_members(group_model, request.user_ids)
+            bump_all_boards()
+
+    return [_create_group_from_orm(group_model)], None
+
+
+def read_group(request: GroupDataRequest) -> (List[Group], BaseError):
+    query = GroupModel.select()
+
+    if request.id is not None:
+        query = query.where(GroupModel.id == request.id)
+    if request.name is not None:
+        query = query.where(GroupModel.name == request.name)
+
+    groups = [_create_group_from_orm(group_model) for group_model in query]
+
+    if not groups and (request.id is not None or request.name is not None):
+        return None, BaseError(code=provider.StorageProviderErrors.GROUP_DOES_NOT_EXIST,
+                               description="Group doesn't exist")
+    return groups, None
+
+
+def delete_group(request: GroupDataRequest) -> (List[Group], BaseError):
+    try:
+        group_model = GroupModel.get((GroupModel.id == request.id) | (GroupModel.name == request.name))
+    except DoesNotExist:
+        return None, BaseError(code=provider.StorageProviderErrors.GROUP_DOES_NOT_EXIST,
+                               description="Group doesn't exist")
+
+    with DATABASE_PROXY.atomic():
+        BoardGroupAccess.delete().where(BoardGroupAccess.group == group_model).execute()
+        CardListGroupAccess.delete().where(CardListGroupAccess.group == group_model).execute()
+        CardGroupAccess.delete().where(CardGroupAccess.group == group_model).execute()
+        GroupMembership.delete().where(GroupMembership.group == group_model).execute()
+        group_model.delete_instance()
+        bump_all_boards()
+
+    return None, None
+
+
+def process_group_call(request: GroupDataRequest) -> (namedtuple, BaseError):
+    groups, error = METHOD_MAP[request.request_type](request)
+    return provider.GroupDataResponse(groups=groups, request_id=request.request_id), error
@@ -9,9 +9,11 @@ from beb_lib.provider_interfaces import RequestType, BaseError
 from beb_lib.storage.access_validator import (check_access_to_board,
                                               check_access_to_list
                                               )
+from beb_lib.storage.board_version import bump_board
 from beb_lib.storage.models import (BoardModel,
                                     CardListModel,
-                                    CardListUserAccess
+                                    CardListUserAccess,
+                                    CardListGroupAccess
                                     )
 from beb_lib.storage.processors.card_processor import _delete_card
 from beb_lib.storage.provider_requests import (BoardDataRequest)
@@ -25,6 +27,7 @@ METHOD_MAP = {
 
 def _delete_list(card_list: CardListModel):
     CardListUserAccess.delete().where(CardListUserAccess.card_list == card_list).execute()
+    CardListGroupAccess.delete().where(CardListGroupAccess.card_list == card_list).execute()
     for card in card_list.cards:
         _delete_card(card)
     card_list.delete_instance()
@@ -34,21 +37,25 @@ def write_list(request: BoardDataRequest, board: BoardModel, user_id: int) -> (L
     try:
         card_list = CardListModel.get(CardListModel.id == request.id)
 
-        if bool(check_access_to_list(card_list, user_id) & AccessType.WRITE):
+        access = check_access_to_list(card_list, user_id)
+        if bool(access & AccessType.WRITE):
             card_list.name = request.name
             card_list.save()
+            bump_board(card_list.board_id)
             cards = [card_id for card_id in card_list.cards]
             if board is not None:
                 card_list.board = board
 
-            return [CardsList(card_list.name, card_list.id, cards)], None
+            return [CardsList(card_list.name, card_list.id, cards, access)], None
         else:
             return None, BaseError(provider.StorageProviderErrors.ACCESS_DENIED, "This user can't write to this list")
     except DoesNotExist:
-        if bool(check_access_to_board(board, user_id) & AccessType.WRITE):
+        board_access = check_access_to_board(board, user_id)
+        if bool(board_access & AccessType.WRITE):
             card_list = CardListModel.create(name=request.name, board=board)
             CardListUserAccess.create(user_id=user_id, card_list=card_list)
-            return [CardsList(card_list.name, card_list.id)], None
+            bump_board(card_list.board_id)
+            return [CardsList(card_list.name, card_list.id, access=board_access)], None
         else:
             return None, BaseError(provider.StorageProviderErrors.ACCESS_DENIED, "This user has not enough rights for "
                                                                                  "this board")
@@ -70,9 +77,10 @@ def read_list(request: BoardDataRequest, board: BoardModel, user_id: int) -> (Li
                                description="List doesn't exist")
 
     for card_list in query:
-        if bool(check_access_to_list(card_list, user_id) & AccessType.READ):
+        access = check_access_to_list(card_list, user_id)
+        if bool(access & AccessType.READ):
             cards = [card.id for card in card_list.cards]
-            list_response += [CardsList(card_list.name, card_list.id, cards)]
+            list_response += [CardsList(card_list.name, card_list.id, cards, access)]
 
     if not list_response:
         return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
@@ -87,6 +95,7 @@ def delete_list(request: BoardDataRequest, user_id: int) -> (List[CardsList], Ba
         access = check_access_to_list(card_list, user_id)
         if bool(access & AccessType.WRITE):
             CardListUserAccess.delete().where(CardListUserAccess.card_list == card_list).execute()
+            bump_board(card_list.board_id)
             _delete_list(card_list)
         else:
             return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
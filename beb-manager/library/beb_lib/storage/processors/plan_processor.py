@@ -3,6 +3,7 @@ from collections import namedtuple
 
 from beb_lib.domain_entities.supporting import AccessType
 from beb_lib.storage.access_validator import check_access_to_card
+from beb_lib.storage.board_version import bump_board_of_card
 from peewee import DoesNotExist
 
 import beb_lib.storage.provider as provider
@@ -31,6 +32,7 @@ def create_cards_by_plans():
                     last_created_at += datetime.timedelta(seconds=plan.interval)
                 plan.last_created_at = last_created_at
                 plan.save()
+                bump_board_of_card(plan.card_id)
             except DoesNotExist:
                 pass
 
@@ -47,6 +49,7 @@ def write_plan(request: PlanDataRequest, user_id: int, card: CardModel) -> (Plan
         except DoesNotExist:
             plan_model = PlanModel.create(card=card, interval=request.interval.total_seconds(),
                                           last_created_at=request.last_created)
+        bump_board_of_card(card.id)
         return Plan(datetime.timedelta(seconds=plan_model.interval),
                     card.id,
                     plan_model.last_created_at,
@@ -74,6 +77,7 @@ def read_plan(user_id: int, card: CardModel) -> (Plan, BaseError):
 def delete_plan(user_id: int, card: CardModel) -> (None, BaseError):
     if bool(check_access_to_card(card, user_id) & AccessType.WRITE):
         count = PlanModel.delete().where(PlanModel.card == card).execute()
+        bump_board_of_card(card.id)
         if count == 0:
             return None, BaseError(code=provider.StorageProviderErrors.PLAN_DOES_NOT_EXIST,
                                    description="There is no plan for this task")
@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+from peewee import DoesNotExist, chunked, fn
+
+import beb_lib.storage.provider as provider
+from beb_lib.domain_entities.board import Board
+from beb_lib.domain_entities.board_snapshot import BoardSnapshot
+from beb_lib.domain_entities.card_list import CardsList
+from beb_lib.domain_entities.supporting import AccessType
+from beb_lib.domain_entities.tag import Tag
+from beb_lib.provider_interfaces import BaseError
+from beb_lib.storage.access_validator import (check_access_to_board,
+                                              check_access_to_lists,
+                                              check_access_to_cards
+                                              )
+from beb_lib.storage.models import (BoardModel,
+                                    CardListModel,
+                                    CardModel,
+                                    TagModel,
+                                    MAX_QUERY_VARIABLES
+                                    )
+from beb_lib.storage.processors.card_processor import (read_relations,
+                                                       create_card_with_relations,
+                                                       encode_cursor
+                                                       )
+from beb_lib.storage.provider_requests import BoardSnapshotRequest
+
+
+def _count_cards(lists_query, user_id: int) -> dict:
+    """
+    Counts the cards of the lists the user can read without reading them: all cards are counted by the database,
+    minus the cards whose own access rows hide them from the user
+    :return: Number of the cards by list id
+    """
+    counts = dict(CardModel
+                  .select(CardModel.list, fn.COUNT(CardModel.id))
+                  .where(CardModel.list.in_(lists_query))
+                  .group_by(CardModel.list)
+                  .tuples())
+
+    all_cards = CardModel.select(CardModel.id).where(CardModel.list.in_(lists_query))
+    hidden = [card_id for card_id, access in check_access_to_cards(all_cards, user_id).items()
+              if not bool(access & AccessType.READ)]
+    for ids_chunk in chunked(hidden, MAX_QUERY_VARIABLES):
+        for list_id, in CardModel.select(CardModel.list).where(CardModel.id.in_(ids_chunk)).tuples():
+            counts[list_id] -= 1
+    return counts
+
+
+def snapshot_board(request: BoardSnapshotRequest) -> (BoardSnapshot, BaseError):
+    """
+    Reads the board with a fixed number of queries whatever the number of lists and cards is. With request.cards_limit
+    only first cards of each list are read, the rest are read by pages with the returned cursors
+    """
+    user_id = request.request_user_id
+
+    try:
+        board_model = BoardModel.get(BoardModel.id == request.board_id)
+    except DoesNotExist:
+        return None, BaseError(code=provider.StorageProviderErrors.BOARD_DOES_NOT_EXIST,
+                               description="Board doesn't exist")
+
+    board_access = check_access_to_board(board_model, user_id)
+    if not bool(board_access & AccessType.READ):
+        return None, BaseError(code=provider.StorageProviderErrors.ACCESS_DENIED,
+                               description="This user can't read this board")
+
+    lists_query = CardListModel.select(CardListModel.id).where(CardListModel.board == board_model)
+    cards_query = CardModel.select(CardModel.id).where(CardModel.list.in_(lists_query))
+    limit = request.cards_limit
+    if limit is not None:
+        # One more card per list tells whether there is the next page
+        position = fn.ROW_NUMBER().over(partition_by=[CardModel.list], order_by=[-CardModel.priority, CardModel.id])
+        ranked = (CardModel
+                  .select(CardModel.id, position.alias('position'))
+                  .where(CardModel.list.in_(lists_query))
+                  .alias('ranked'))
+        cards_query = CardModel.select(ranked.c.id).from_(ranked).where(ranked.c.position <= limit + 1)
+
+    list_access = check_access_to_lists(lists_query, board_access, user_id)
+    card_access = check_access_to_cards(cards_query, user_id)
+
+    tags = {tag.id: Tag(tag.name, tag.id, tag.color) for tag in TagModel.select()}
+    relations = read_relations(cards_query)
+
+    lists = []
+    cards = {}
+    for card_list in CardListModel.select().where(CardListModel.board == board_model).order_by(CardListModel.id):
+        access = list_access.get(card_list.id, board_access)
+        if bool(access & AccessType.READ):
+            lists.append(CardsList(card_list.name, card_list.id, [], access))
+            cards[card_list.id] = []
+
+    candidates = {}
+    next_cursors = {}
+    for card in CardModel.select().where(CardModel.id.in_(cards_query)).order_by(-CardModel.priority, CardModel.id):
+        if card.list_id not in cards:
+            continue
+        candidates[card.list_id] = candidates.get(card.list_id, 0) + 1
+        if limit is not None and candidates[card.list_id] > limit:
+            continue
+        if limit is not None and candidates[card.list_id] == limit:
+            next_cursors[card.list_id] = encode_cursor(card)
+        access = card_access.get(card.id, AccessType.READ_WRITE) & list_access.get(card.list_id, board_access)
+        if bool(access & AccessType.READ):
+            cards[card.list_id].append(create_card_with_relations(card, relations, access))
+
+    next_cursors = {list_id: cursor for list_id, cursor in next_cursors.items() if candidates[list_id] > limit}
+    for card_list in lists:
+        card_list.cards.extend(card.unique_id for card in cards[card_list.unique_id])
+
+    if limit is None:
+        card_counts = {list_id: len(list_cards) for list_id, list_cards in cards.items()}
+    else:
+        counts = _count_cards(lists_query, user_id)
+        card_counts = {list_id: counts.get(list_id, 0) for list_id in cards}
+
+    board = Board(board_model.name, board_model.id, [card_list.unique_id for card_list in lists], board_access)
+    return BoardSnapshot(board, lists, cards, tags, next_cursors, card_counts), None
+
+
+def process_board_snapshot_call(request: BoardSnapshotRequest) -> (namedtuple, BaseError):
+    snapshot, error = snapshot_board(request)
+
+    return provider.BoardSnapshotResponse(snapshot=snapshot, request_id=request.request_id), error
@@ -7,8 +7,9 @@ from peewee import DoesNotExist
 import beb_lib.storage.provider as provider
 from beb_lib.domain_entities.tag import Tag
 from beb_lib.provider_interfaces import BaseError, RequestType
+from beb_lib.storage.board_version import bump_all_boards
 from beb_lib.storage.models import TagModel, TagCard
-from beb_lib.storage.provider_requests import TagDataRequest
+from beb_lib.storage.provider_requests import TagDataRequest, TagSearchRequest
 
 METHOD_MAP = {
     RequestType.WRITE: lambda request: write_tag(request),
@@ -29,11 +30,13 @@ def write_tag(request: TagDataRequest) -> (List[TagModel], BaseError):
         if request.color is not None:
             tag_model.color = request.color
         tag_model.save()
+        bump_all_boards()
 
         return [Tag(tag_model.name, tag_model.id, tag_model.color)], None
     except DoesNotExist:
         color = request.color if request.color is not None else random.randrange(0xFFFFFF + 1)
         tag_model = TagModel.create(name=request.name, color=color)
+        bump_all_boards()
         return [Tag(tag_model.name, tag_model.id, tag_model.color)], None
 
 
@@ -50,11 +53,28 @@ def read_tag(request: TagDataRequest) -> (List[TagModel], BaseError):
                                    description="Tag doesn't exist")
 
 
+def search_tags(request: TagSearchRequest) -> (List[Tag], BaseError):
+    """
+    Up to request.limit tags whose names start with request.prefix ordered by name
+    """
+    if request.limit is None or request.limit < 1:
+        return None, BaseError(code=provider.StorageProviderErrors.INVALID_REQUEST,
+                               description="Limit should be positive")
+
+    tag_models = (TagModel
+                  .select()
+                  .where(TagModel.name.startswith(request.prefix or ''))
+                  .order_by(TagModel.name, TagModel.id)
+                  .limit(request.limit))
+    return [Tag(tag_model.name, tag_model.id, tag_model.color) for tag_model in tag_models], None
+
+
 def delete_tag(request: TagDataRequest) -> (List[TagModel], BaseError):
     try:
         tag_model = TagModel.get((TagModel.id == request.id) | (TagModel.name == request.name))
         TagCard.delete().where(TagCard.tag == tag_model).execute()
         tag_model.delete_instance()
+        bump_all_boards()
     except DoesNotExist:
         return None, BaseError(code=provider.StorageProviderErrors.TAG_DOES_NOT_EXIST,
                                description="Tag doesn't exist")
@@ -64,3 +84,8 @@ def delete_tag(request: TagDataRequest) -> (List[TagModel], BaseError):
 def process_tag_call(request: TagDataRequest) -> (namedtuple, BaseError):
     tags, error = METHOD_MAP[request.request_type](request)
     return provider.TagDataResponse(tags=tags, request_id=request.request_id), error
+
+
+def process_tag_search_call(request: TagSearchRequest) -> (namedtuple, BaseError):
+    tags, error = search_tags(request)
+    return provider.TagDataResponse(tags=tags, request_id=request.request_id), error
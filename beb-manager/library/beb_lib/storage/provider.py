@@ -1,8 +1,17 @@
 import enum
 from collections import namedtuple
-from peewee import SqliteDatabase
-
-from beb_lib.storage.access_validator import remove_right, add_right, get_right
+from typing import List
+from peewee import DatabaseError, SqliteDatabase
+from playhouse.migrate import SqliteMigrator, migrate
+
+from beb_lib.storage.access_validator import (remove_right,
+                                              add_right,
+                                              get_right,
+                                              get_rights_matrix,
+                                              set_rights,
+                                              set_group_rights
+                                              )
+from beb_lib.storage.board_version import read_board_version, read_card_board_versions, read_boards_of
 from beb_lib.provider_interfaces import RESPONSE_BASE_FIELDS, IProvider, BaseError, RequestType
 from beb_lib.storage.provider_protocol import IStorageProviderProtocol
 from beb_lib.storage.models import (BoardModel,
@@ -15,17 +24,35 @@ from beb_lib.storage.models import (BoardModel,
                                     CardListUserAccess,
                                     BoardUserAccess,
                                     DATABASE_PROXY,
-                                    PlanModel
+                                    PlanModel,
+                                    GroupModel,
+                                    GroupMembership,
+                                    BoardGroupAccess,
+                                    CardListGroupAccess,
+                                    CardGroupAccess
                                     )
 from beb_lib.storage.provider_requests import (BoardDataRequest,
                                                CardDataRequest,
+                                               CardStreamRequest,
                                                AddAccessRightRequest,
                                                RemoveAccessRightRequest,
                                                ListDataRequest,
                                                TagDataRequest,
                                                PlanDataRequest,
                                                GetAccessRightRequest,
-                                               PlanTriggerRequest
+                                               GetAccessRightsMatrixRequest,
+                                               SetAccessRightsRequest,
+                                               SetGroupAccessRightsRequest,
+                                               GroupDataRequest,
+                                               PlanTriggerRequest,
+                                               BoardSnapshotRequest,
+                                               BoardVersionRequest,
+                                               CardBoardVersionsRequest,
+                                               BoardsOfObjectsRequest,
+                                               CardsByIdRequest,
+                                               CardPageRequest,
+                                               CardSearchRequest,
+                                               TagSearchRequest
                                                )
 
 BoardDataResponse = namedtuple('BoardDataResponse', RESPONSE_BASE_FIELDS + ['boards'])
@@ -33,6 +60,9 @@ ListDataResponse = namedtuple('ListDataResponse', RESPONSE_BASE_FIELDS + ['lists
 CardDataResponse = namedtuple('CardDataResponse', RESPONSE_BASE_FIELDS + ['cards'])
 TagDataResponse = namedtuple('TagDataResponse', RESPONSE_BASE_FIELDS + ['tags'])
 PlanDataResponse = namedtuple('PlanDataResponse', RESPONSE_BASE_FIELDS + ['plan'])
+GroupDataResponse = namedtuple('GroupDataResponse', RESPONSE_BASE_FIELDS + ['groups'])
+BoardSnapshotResponse = namedtuple('BoardSnapshotResponse', RESPONSE_BASE_FIELDS + ['snapshot'])
+CardPageResponse = namedtuple('CardPageResponse', RESPONSE_BASE_FIELDS + ['page'])
 
 
 @enum.unique
@@ -45,6 +75,7 @@ class StorageProviderErrors(enum.IntEnum):
     CARD_DOES_NOT_EXIST = enum.auto()
     TAG_DOES_NOT_EXIST = enum.auto()
     PLAN_DOES_NOT_EXIST = enum.auto()
+    GROUP_DOES_NOT_EXIST = enum.auto()
 
 
 class StorageProvider(IProvider, IStorageProviderProtocol):
@@ -52,17 +83,24 @@ class StorageProvider(IProvider, IStorageProviderProtocol):
     Designed to create a kind of interlayer between the core and concrete DB implementation
     """
 
+    # Every table the provider keeps its data in
+    MODELS = [BoardModel,
+              CardListModel,
+              TagModel,
+              CardModel,
+              TagCard,
+              ParentChild,
+              CardUserAccess,
+              CardListUserAccess,
+              BoardUserAccess,
+              PlanModel,
+              GroupModel,
+              GroupMembership,
+              BoardGroupAccess,
+              CardListGroupAccess,
+              CardGroupAccess]
+
     def __init__(self, path_to_db: str):
-        self._models = [BoardModel,
-                        CardListModel,
-                        TagModel,
-                        CardModel,
-                        TagCard,
-                        ParentChild,
-                        CardUserAccess,
-                        CardListUserAccess,
-                        BoardUserAccess,
-                        PlanModel]
         self.database = SqliteDatabase(path_to_db)
         self.database_path = path_to_db
         DATABASE_PROXY.initialize(self.database)
@@ -71,37 +109,99 @@ class StorageProvider(IProvider, IStorageProviderProtocol):
 
         # To prevent import cycle
         from beb_lib.storage.processors.board_processor import process_board_call
-        from beb_lib.storage.processors.card_processor import process_card_call
+        from beb_lib.storage.processors.card_processor import (process_card_call,
+                                                               process_card_stream_call,
+                                                               process_cards_by_id_call,
+                                                               process_card_page_call,
+                                                               process_card_search_call
+                                                               )
         from beb_lib.storage.processors.list_processor import process_list_call
-        from beb_lib.storage.processors.tag_processor import process_tag_call
+        from beb_lib.storage.processors.tag_processor import process_tag_call, process_tag_search_call
         from beb_lib.storage.processors.plan_processor import process_plan_call
+        from beb_lib.storage.processors.snapshot_processor import process_board_snapshot_call
+        from beb_lib.storage.processors.group_processor import process_group_call
 
         self.handler_map = {
             BoardDataRequest: lambda request: process_board_call(request),
             ListDataRequest: lambda request: process_list_call(request),
             CardDataRequest: lambda request: process_card_call(request),
+            CardStreamRequest: lambda request: process_card_stream_call(request),
+            CardsByIdRequest: lambda request: process_cards_by_id_call(request),
+            CardPageRequest: lambda request: process_card_page_call(request),
+            CardSearchRequest: lambda request: process_card_search_call(request),
             TagDataRequest: lambda request: process_tag_call(request),
+            TagSearchRequest: lambda request: process_tag_search_call(request),
             PlanDataRequest: lambda request: process_plan_call(request),
             PlanTriggerRequest: lambda request: process_plan_call(request),
+            BoardSnapshotRequest: lambda request: process_board_snapshot_call(request),
+            GroupDataRequest: lambda request: process_group_call(request),
+            BoardVersionRequest: lambda request: read_board_version(request.board_id),
+            CardBoardVersionsRequest: lambda request: read_card_board_versions(request.card_id),
+            BoardsOfObjectsRequest: lambda request: read_boards_of(request.object_type, request.object_ids),
             AddAccessRightRequest: lambda request: add_right(request.object_type, request.object_id,
                                                              request.user_id, request.access_type),
             RemoveAccessRightRequest: lambda request: remove_right(request.object_type, request.object_id,
                                                                    request.user_id, request.access_type),
             GetAccessRightRequest: lambda request: get_right(request.object_type, request.object_id,
-                                                             request.user_id)
+                                                             request.user_id),
+            GetAccessRightsMatrixRequest: lambda request: get_rights_matrix(request.object_type, request.object_id,
+                                                                            request.user_ids),
+            SetAccessRightsRequest: lambda request: set_rights(request.object_type, request.object_id,
+                                                               request.rights),
+            SetGroupAccessRightsRequest: lambda request: set_group_rights(request.object_type, request.object_id,
+                                                                          request.rights)
         }
 
     def open(self) -> None:
         if not self.is_connected:
             self.database.connect()
             self.is_connected = True
-        self.database.create_tables(self._models)
+        self.database.create_tables(self.MODELS)
+        self._migrate()
         self.archived_list_id = CardListModel.get_or_create(name='Archived')[0].id
 
+    @classmethod
+    def table_names(cls) -> List[str]:
+        """
+        :return: Names of all tables the provider keeps its data in. Doesn't need a provider, creating one switches
+        all models to its database
+        """
+        return [model._meta.table_name for model in cls.MODELS]
+
+    def _migrate(self) -> None:
+        """
+        Adds columns that appeared after the tables of an existing database had been created
+        """
+        columns = [column.name for column in self.database.get_columns(BoardModel._meta.table_name)]
+        if BoardModel.version.column_name not in columns:
+            migrator = SqliteMigrator(self.database)
+            migrate(migrator.add_column(BoardModel._meta.table_name, BoardModel.version.column_name,
+                                        BoardModel.version))
+
     def close(self) -> None:
         self.database.close()
         self.is_connected = False
 
+    def transaction(self):
+        return self.database.atomic()
+
+    def ping(self) -> bool:
+        """
+        Runs a trivial query. The connection is per thread, so it also opens the connection of the calling thread
+        """
+        try:
+            self.database.execute_sql('SELECT 1').fetchone()
+            return True
+        except DatabaseError:
+            return False
+
+    def disconnect(self) -> None:
+        """
+        Closes the connection of the calling thread. The connection opened by open() is closed by close()
+        """
+        if not self.database.is_closed():
+            self.database.close()
+
     def execute(self, request: namedtuple) -> (namedtuple, BaseError):
         if type(request.request_type) is not RequestType:
             return None, BaseError(code=StorageProviderErrors.REQUEST_TYPE_NOT_SPECIFIED,
@@ -113,8 +213,13 @@ class StorageProvider(IProvider, IStorageProviderProtocol):
             return None, BaseError(code=StorageProviderErrors.INVALID_REQUEST,
                                    description='This request cannot be handled by this provider')
 
-        return handler(request)
+        if request.request_type == RequestType.READ:
+            return handler(request)
+
+        # Changes and board version bumps of one request are committed together
+        with self.database.atomic():
+            return handler(request)
 
     def _drop_tables(self):
-        self.database.drop_tables(self._models)
+        self.database.drop_tables(self.MODELS)
         self.close()
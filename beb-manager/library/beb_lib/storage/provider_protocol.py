@@ -1,3 +1,4 @@
+import contextlib
 from abc import ABCMeta, abstractmethod
 
 
@@ -22,3 +23,25 @@ class IStorageProviderProtocol(metaclass=ABCMeta):
         and unloading of DB file.
         """
         pass
+
+    def transaction(self):
+        """
+        Returns context manager that executes all requests made inside it as one unit: either all of them are saved
+        or none. Nested transactions must be rolled back on their own without affecting the outer one.
+        Default implementation doesn't give any guarantees and should be overridden by DBs that support transactions.
+        """
+        return contextlib.nullcontext()
+
+    def ping(self) -> bool:
+        """
+        Checks that DB is reachable from the calling thread and answers requests. Default implementation assumes it is
+        and should be overridden by DBs that can actually check it.
+        """
+        return True
+
+    def disconnect(self) -> None:
+        """
+        Closes the connection of the calling thread, if DB keeps one per thread. Called by threads that stop using DB
+        before they end. Default implementation does nothing.
+        """
+        pass
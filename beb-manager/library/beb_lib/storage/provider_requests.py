@@ -15,6 +15,10 @@ GetAccessRightRequest = namedtuple('GetAccessRightRequest', REQUEST_BASE_FIELDS
                                                                                    'object_id',
                                                                                    'user_id'])
 
+GetAccessRightsMatrixRequest = namedtuple('GetAccessRightsMatrixRequest', REQUEST_BASE_FIELDS + ['object_type',
+                                                                                                 'object_id',
+                                                                                                 'user_ids'])
+
 AddAccessRightRequest = namedtuple('AddAccessRightRequest', REQUEST_BASE_FIELDS + ['object_type',
                                                                                    'object_id',
                                                                                    'user_id',
@@ -28,6 +32,42 @@ PlanDataRequest = namedtuple('PlanDataRequest', REQUEST_ACCESS_FIELDS + ['interv
 
 PlanTriggerRequest = namedtuple('PlanTriggerRequest', REQUEST_BASE_FIELDS)
 
+BoardSnapshotRequest = namedtuple('BoardSnapshotRequest', REQUEST_ACCESS_FIELDS + ['board_id', 'cards_limit'])
+
+CardPageRequest = namedtuple('CardPageRequest', REQUEST_ACCESS_FIELDS + ['list_id', 'after', 'limit'])
+
+BoardVersionRequest = namedtuple('BoardVersionRequest', REQUEST_BASE_FIELDS + ['board_id'])
+
+CardBoardVersionsRequest = namedtuple('CardBoardVersionsRequest', REQUEST_BASE_FIELDS + ['card_id'])
+
+BoardsOfObjectsRequest = namedtuple('BoardsOfObjectsRequest', REQUEST_BASE_FIELDS + ['object_type', 'object_ids'])
+
+CardsByIdRequest = namedtuple('CardsByIdRequest', REQUEST_ACCESS_FIELDS + ['ids'])
+
+CardSearchRequest = namedtuple('CardSearchRequest', REQUEST_ACCESS_FIELDS + ['board_id', 'prefix', 'limit'])
+
+TagSearchRequest = namedtuple('TagSearchRequest', REQUEST_BASE_FIELDS + ['prefix', 'limit'])
+
+
+SetAccessRightsRequest = namedtuple('SetAccessRightsRequest', REQUEST_BASE_FIELDS + ['object_type',
+                                                                                     'object_id',
+                                                                                     'rights'])
+
+
+GroupDataRequest = namedtuple('GroupDataRequest', REQUEST_BASE_FIELDS + ['id', 'name', 'user_ids'])
+
+
+class SetGroupAccessRightsRequest(SetAccessRightsRequest):
+    """
+    Same as SetAccessRightsRequest, but rights are given by group ids
+    """
+
 
 class RemoveAccessRightRequest(AddAccessRightRequest):
     pass
+
+
+class CardStreamRequest(CardDataRequest):
+    """
+    Read request for cards that are returned as an iterator instead of a list
+    """
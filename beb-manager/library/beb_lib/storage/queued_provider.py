@@ -0,0 +1,155 @@
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+from beb_lib.provider_interfaces import BaseError, RequestType
+from beb_lib.storage.provider import StorageProvider
+
+DEFAULT_MAX_BATCH_SIZE = 64
+
+_STOP = object()
+
+
+class QueuedStorageProvider(StorageProvider):
+    """
+    StorageProvider that makes all writes on a single writer thread instead of the threads that request them. SQLite
+    allows one writer at a time, so concurrent writers only wait for each other's locks. The writer thread takes all
+    requests waiting in the queue, up to max_batch_size, and commits them in one transaction. Reads are executed by
+    the calling threads on their own connections. The database is switched to WAL journal, so reads don't wait for
+    the writer either.
+
+    Writes requested inside a transaction of the calling thread are executed by that thread, they have to be
+    committed with the rest of the transaction.
+    """
+
+    def __init__(self, path_to_db: str, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        if path_to_db == ':memory:':
+            raise ValueError("Every connection to ':memory:' is a separate database, use a file")
+        super(QueuedStorageProvider, self).__init__(path_to_db)
+        self.database.init(path_to_db, pragmas={'journal_mode': 'wal'})
+        self.max_batch_size = max_batch_size
+        self.committed_batches = 0
+        self.committed_requests = 0
+        self._queue = queue.Queue()
+        self._writer = None
+        # Guards _closing, so no request is queued after _STOP
+        self._lock = threading.Lock()
+        self._closing = False
+
+    def open(self) -> None:
+        super(QueuedStorageProvider, self).open()
+        if self._writer is None:
+            self._closing = False
+            self._writer = threading.Thread(target=self._write_batches, name='beb-lib-writer', daemon=True)
+            self._writer.start()
+
+    def close(self) -> None:
+        """
+        Executes the writes queued before the call and stops the writer thread. Writes requested while it runs are
+        executed by the threads that request them
+        """
+        if self._writer is not None:
+            with self._lock:
+                self._closing = True
+                self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+            # Nothing is queued after _STOP. Requests are left only if the writer thread died, their callers still wait
+            left = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    left.append(item)
+            if left:
+                self._commit(left)
+        super(QueuedStorageProvider, self).close()
+
+    def _is_queued(self, request: namedtuple) -> bool:
+        return (self._writer is not None and
+                type(request.request_type) is RequestType and
+                request.request_type != RequestType.READ and
+                not self.database.in_transaction())
+
+    def submit(self, request: namedtuple) -> Future:
+        """
+        Queues a write request, reads are executed at once
+
+        :return: Future with the result of execute(). It's done when the request is committed
+        """
+        future = Future()
+        if self._is_queued(request):
+            with self._lock:
+                if not self._closing:
+                    self._queue.put((request, future))
+                    return future
+                writer = self._writer
+            # The writer thread is committing the last batches, another writer would fail on the database lock
+            if writer is not None:
+                writer.join()
+
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(super(QueuedStorageProvider, self).execute(request))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def execute(self, request: namedtuple) -> (namedtuple, BaseError):
+        if self._is_queued(request):
+            return self.submit(request).result()
+        return super(QueuedStorageProvider, self).execute(request)
+
+    def _write_batches(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+    def _commit(self, batch: list) -> None:
+        """
+        Executes every request of the batch in a savepoint of one transaction, so a failed request doesn't roll back
+        the rest. Futures get their results after the commit
+        """
+        results = []
+        try:
+            with self.database.atomic():
+                for request, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        # Base execute makes a savepoint of its atomic() inside this transaction
+                        results.append((future, super(QueuedStorageProvider, self).execute(request), None))
+                    except Exception as error:
+                        results.append((future, None, error))
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.committed_batches += 1
+        self.committed_requests += len(results)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -1,21 +1,47 @@
+import asyncio
 import datetime
+import os
 import random
 import string
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
+
+from playhouse.migrate import SqliteMigrator, migrate
 
 from beb_lib.domain_entities.board import Board
 from beb_lib.domain_entities.card import Card
 from beb_lib.domain_entities.card_list import CardsList
 from beb_lib.domain_entities.supporting import Priority, AccessType
 from beb_lib.domain_entities.tag import Tag
+from beb_lib.model.async_model import AsyncModel, STREAM_CHUNK_SIZE
+from beb_lib.model.model import Model
 from beb_lib.provider_interfaces import RequestType
+from beb_lib.storage.models import BoardUserAccess, BoardModel, ParentChild
 from beb_lib.storage.provider import StorageProvider
+from beb_lib.storage.queued_provider import QueuedStorageProvider
 from beb_lib.storage.provider_requests import (BoardDataRequest,
                                                ListDataRequest,
                                                CardDataRequest,
                                                TagDataRequest,
                                                PlanDataRequest, RemoveAccessRightRequest,
-                                               GetAccessRightRequest
+                                               AddAccessRightRequest,
+                                               BoardSnapshotRequest,
+                                               BoardVersionRequest,
+                                               BoardsOfObjectsRequest,
+                                               CardBoardVersionsRequest,
+                                               CardsByIdRequest,
+                                               CardPageRequest,
+                                               CardSearchRequest,
+                                               TagSearchRequest,
+                                               GetAccessRightRequest,
+                                               GetAccessRightsMatrixRequest,
+                                               SetAccessRightsRequest,
+                                               SetGroupAccessRightsRequest,
+                                               GroupDataRequest,
+                                               CardStreamRequest
                                                )
 
 
@@ -462,6 +488,56 @@ class StorageTest(unittest.TestCase):
         self.assertIsNotNone(result.cards)
         self.assertEqual(len(result.cards), times)
 
+    def test_card_stream(self):
+        user_id = random.randrange(1000)
+
+        card_list = self.create_test_list(user_id)
+        cards = [self.create_test_card(card_list.unique_id, user_id) for _ in range(3)]
+
+        request = CardStreamRequest(request_id=random.randrange(1000000),
+                                    id=None,
+                                    request_user_id=user_id,
+                                    name=None,
+                                    description=None,
+                                    expiration_date=None,
+                                    priority=None,
+                                    assignee=None,
+                                    children=None,
+                                    tags=[],
+                                    list_id=card_list.unique_id,
+                                    board_id=None,
+                                    request_type=RequestType.READ)
+
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertNotIsInstance(result.cards, list)
+        self.assertEqual([card.unique_id for card in result.cards], [card.unique_id for card in cards])
+
+    def test_card_stream_empty(self):
+        user_id = random.randrange(1000)
+
+        card_list = self.create_test_list(user_id)
+
+        request = CardStreamRequest(request_id=random.randrange(1000000),
+                                    id=None,
+                                    request_user_id=user_id,
+                                    name=None,
+                                    description=None,
+                                    expiration_date=None,
+                                    priority=None,
+                                    assignee=None,
+                                    children=None,
+                                    tags=[],
+                                    list_id=card_list.unique_id,
+                                    board_id=None,
+                                    request_type=RequestType.READ)
+
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertEqual(list(result.cards), [])
+
     def test_card_delete(self):
         card = self.create_test_card()
 
@@ -703,3 +779,823 @@ class StorageTest(unittest.TestCase):
         result = self.storage_provider.execute(request)
 
         self.assertEqual(result, AccessType.NONE)
+
+    def test_rights_matrix(self):
+        user_id = random.randrange(100)
+        reader_id, banned_id, other_id = 1001, 1002, 1003
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+
+        self.storage_provider.execute(AddAccessRightRequest(request_id=random.randrange(1000000),
+                                                            request_type=RequestType.WRITE,
+                                                            object_type=CardsList,
+                                                            object_id=card_list.unique_id,
+                                                            user_id=reader_id,
+                                                            access_type=AccessType.READ))
+        self.storage_provider.execute(RemoveAccessRightRequest(request_id=random.randrange(1000000),
+                                                               request_type=RequestType.WRITE,
+                                                               object_type=Board,
+                                                               object_id=board.unique_id,
+                                                               user_id=banned_id,
+                                                               access_type=AccessType.READ_WRITE))
+
+        user_ids = [user_id, reader_id, banned_id, other_id]
+        request = GetAccessRightsMatrixRequest(request_id=random.randrange(1000000),
+                                               request_type=RequestType.READ,
+                                               object_type=Card,
+                                               object_id=card.unique_id,
+                                               user_ids=user_ids)
+        matrix = self.storage_provider.execute(request)
+
+        self.assertEqual(matrix, {user_id: AccessType.READ_WRITE,
+                                  reader_id: AccessType.READ,
+                                  banned_id: AccessType.NONE,
+                                  other_id: AccessType.READ_WRITE})
+
+        for matrix_user_id in user_ids:
+            request = GetAccessRightRequest(request_id=random.randrange(1000000),
+                                            request_type=RequestType.READ,
+                                            object_type=Card,
+                                            object_id=card.unique_id,
+                                            user_id=matrix_user_id)
+            self.assertEqual(self.storage_provider.execute(request), matrix[matrix_user_id])
+
+        users_with_rows = self.rights_matrix(Card, card.unique_id, None)
+        self.assertEqual(users_with_rows[reader_id], AccessType.READ)
+        self.assertEqual(users_with_rows[banned_id], AccessType.NONE)
+        self.assertNotIn(other_id, users_with_rows)
+
+    def set_rights(self, object_type: type, object_id: int, rights: dict):
+        request = SetAccessRightsRequest(request_id=random.randrange(1000000),
+                                         request_type=RequestType.WRITE,
+                                         object_type=object_type,
+                                         object_id=object_id,
+                                         rights=rights)
+        self.assertTrue(self.storage_provider.execute(request))
+
+    def rights_matrix(self, object_type: type, object_id: int, user_ids: list) -> dict:
+        request = GetAccessRightsMatrixRequest(request_id=random.randrange(1000000),
+                                               request_type=RequestType.READ,
+                                               object_type=object_type,
+                                               object_id=object_id,
+                                               user_ids=user_ids)
+        return self.storage_provider.execute(request)
+
+    def test_set_rights(self):
+        board = self.create_test_board()
+        user_ids = list(range(1000, 1500))
+
+        self.set_rights(Board, board.unique_id, {user_id: AccessType.READ for user_id in user_ids})
+        self.assertEqual(set(self.rights_matrix(Board, board.unique_id, user_ids).values()), {AccessType.READ})
+
+        rights = {user_id: AccessType.WRITE for user_id in user_ids[:100]}
+        rights.update({user_id: None for user_id in user_ids[100:200]})
+        self.set_rights(Board, board.unique_id, rights)
+
+        matrix = self.rights_matrix(Board, board.unique_id, user_ids)
+        self.assertEqual(matrix[user_ids[0]], AccessType.WRITE)
+        self.assertEqual(matrix[user_ids[100]], AccessType.READ_WRITE)
+        self.assertEqual(matrix[user_ids[200]], AccessType.READ)
+        self.assertEqual(BoardUserAccess.select().where((BoardUserAccess.board == board.unique_id) &
+                                                        BoardUserAccess.user_id.in_(user_ids)).count(), 400)
+
+    def test_set_rights_missing_object(self):
+        request = SetAccessRightsRequest(request_id=random.randrange(1000000),
+                                         request_type=RequestType.WRITE,
+                                         object_type=Card,
+                                         object_id=random.randrange(1000),
+                                         rights={1: AccessType.READ})
+        self.assertIsNone(self.storage_provider.execute(request))
+
+    def write_group(self, user_ids: list, group_id: int = None):
+        request = GroupDataRequest(request_id=random.randrange(1000000),
+                                   request_type=RequestType.WRITE,
+                                   id=group_id,
+                                   name="Some group",
+                                   user_ids=user_ids)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        return result.groups[0]
+
+    def test_group_write(self):
+        group = self.write_group([1001, 1002, 1003])
+        self.assertEqual(group.user_ids, [1001, 1002, 1003])
+
+        group = self.write_group([1002, 1004], group.unique_id)
+        self.assertEqual(group.user_ids, [1002, 1004])
+
+    def test_group_access(self):
+        user_id = random.randrange(100)
+        member_id, overridden_id, stranger_id = 1001, 1002, 1003
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+
+        readers = self.write_group([member_id, overridden_id])
+        writers = self.write_group([member_id])
+        request = SetGroupAccessRightsRequest(request_id=random.randrange(1000000),
+                                              request_type=RequestType.WRITE,
+                                              object_type=Board,
+                                              object_id=board.unique_id,
+                                              rights={readers.unique_id: AccessType.READ,
+                                                      writers.unique_id: AccessType.WRITE})
+        self.assertTrue(self.storage_provider.execute(request))
+        self.set_rights(Board, board.unique_id, {overridden_id: AccessType.NONE, stranger_id: AccessType.READ_WRITE})
+
+        user_ids = [user_id, member_id, overridden_id, stranger_id]
+        expected = {user_id: AccessType.READ_WRITE,
+                    member_id: AccessType.READ_WRITE,
+                    overridden_id: AccessType.NONE,
+                    stranger_id: AccessType.READ_WRITE}
+        self.assertEqual(self.rights_matrix(Card, card.unique_id, user_ids), expected)
+
+        for matrix_user_id in user_ids:
+            request = GetAccessRightRequest(request_id=random.randrange(1000000),
+                                            request_type=RequestType.READ,
+                                            object_type=Card,
+                                            object_id=card.unique_id,
+                                            user_id=matrix_user_id)
+            self.assertEqual(self.storage_provider.execute(request), expected[matrix_user_id])
+
+        self.assertEqual(self.snapshot(board.unique_id, member_id).board.access, AccessType.READ_WRITE)
+        self.assertEqual(BoardUserAccess.select().where((BoardUserAccess.board == board.unique_id) &
+                                                        BoardUserAccess.user_id.in_(user_ids[1:])).count(), 1)
+
+        request = GroupDataRequest(request_id=random.randrange(1000000),
+                                   request_type=RequestType.DELETE,
+                                   id=writers.unique_id,
+                                   name=None,
+                                   user_ids=None)
+        self.assertIsNone(self.storage_provider.execute(request)[1])
+        self.assertEqual(self.rights_matrix(Board, board.unique_id, [member_id]), {member_id: AccessType.READ})
+
+    def test_read_access(self):
+        user_id = random.randrange(100)
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+
+        self.assertEqual(board.access, AccessType.READ_WRITE)
+        self.assertEqual(card_list.access, AccessType.READ_WRITE)
+        self.assertEqual(card.access, AccessType.READ_WRITE)
+
+        request = AddAccessRightRequest(request_id=random.randrange(1000000),
+                                        request_type=RequestType.WRITE,
+                                        object_type=Card,
+                                        object_id=card.unique_id,
+                                        user_id=user_id,
+                                        access_type=AccessType.READ)
+        self.storage_provider.execute(request)
+
+        request = CardDataRequest(request_id=random.randrange(1000000),
+                                  id=card.unique_id,
+                                  request_user_id=user_id,
+                                  name=None,
+                                  description=None,
+                                  expiration_date=None,
+                                  priority=None,
+                                  assignee=None,
+                                  children=None,
+                                  tags=[],
+                                  list_id=None,
+                                  board_id=None,
+                                  request_type=RequestType.READ)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertEqual(result.cards[0].access, AccessType.READ)
+
+        request = ListDataRequest(request_id=random.randrange(1000000),
+                                  board_id=board.unique_id,
+                                  request_user_id=user_id,
+                                  id=card_list.unique_id,
+                                  name=None,
+                                  request_type=RequestType.READ)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertEqual(result.lists[0].access, AccessType.READ_WRITE)
+
+    def snapshot(self, board_id: int, user_id: int, cards_limit: int = None):
+        request = BoardSnapshotRequest(request_id=random.randrange(1000000),
+                                       request_type=RequestType.READ,
+                                       request_user_id=user_id,
+                                       board_id=board_id,
+                                       cards_limit=cards_limit)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        return result.snapshot
+
+    def test_board_snapshot(self):
+        user_id = random.randrange(100)
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        hidden_list = self.create_test_list(user_id, board.unique_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+        read_only_card = self.create_test_card(card_list.unique_id, user_id)
+        self.create_test_card(hidden_list.unique_id, user_id)
+
+        self.storage_provider.execute(AddAccessRightRequest(request_id=random.randrange(1000000),
+                                                            request_type=RequestType.WRITE,
+                                                            object_type=Card,
+                                                            object_id=read_only_card.unique_id,
+                                                            user_id=user_id,
+                                                            access_type=AccessType.READ))
+        self.storage_provider.execute(RemoveAccessRightRequest(request_id=random.randrange(1000000),
+                                                               request_type=RequestType.WRITE,
+                                                               object_type=CardsList,
+                                                               object_id=hidden_list.unique_id,
+                                                               user_id=user_id,
+                                                               access_type=AccessType.READ_WRITE))
+
+        snapshot = self.snapshot(board.unique_id, user_id)
+
+        self.assertEqual(snapshot.board.unique_id, board.unique_id)
+        self.assertEqual(snapshot.board.access, AccessType.READ_WRITE)
+        self.assertNotIn(hidden_list.unique_id, [snapshot_list.unique_id for snapshot_list in snapshot.lists])
+
+        snapshot_cards = snapshot.cards_of(card_list.unique_id)
+        self.assertEqual([snapshot_card.unique_id for snapshot_card in snapshot_cards],
+                         [card.unique_id, read_only_card.unique_id])
+        self.assertEqual(snapshot_cards[0].tags, card.tags)
+        self.assertEqual(snapshot_cards[0].access, AccessType.READ_WRITE)
+        self.assertEqual(snapshot_cards[1].access, AccessType.READ)
+        for tag in card.tags:
+            self.assertIn(tag, snapshot.tags)
+
+    def test_board_snapshot_query_count(self):
+        user_id = random.randrange(100)
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+
+        def count_queries() -> int:
+            with mock.patch.object(self.storage_provider.database, 'execute_sql',
+                                   wraps=self.storage_provider.database.execute_sql) as execute_sql:
+                self.snapshot(board.unique_id, user_id)
+            return execute_sql.call_count
+
+        self.create_test_card(card_list.unique_id, user_id)
+        queries = count_queries()
+
+        for _ in range(5):
+            self.create_test_card(self.create_test_list(user_id, board.unique_id).unique_id, user_id)
+
+        self.assertEqual(count_queries(), queries)
+
+    def test_transaction_rollback(self):
+        user_id = random.randrange(100)
+
+        kept_board = self.create_test_board(user_id)
+
+        with self.assertRaises(RuntimeError):
+            with self.storage_provider.transaction():
+                self.create_test_board(user_id)
+                raise RuntimeError
+
+        request = BoardDataRequest(request_id=random.randrange(1000000),
+                                   request_user_id=user_id,
+                                   id=None,
+                                   name=None,
+                                   request_type=RequestType.READ)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertEqual([board.unique_id for board in result.boards], [kept_board.unique_id])
+
+    def test_nested_transaction_rollback(self):
+        user_id = random.randrange(100)
+
+        with self.storage_provider.transaction():
+            outer_board = self.create_test_board(user_id)
+            try:
+                with self.storage_provider.transaction():
+                    self.create_test_board(user_id)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        request = BoardDataRequest(request_id=random.randrange(1000000),
+                                   request_user_id=user_id,
+                                   id=None,
+                                   name=None,
+                                   request_type=RequestType.READ)
+        result, error = self.storage_provider.execute(request)
+
+        self.assertIsNone(error)
+        self.assertEqual([board.unique_id for board in result.boards], [outer_board.unique_id])
+
+    def board_version(self, board_id: int):
+        return self.storage_provider.execute(BoardVersionRequest(request_id=random.randrange(1000000),
+                                                                 request_type=RequestType.READ,
+                                                                 board_id=board_id))
+
+    def test_board_version(self):
+        user_id = random.randrange(100)
+
+        board = self.create_test_board(user_id)
+        other_board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        version = self.board_version(board.unique_id)
+
+        card = self.create_test_card(card_list.unique_id, user_id)
+        self.assertGreater(self.board_version(board.unique_id), version)
+        version = self.board_version(board.unique_id)
+
+        self.snapshot(board.unique_id, user_id)
+        self.assertEqual(self.board_version(board.unique_id), version)
+
+        self.storage_provider.execute(AddAccessRightRequest(request_id=random.randrange(1000000),
+                                                            request_type=RequestType.WRITE,
+                                                            object_type=Card,
+                                                            object_id=card.unique_id,
+                                                            user_id=user_id + 1,
+                                                            access_type=AccessType.READ))
+        self.assertGreater(self.board_version(board.unique_id), version)
+        version = self.board_version(board.unique_id)
+
+        self.set_rights(CardsList, card_list.unique_id, {user_id + 2: AccessType.NONE})
+        self.assertGreater(self.board_version(board.unique_id), version)
+        version = self.board_version(board.unique_id)
+        other_version = self.board_version(other_board.unique_id)
+
+        self.create_test_tag()
+        self.assertGreater(self.board_version(board.unique_id), version)
+        self.assertGreater(self.board_version(other_board.unique_id), other_version)
+
+        self.assertIsNone(self.board_version(other_board.unique_id + 1))
+
+    def test_board_version_migration(self):
+        board = self.create_test_board()
+        migrate(SqliteMigrator(self.storage_provider.database).drop_column(BoardModel._meta.table_name,
+                                                                           BoardModel.version.column_name))
+
+        self.storage_provider.open()
+
+        self.assertEqual(self.board_version(board.unique_id), 0)
+
+    def test_boards_of(self):
+        user_id = random.randrange(100)
+
+        board_id = self.create_test_board(user_id).unique_id
+        other_board_id = self.create_test_board(user_id).unique_id
+        card_list = self.create_test_list(user_id, board_id)
+        other_list = self.create_test_list(user_id, other_board_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+        other_card = self.create_test_card(other_list.unique_id, user_id)
+
+        def boards_of(object_type: type, object_ids: list):
+            return self.storage_provider.execute(BoardsOfObjectsRequest(request_id=random.randrange(1000000),
+                                                                        request_type=RequestType.READ,
+                                                                        object_type=object_type,
+                                                                        object_ids=object_ids))
+
+        self.assertEqual(boards_of(CardsList, [card_list.unique_id, other_list.unique_id, other_list.unique_id + 1]),
+                         {card_list.unique_id: board_id, other_list.unique_id: other_board_id})
+        self.assertEqual(boards_of(Card, [card.unique_id, other_card.unique_id, other_card.unique_id + 1]),
+                         {card.unique_id: board_id, other_card.unique_id: other_board_id})
+        self.assertIsNone(boards_of(Board, [board_id]))
+
+    def test_card_board_versions(self):
+        user_id = random.randrange(100)
+
+        board_id = self.create_test_board(user_id).unique_id
+        other_board_id = self.create_test_board(user_id).unique_id
+        card_list = self.create_test_list(user_id, board_id)
+        other_list = self.create_test_list(user_id, other_board_id)
+        card = self.create_test_card(card_list.unique_id, user_id)
+        child = self.create_test_card(other_list.unique_id, user_id)
+        ParentChild.create(parent=card.unique_id, child=child.unique_id)
+
+        def card_board_versions(card_id: int):
+            return self.storage_provider.execute(CardBoardVersionsRequest(request_id=random.randrange(1000000),
+                                                                          request_type=RequestType.READ,
+                                                                          card_id=card_id))
+
+        versions = card_board_versions(card.unique_id)
+        self.assertEqual(versions, {board_id: self.board_version(board_id),
+                                    other_board_id: self.board_version(other_board_id)})
+
+        last_card = self.create_test_card(other_list.unique_id, user_id)
+        new_versions = card_board_versions(card.unique_id)
+        self.assertGreater(new_versions[other_board_id], versions[other_board_id])
+
+        self.assertEqual(card_board_versions(child.unique_id), {other_board_id: new_versions[other_board_id]})
+        self.assertEqual(card_board_versions(last_card.unique_id + 1), {})
+
+    def test_ping(self):
+        self.assertTrue(self.storage_provider.ping())
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.storage_provider.ping()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [True])
+
+    def test_memoized_reads(self):
+        model = Model(None, custom_storage_provider=self.storage_provider)
+        user_id = random.randrange(100)
+        board = self.create_test_board(user_id)
+
+        with model.memoized_reads() as memo:
+            first = model.board_read(board.unique_id, request_user_id=user_id)[0]
+            first.name = 'Changed by the caller'
+            second = model.board_read(board.unique_id, request_user_id=user_id)[0]
+            self.assertEqual(second.name, board.name)
+            self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+            model.board_write(board.unique_id, 'New name', request_user_id=user_id)
+            self.assertEqual(memo.invalidations, 1)
+            self.assertEqual(model.board_read(board.unique_id, request_user_id=user_id)[0].name, 'New name')
+
+            with self.assertRaises(ValueError):
+                with model.transaction():
+                    model.board_write(board.unique_id, 'Rolled back', request_user_id=user_id)
+                    model.board_read(board.unique_id, request_user_id=user_id)
+                    raise ValueError
+            self.assertEqual(model.board_read(board.unique_id, request_user_id=user_id)[0].name, 'New name')
+
+        model.board_read(board.unique_id, request_user_id=user_id)
+        self.assertEqual(memo.misses, 4)
+
+    def test_cards_by_id(self):
+        user_id = random.randrange(100)
+
+        card_list = self.create_test_list(user_id)
+        cards = [self.create_test_card(card_list.unique_id, user_id) for _ in range(3)]
+        hidden_card = self.create_test_card(card_list.unique_id, user_id)
+        self.set_rights(Card, hidden_card.unique_id, {user_id: AccessType.NONE})
+
+        ids = [cards[2].unique_id, hidden_card.unique_id, cards[0].unique_id, cards[2].unique_id + 1000,
+               cards[1].unique_id]
+        result, error = self.storage_provider.execute(CardsByIdRequest(request_id=random.randrange(1000000),
+                                                                       request_type=RequestType.READ,
+                                                                       request_user_id=user_id,
+                                                                       ids=ids))
+
+        self.assertIsNone(error)
+        self.assertEqual([card.unique_id for card in result.cards],
+                         [cards[2].unique_id, cards[0].unique_id, cards[1].unique_id])
+        self.assertEqual(set(result.cards[0].tags), set(cards[2].tags))
+        self.assertEqual(result.cards[0].access, AccessType.READ_WRITE)
+
+    def card_page(self, list_id: int, user_id: int, after: str = None, limit: int = 2):
+        return self.storage_provider.execute(CardPageRequest(request_id=random.randrange(1000000),
+                                                             request_type=RequestType.READ,
+                                                             request_user_id=user_id,
+                                                             list_id=list_id,
+                                                             after=after,
+                                                             limit=limit))
+
+    def test_card_page(self):
+        user_id = random.randrange(100)
+
+        card_list = self.create_test_list(user_id)
+        cards = [self.create_test_card(card_list.unique_id, user_id) for _ in range(6)]
+        hidden_card = cards.pop(1)
+        self.set_rights(Card, hidden_card.unique_id, {user_id: AccessType.NONE})
+        expected = [card.unique_id for card in sorted(cards, key=lambda card: (-card.priority, card.unique_id))]
+
+        read = []
+        cursor = None
+        while True:
+            result, error = self.card_page(card_list.unique_id, user_id, cursor)
+            self.assertIsNone(error)
+            self.assertLessEqual(len(result.page.cards), 2)
+            read += [card.unique_id for card in result.page.cards]
+            cursor = result.page.next_cursor
+            if cursor is None:
+                break
+            self.assertEqual(len(result.page.cards), 2)
+
+        self.assertEqual(read, expected)
+
+        result, error = self.card_page(card_list.unique_id, user_id, 'not a cursor')
+        self.assertIsNotNone(error)
+
+    def test_card_search(self):
+        user_id = random.randrange(100)
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        cards = {}
+        for name in ['Alpha', 'alpine', 'Beta', 'al_x', 'al%y']:
+            result, error = self.storage_provider.execute(CardDataRequest(request_id=random.randrange(1000000),
+                                                                          id=None,
+                                                                          request_user_id=user_id,
+                                                                          name=name,
+                                                                          description=None,
+                                                                          expiration_date=None,
+                                                                          priority=Priority.MEDIUM,
+                                                                          assignee=None,
+                                                                          children=None,
+                                                                          tags=None,
+                                                                          list_id=card_list.unique_id,
+                                                                          board_id=None,
+                                                                          request_type=RequestType.WRITE))
+            self.assertIsNone(error)
+            cards[name] = result.cards[0]
+        self.set_rights(Card, cards['al_x'].unique_id, {user_id: AccessType.NONE})
+        self.create_test_card(self.create_test_list(user_id).unique_id, user_id)
+
+        def search(prefix: str, limit: int = 10):
+            result, error = self.storage_provider.execute(CardSearchRequest(request_id=random.randrange(1000000),
+                                                                            request_type=RequestType.READ,
+                                                                            request_user_id=user_id,
+                                                                            board_id=board.unique_id,
+                                                                            prefix=prefix,
+                                                                            limit=limit))
+            self.assertIsNone(error)
+            return [card.name for card in result.cards]
+
+        self.assertEqual(search('al'), ['Alpha', 'al%y', 'alpine'])
+        self.assertEqual(search('al', limit=2), ['Alpha', 'al%y'])
+        self.assertEqual(search('al_'), [])
+        self.assertEqual(search('Some'), [])
+        self.assertEqual(len(search('')), 4)
+
+        result, error = self.storage_provider.execute(CardSearchRequest(request_id=random.randrange(1000000),
+                                                                        request_type=RequestType.READ,
+                                                                        request_user_id=user_id,
+                                                                        board_id=board.unique_id + 1000,
+                                                                        prefix='',
+                                                                        limit=10))
+        self.assertIsNotNone(error)
+
+    def test_tag_search(self):
+        prefix = ''.join(random.choices(string.ascii_letters, k=8))
+        for suffix in ['b', 'a', 'c']:
+            self.storage_provider.execute(TagDataRequest(request_id=random.randrange(1000000),
+                                                         id=None,
+                                                         name=prefix + suffix,
+                                                         color=None,
+                                                         request_type=RequestType.WRITE))
+
+        result, error = self.storage_provider.execute(TagSearchRequest(request_id=random.randrange(1000000),
+                                                                       request_type=RequestType.READ,
+                                                                       prefix=prefix,
+                                                                       limit=2))
+
+        self.assertIsNone(error)
+        self.assertEqual([tag.name for tag in result.tags], [prefix + 'a', prefix + 'b'])
+
+    def test_board_snapshot_cards_limit(self):
+        user_id = random.randrange(100)
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        short_list = self.create_test_list(user_id, board.unique_id)
+        cards = [self.create_test_card(card_list.unique_id, user_id) for _ in range(5)]
+        self.create_test_card(short_list.unique_id, user_id)
+        expected = [card.unique_id for card in sorted(cards, key=lambda card: (-card.priority, card.unique_id))]
+
+        snapshot = self.snapshot(board.unique_id, user_id, cards_limit=2)
+
+        self.assertEqual([card.unique_id for card in snapshot.cards_of(card_list.unique_id)], expected[:2])
+        self.assertEqual(len(snapshot.cards_of(short_list.unique_id)), 1)
+        self.assertIsNone(snapshot.next_cursor_of(short_list.unique_id))
+
+        result, error = self.card_page(card_list.unique_id, user_id, snapshot.next_cursor_of(card_list.unique_id),
+                                       limit=10)
+        self.assertIsNone(error)
+        self.assertEqual([card.unique_id for card in result.page.cards], expected[2:])
+        self.assertIsNone(result.page.next_cursor)
+
+    def test_board_snapshot_card_counts(self):
+        user_id = random.randrange(100)
+        other_id = user_id + 100
+
+        board = self.create_test_board(user_id)
+        card_list = self.create_test_list(user_id, board.unique_id)
+        empty_list = self.create_test_list(user_id, board.unique_id)
+        cards = [self.create_test_card(card_list.unique_id, user_id) for _ in range(3)]
+        self.set_rights(Card, cards[0].unique_id, {other_id: AccessType.NONE})
+
+        for cards_limit in (None, 0):
+            snapshot = self.snapshot(board.unique_id, other_id, cards_limit=cards_limit)
+            self.assertEqual(snapshot.card_count_of(card_list.unique_id), 2)
+            self.assertEqual(snapshot.card_count_of(empty_list.unique_id), 0)
+
+        snapshot = self.snapshot(board.unique_id, other_id, cards_limit=0)
+        self.assertEqual(snapshot.cards_of(card_list.unique_id), [])
+        self.assertEqual(self.snapshot(board.unique_id, user_id, cards_limit=1).card_count_of(card_list.unique_id), 3)
+
+
+class AsyncModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        # Threads of AsyncModel have connections of their own, they would see separate databases in ':memory:'
+        self.model = Model(os.path.join(self.directory.name, 'beb.sqlite3'))
+        self.async_model = AsyncModel(self.model)
+
+    def tearDown(self):
+        self.async_model.close()
+        self.model.storage_provider.close()
+        self.directory.cleanup()
+
+    def test_reads_and_writes(self):
+        async def scenario():
+            boards = await asyncio.gather(*[self.async_model.board_write(board_name='Board {}'.format(i),
+                                                                         request_user_id=1) for i in range(5)])
+            read = await asyncio.gather(*[self.async_model.board_read(board.unique_id, request_user_id=1)
+                                          for board in boards])
+            return boards, read
+
+        boards, read = asyncio.run(scenario())
+
+        self.assertEqual([board.name for board in boards], ['Board {}'.format(i) for i in range(5)])
+        self.assertEqual([result[0].unique_id for result in read], [board.unique_id for board in boards])
+
+    def test_transaction(self):
+        async def scenario():
+            async with self.async_model.transaction():
+                board = await self.async_model.board_write(board_name='Committed', request_user_id=1)
+                card_list = await self.async_model.list_write(board.unique_id, list_name='List', request_user_id=1)
+
+            with self.assertRaises(ValueError):
+                async with self.async_model.transaction():
+                    await self.async_model.board_write(board.unique_id, 'Rolled back', request_user_id=1)
+                    raise ValueError
+
+            async def cancelled():
+                async with self.async_model.transaction():
+                    await self.async_model.board_write(board.unique_id, 'Cancelled', request_user_id=1)
+                    await asyncio.sleep(10)
+
+            task = asyncio.ensure_future(cancelled())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            return (await self.async_model.board_read(board.unique_id, request_user_id=1))[0], card_list
+
+        board, card_list = asyncio.run(scenario())
+
+        self.assertEqual(board.name, 'Committed')
+        self.assertIn(card_list.unique_id, board.lists)
+
+    def test_card_stream(self):
+        async def scenario():
+            card_list = await self.async_model.list_write(
+                (await self.async_model.board_write(board_name='Board', request_user_id=1)).unique_id,
+                list_name='List', request_user_id=1)
+            for i in range(STREAM_CHUNK_SIZE + 1):
+                await self.async_model.card_write(card_list.unique_id, Card(name='Card {}'.format(i)), 1)
+            return [card async for card in self.async_model.card_stream(card_list.unique_id, request_user_id=1)]
+
+        self.assertEqual(len(asyncio.run(scenario())), STREAM_CHUNK_SIZE + 1)
+
+    def test_card_stream_limit(self):
+        async_model = AsyncModel(self.model, max_streams=1)
+
+        async def scenario():
+            card_list = await async_model.list_write(
+                (await async_model.board_write(board_name='Board', request_user_id=1)).unique_id,
+                list_name='List', request_user_id=1)
+            await async_model.card_write(card_list.unique_id, Card(name='Card'), 1)
+
+            first = async_model.card_stream(card_list.unique_id, request_user_id=1)
+            second = async_model.card_stream(card_list.unique_id, request_user_id=1)
+            await first.__anext__()
+            waiting = asyncio.ensure_future(second.__anext__())
+            await asyncio.sleep(0.1)
+            self.assertFalse(waiting.done())
+
+            await first.aclose()
+            card = await waiting
+            await second.aclose()
+            return card
+
+        try:
+            self.assertEqual(asyncio.run(scenario()).name, 'Card')
+        finally:
+            async_model.close()
+
+    def test_close_disconnects_threads(self):
+        threads = []
+        disconnect = self.model.disconnect
+
+        def record():
+            threads.append(threading.current_thread().name.rsplit('_', 1)[0])
+            disconnect()
+
+        async def scenario():
+            await self.async_model.ping()
+            return [card async for card in self.async_model.card_stream(request_user_id=1)]
+
+        with mock.patch.object(self.model, 'disconnect', record):
+            asyncio.run(scenario())
+            self.async_model.close()
+            for thread in threading.enumerate():
+                if thread.name.startswith('beb-lib-stream'):
+                    thread.join()
+
+        self.assertEqual(sorted(threads), ['beb-lib-reader'] * self.async_model.max_readers +
+                         ['beb-lib-stream', 'beb-lib-writer'])
+
+
+class QueuedStorageProviderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage_provider = QueuedStorageProvider(os.path.join(self.directory.name, 'beb.sqlite3'))
+        self.storage_provider.open()
+
+    def tearDown(self):
+        self.storage_provider.close()
+        self.directory.cleanup()
+
+    @staticmethod
+    def board_request(name: str, request_type: RequestType = RequestType.WRITE, board_id: int = None):
+        return BoardDataRequest(request_id=random.randrange(1000000),
+                                request_user_id=1,
+                                id=board_id,
+                                name=name,
+                                request_type=request_type)
+
+    def test_concurrent_writes(self):
+        futures = [self.storage_provider.submit(self.board_request('Board {}'.format(i))) for i in range(50)]
+
+        results = [future.result(timeout=10) for future in futures]
+
+        self.assertEqual([error for _, error in results], [None] * 50)
+        self.assertEqual([result.boards[0].name for result, _ in results], ['Board {}'.format(i) for i in range(50)])
+        self.assertEqual(self.storage_provider.committed_requests, 50)
+        self.assertLess(self.storage_provider.committed_batches, 50)
+
+        result, error = self.storage_provider.execute(self.board_request(None, RequestType.READ))
+        self.assertIsNone(error)
+        self.assertEqual(len(result.boards), 50)
+
+    def test_writes_from_threads(self):
+        names = []
+
+        def write(thread_number: int):
+            for i in range(10):
+                name = 'Board {} {}'.format(thread_number, i)
+                result, error = self.storage_provider.execute(self.board_request(name))
+                self.assertIsNone(error)
+                names.append(result.boards[0].name)
+
+        threads = [threading.Thread(target=write, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(names), 40)
+        result, error = self.storage_provider.execute(self.board_request(None, RequestType.READ))
+        self.assertEqual(sorted(board.name for board in result.boards), sorted(names))
+
+    def test_transaction_bypasses_queue(self):
+        with self.assertRaises(ValueError):
+            with self.storage_provider.transaction():
+                self.storage_provider.execute(self.board_request('Rolled back'))
+                raise ValueError
+
+        result, error = self.storage_provider.execute(self.board_request(None, RequestType.READ))
+        self.assertIsNotNone(error)
+        self.assertEqual(self.storage_provider.committed_requests, 0)
+
+    def test_writes_during_close(self):
+        futures = []
+
+        def write():
+            for i in range(200):
+                futures.append(self.storage_provider.submit(self.board_request('Board {}'.format(i))))
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        while not futures:
+            time.sleep(0.001)
+        self.storage_provider.close()
+        thread.join()
+
+        results = [future.result(timeout=10) for future in futures]
+        self.assertEqual([error for _, error in results], [None] * 200)
+        result, error = self.storage_provider.execute(self.board_request(None, RequestType.READ))
+        self.assertEqual(len(result.boards), 200)
+
+    def test_close_executes_requests_left_in_queue(self):
+        self.storage_provider.close()
+        # Writer thread that ends at once leaves the queued request to close()
+        with mock.patch.object(self.storage_provider, '_write_batches', lambda: None):
+            self.storage_provider.open()
+            future = self.storage_provider.submit(self.board_request('Left'))
+            self.storage_provider.close()
+
+        result, error = future.result(timeout=0)
+        self.assertIsNone(error)
+        self.assertEqual(result.boards[0].name, 'Left')
+
+    def test_memory_database(self):
+        with self.assertRaises(ValueError):
+            QueuedStorageProvider(':memory:')
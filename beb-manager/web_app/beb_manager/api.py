@@ -0,0 +1,224 @@
+"""
+JSON API over the library model. Every listing accepts `fields` with comma separated names of the fields to return,
+all fields are returned without it. Cards of a list are returned by pages, pass `next_cursor` of a page as `after`
+to get the next one
+
+Autocomplete views answer with up to `limit` objects whose names start with `q` as {"results": [{"id", "text"}]}
+"""
+import functools
+
+import beb_lib.model.exceptions as beb_exceptions
+from beb_lib.domain_entities.plan import Plan
+from beb_lib.domain_entities.supporting import AccessType
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+
+from beb_manager import model_registry
+from beb_manager.model_registry import MODEL
+
+MAX_PAGE_SIZE = 1000
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def _access(value: AccessType):
+    """
+    'rw', 'r', 'w' or '' for no access
+    """
+    if value is None:
+        return None
+    return ('r' if bool(value & AccessType.READ) else '') + ('w' if bool(value & AccessType.WRITE) else '')
+
+
+BOARD_FIELDS = {
+    'id': lambda board: board.unique_id,
+    'name': lambda board: board.name,
+    'lists': lambda board: list(board.lists) if board.lists is not None else [],
+    'access': lambda board: _access(board.access),
+}
+
+LIST_FIELDS = {
+    'id': lambda card_list: card_list.unique_id,
+    'name': lambda card_list: card_list.name,
+    'cards': lambda card_list: list(card_list.cards) if card_list.cards is not None else [],
+    'access': lambda card_list: _access(card_list.access),
+}
+
+CARD_FIELDS = {
+    'id': lambda card: card.unique_id,
+    'name': lambda card: card.name,
+    'description': lambda card: card.description,
+    'list_id': lambda card: card.list_id,
+    'priority': lambda card: int(card.priority) if card.priority is not None else None,
+    'expiration_date': lambda card: _datetime(card.expiration_date),
+    'user_id': lambda card: card.user_id,
+    'assignee_id': lambda card: card.assignee_id,
+    'tags': lambda card: list(card.tags) if card.tags is not None else [],
+    'children': lambda card: list(card.children) if card.children is not None else [],
+    'created': lambda card: _datetime(card.created),
+    'last_modified': lambda card: _datetime(card.last_modified),
+    'plan': lambda card: card.plan.unique_id if isinstance(card.plan, Plan) else card.plan,
+    'access': lambda card: _access(card.access),
+}
+
+TAG_FIELDS = {
+    'id': lambda tag: tag.unique_id,
+    'name': lambda tag: tag.name,
+    'color': lambda tag: '#{0:06X}'.format(tag.color) if tag.color is not None else None,
+}
+
+
+class _BadRequest(Exception):
+    pass
+
+
+def _error(status: int, message: str) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+def _response(data: dict) -> JsonResponse:
+    # Compact separators, large card lists are mostly punctuation otherwise
+    return JsonResponse(data, json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False})
+
+
+def _projection(request, fields: dict) -> list:
+    """
+    :return: Serializers of the requested fields in the requested order
+    :raise _BadRequest: If one of the fields is unknown
+    """
+    names = request.GET.get('fields')
+    if not names:
+        return list(fields.items())
+
+    projection = []
+    for name in names.split(','):
+        name = name.strip()
+        if name not in fields:
+            raise _BadRequest("Unknown field '{}', available fields are: {}".format(name, ', '.join(fields)))
+        projection.append((name, fields[name]))
+    return projection
+
+
+def _serialize(objects, projection: list) -> list:
+    return [{name: serializer(instance) for name, serializer in projection} for instance in objects]
+
+
+def api_view(func):
+    """
+    Answers with JSON errors instead of redirects and HTML pages
+    """
+
+    @functools.wraps(func)
+    def wrap(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _error(401, 'Authentication required')
+        if request.method != 'GET':
+            return _error(405, 'Only GET is supported')
+        try:
+            return func(request, *args, **kwargs)
+        except _BadRequest as error:
+            return _error(400, str(error))
+        except beb_exceptions.AccessDeniedError as error:
+            return _error(403, str(error))
+        except beb_exceptions.UniqueObjectDoesNotExistError as error:
+            return _error(404, str(error))
+        except beb_exceptions.Error as error:
+            return _error(400, str(error))
+
+    return wrap
+
+
+def _limit(request, default: int, maximum: int) -> int:
+    """
+    :raise _BadRequest: If the limit isn't a number from 1 to maximum
+    """
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        raise _BadRequest('limit should be a number')
+    if not 0 < limit <= maximum:
+        raise _BadRequest('limit should be from 1 to {}'.format(maximum))
+    return limit
+
+
+def _results(pairs) -> JsonResponse:
+    return _response({'results': [{'id': object_id, 'text': text} for object_id, text in pairs]})
+
+
+def health(request):
+    """
+    For load balancers and orchestrators, doesn't require authentication
+    """
+    if model_registry.health():
+        return _response({'status': 'ok'})
+    return _error(503, 'Database is unavailable')
+
+
+@api_view
+def boards(request):
+    try:
+        beb_boards = MODEL.board_read(request_user_id=request.user.id)
+    except (beb_exceptions.BoardDoesNotExistError, beb_exceptions.AccessDeniedError):
+        beb_boards = []
+    return _response({'boards': _serialize(beb_boards, _projection(request, BOARD_FIELDS))})
+
+
+@api_view
+def board(request, board_id):
+    beb_board = MODEL.board_read(board_id, request_user_id=request.user.id)[0]
+    return _response(_serialize([beb_board], _projection(request, BOARD_FIELDS))[0])
+
+
+@api_view
+def lists(request, board_id):
+    try:
+        beb_lists = MODEL.list_read(board_id, request_user_id=request.user.id)
+    except beb_exceptions.ListDoesNotExistError:
+        beb_lists = []
+    return _response({'lists': _serialize(beb_lists, _projection(request, LIST_FIELDS))})
+
+
+@api_view
+def list_cards(request, list_id):
+    limit = _limit(request, settings.BEB_BOARD_PAGE_SIZE, MAX_PAGE_SIZE)
+    projection = _projection(request, CARD_FIELDS)
+    page = MODEL.card_page(list_id, request.GET.get('after'), limit, request_user_id=request.user.id)
+    return _response({'cards': _serialize(page.cards, projection), 'next_cursor': page.next_cursor})
+
+
+@api_view
+def card(request, card_id):
+    beb_card = MODEL.card_read(None, card_id, request_user_id=request.user.id)[0]
+    return _response(_serialize([beb_card], _projection(request, CARD_FIELDS))[0])
+
+
+@api_view
+def tags(request):
+    return _response({'tags': _serialize(MODEL.tag_read(), _projection(request, TAG_FIELDS))})
+
+
+@api_view
+def autocomplete_cards(request, board_id):
+    limit = _limit(request, MAX_AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT)
+    beb_cards = MODEL.card_search(board_id, request.GET.get('q', ''), limit, request_user_id=request.user.id)
+    return _results((beb_card.unique_id, beb_card.name) for beb_card in beb_cards)
+
+
+@api_view
+def autocomplete_tags(request):
+    limit = _limit(request, MAX_AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT)
+    return _results((tag.unique_id, tag.name) for tag in MODEL.tag_search(request.GET.get('q', ''), limit))
+
+
+@api_view
+def autocomplete_users(request):
+    limit = _limit(request, MAX_AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT)
+    users = (User.objects
+             .filter(username__istartswith=request.GET.get('q', ''))
+             .order_by('username')
+             .values_list('id', 'username')[:limit])
+    return _results(users)
@@ -0,0 +1,128 @@
+"""
+Export of all cards of a board the user can read. Cards are read from the library page by page and written to the
+response as they are read, so the memory usage doesn't depend on the size of the board
+"""
+import csv
+import json
+
+import beb_lib.model.exceptions as beb_exceptions
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from beb_manager.model_registry import MODEL
+
+EXPORT_PAGE_SIZE = 500
+
+CSV_FORMAT = 'csv'
+NDJSON_FORMAT = 'ndjson'
+
+CONTENT_TYPES = {
+    CSV_FORMAT: 'text/csv; charset=utf-8',
+    NDJSON_FORMAT: 'application/x-ndjson; charset=utf-8',
+}
+
+FIELDS = ['id', 'name', 'list_id', 'list', 'priority', 'expiration_date', 'assignee_id', 'assignee', 'tags',
+          'description', 'created', 'last_modified']
+
+
+class _Echo:
+    """
+    File-like object for csv.writer that returns the written line instead of keeping it
+    """
+
+    def write(self, value):
+        return value
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def _records(card_lists: list, user_id: int):
+    tag_names = {tag.unique_id: tag.name for tag in MODEL.tag_read()}
+
+    for card_list in card_lists:
+        cursor = None
+        while True:
+            page = MODEL.card_page(card_list.unique_id, cursor, EXPORT_PAGE_SIZE, request_user_id=user_id)
+            users = User.objects.in_bulk({card.assignee_id for card in page.cards if card.assignee_id is not None})
+
+            for card in page.cards:
+                assignee = users.get(card.assignee_id)
+                yield {
+                    'id': card.unique_id,
+                    'name': card.name,
+                    'list_id': card.list_id,
+                    'list': card_list.name,
+                    'priority': card.priority,
+                    'expiration_date': _datetime(card.expiration_date),
+                    'assignee_id': card.assignee_id,
+                    'assignee': assignee.username if assignee is not None else None,
+                    'tags': [tag_names[tag] for tag in card.tags if tag in tag_names],
+                    'description': card.description,
+                    'created': _datetime(card.created),
+                    'last_modified': _datetime(card.last_modified),
+                }
+
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+
+def _csv_lines(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for record in records:
+        record['tags'] = ','.join(record['tags'])
+        yield writer.writerow([record[field] if record[field] is not None else '' for field in FIELDS])
+
+
+def _ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _encoded(lines):
+    for line in lines:
+        yield line.encode('utf-8')
+
+
+@login_required
+def export_board(request, board_id):
+    """
+    ?format=csv (default) or ?format=ndjson. The response is gzipped if the client accepts it
+    """
+    export_format = request.GET.get('format', CSV_FORMAT)
+    if export_format not in CONTENT_TYPES:
+        return HttpResponseBadRequest('Format should be one of: {}'.format(', '.join(CONTENT_TYPES)))
+
+    # Errors are found before the response starts, the stream itself can't report them
+    try:
+        board = MODEL.board_read(board_id, request_user_id=request.user.id)[0]
+        try:
+            card_lists = MODEL.list_read(board.unique_id, request_user_id=request.user.id)
+        except (beb_exceptions.ListDoesNotExistError, beb_exceptions.AccessDeniedError):
+            card_lists = []
+    except beb_exceptions.AccessDeniedError:
+        return HttpResponse('<h1>Access Denied</h1>', status=403)
+    except beb_exceptions.Error:
+        return HttpResponse('<h1>Board does not exist</h1>', status=404)
+
+    records = _records(card_lists, request.user.id)
+    lines = _csv_lines(records) if export_format == CSV_FORMAT else _ndjson_lines(records)
+    content = _encoded(lines)
+
+    gzipped = bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    if gzipped:
+        content = compress_sequence(content)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = 'attachment; filename="board-{}.{}"'.format(board.unique_id, export_format)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    return response
@@ -2,55 +2,122 @@ import datetime
 
 from beb_lib.domain_entities.supporting import Priority
 import beb_lib.model.exceptions as beb_exceptions
-from beb_lib.model.model import Model
 from colorful.forms import RGBColorField
 from colorful.widgets import ColorFieldWidget
 from django import forms
 from django.contrib.auth.models import User
+from django.urls import reverse, reverse_lazy
 from tempus_dominus.widgets import DateTimePicker
 
-from web_app import settings
+from beb_manager.model_registry import MODEL
 
-MODEL = Model(settings.BEB_LIB_DATABASE_PATH)
+
+AUTOCOMPLETE_LIMIT = 20
+
+
+class AutocompleteMixin:
+    """
+    Renders only the selected options, others are found by the view at `url` while the user types. So the page doesn't
+    depend on the number of objects the field can refer to
+    """
+
+    def __init__(self, url=None, labels=None, attrs=None):
+        """
+        :param url: URL of the autocomplete view
+        :param labels: Callable that returns labels by str ids for the selected ids
+        """
+        super(AutocompleteMixin, self).__init__(attrs)
+        self.url = url
+        self.labels = labels
+
+    def get_context(self, name, value, attrs):
+        context = super(AutocompleteMixin, self).get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = str(self.url)
+        context['widget']['attrs']['data-autocomplete-limit'] = AUTOCOMPLETE_LIMIT
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        ids = [str(object_id) for object_id in value if object_id not in ('', None)]
+        labels = self.labels(ids) if ids and self.labels is not None else {}
+        return [(None, [self.create_option(name, object_id, labels.get(object_id, object_id), True, index)], index)
+                for index, object_id in enumerate(ids)]
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
+
+
+class IdsField(forms.MultipleChoiceField):
+    """
+    Ids of library objects. The field has no choices to check them against, the views check them when they're used
+    """
+
+    def valid_value(self, value):
+        return str(value).isdigit()
+
+
+def _user_labels(ids: list) -> dict:
+    return {str(user.id): user.username for user in User.objects.filter(id__in=ids)}
+
+
+def _tag_labels(ids: list) -> dict:
+    labels = {}
+    for tag_id in ids:
+        try:
+            labels[tag_id] = MODEL.tag_read(tag_id=int(tag_id))[0].name
+        except beb_exceptions.TagDoesNotExistError:
+            pass
+    return labels
+
+
+def _user_field(multiple: bool):
+    if multiple:
+        return forms.ModelMultipleChoiceField(queryset=User.objects.all(), required=False,
+                                              widget=AutocompleteSelectMultiple(
+                                                  reverse_lazy('beb_manager:autocomplete_users'), _user_labels))
+    return forms.ModelChoiceField(queryset=User.objects.all(), required=False,
+                                  widget=AutocompleteSelect(reverse_lazy('beb_manager:autocomplete_users'),
+                                                            _user_labels))
 
 
 class SingleInputForm(forms.Form):
     name = forms.CharField(max_length=100)
-    can_read = forms.ModelMultipleChoiceField(
-        queryset=User.objects.all(), required=False)
-    can_write = forms.ModelMultipleChoiceField(
-        queryset=User.objects.all(), required=False)
+    can_read = _user_field(multiple=True)
+    can_write = _user_field(multiple=True)
 
 
 class CardForm(forms.Form):
     def __init__(self, user_id, board_id, *args, **kwargs):
         super(CardForm, self).__init__(*args, **kwargs)
-        try:
-            tags = MODEL.tag_read()
-        except beb_exceptions.TagDoesNotExistError:
-            tags = []
-        tags_tuple = [(tag.unique_id, tag.name) for tag in tags]
-        tags_tuple.insert(0, ('', 'n.s.'))
-
-        try:
-            cards = MODEL.get_cards_in_board(board_id, user_id)
-        except beb_exceptions.CardDoesNotExistError:
-            cards = []
-        
-        card_lists = MODEL.list_read(board_id, request_user_id=user_id)
-
-        cards_tuple = [(card.unique_id, card.name) for card in cards]
-        cards_tuple.insert(0, ('', 'n.s.'))
+        self.user_id = user_id
 
+        # Lists without their cards
+        card_lists = MODEL.board_snapshot(board_id, request_user_id=user_id, cards_limit=0).lists
         lists_tuple = [(card_list.unique_id, card_list.name) for card_list in card_lists]
 
-        self.fields['tags'] = forms.MultipleChoiceField(choices=tags_tuple, required=False)
         self.fields['card_list'] = forms.ChoiceField(choices=lists_tuple, required=False)
-        self.fields['children_cards'] = forms.MultipleChoiceField(choices=cards_tuple, required=False)
+        self.fields['children_cards'].widget.url = reverse('beb_manager:autocomplete_cards', args=[board_id])
+        self.fields['children_cards'].widget.labels = self._card_labels
+
+    def _card_labels(self, ids: list) -> dict:
+        cards = MODEL.card_read_many([int(card_id) for card_id in ids], request_user_id=self.user_id)
+        return {str(card.unique_id): card.name for card in cards}
+
+    def clean_children_cards(self):
+        """
+        Keeps only the cards the user can read
+        """
+        ids = [int(card_id) for card_id in self.cleaned_data['children_cards']]
+        return [str(card.unique_id) for card in MODEL.card_read_many(ids, request_user_id=self.user_id)]
 
     name = forms.CharField(required=False, max_length=200, widget=forms.TextInput(attrs={'placeholder': 'Card title'}))
     description = forms.CharField(required=False, widget=forms.TextInput(attrs={'placeholder': 'Card description'}))
-    tags = forms.MultipleChoiceField()
+    tags = IdsField(required=False, widget=AutocompleteSelectMultiple(reverse_lazy('beb_manager:autocomplete_tags'),
+                                                                      _tag_labels))
     card_list = forms.ChoiceField()
     priority = forms.ChoiceField(choices=[(p.value, Priority(p).name) for p in Priority], required=False)
     expiration_date = forms.DateTimeField(widget=DateTimePicker(options={'minDate': (datetime.date.today() +
@@ -58,10 +125,10 @@ class CardForm(forms.Form):
                                                                                          days=1)).strftime('%Y-%m-%d'),
                                                                          'useCurrent': False, }),
                                           required=False)
-    children_cards = forms.MultipleChoiceField()
-    assignee = forms.ModelChoiceField(queryset=User.objects.all(), required=False)
-    can_read = forms.ModelMultipleChoiceField(queryset=User.objects.all(), required=False)
-    can_write = forms.ModelMultipleChoiceField(queryset=User.objects.all(), required=False)
+    children_cards = IdsField(required=False, widget=AutocompleteSelectMultiple())
+    assignee = _user_field(multiple=False)
+    can_read = _user_field(multiple=True)
+    can_write = _user_field(multiple=True)
 
     interval = forms.CharField(max_length=50, widget=forms.TextInput(attrs={'placeholder': '5 minutes'}), required=False)
     start_repeat_at = forms.DateTimeField(
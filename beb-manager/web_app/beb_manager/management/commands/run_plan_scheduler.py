@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from beb_manager.model_registry import get_model
+from beb_manager.plans import PlanScheduler, DEFAULT_INTERVAL
+
+
+class Command(BaseCommand):
+    help = 'Creates cards by recurring plans periodically. Set BEB_PLAN_SCHEDULER_IN_WEB = False while it runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            default=getattr(settings, 'BEB_PLAN_SCHEDULER_INTERVAL', DEFAULT_INTERVAL),
+                            help='Seconds between runs')
+        parser.add_argument('--once', action='store_true', help='Process plans once and exit')
+
+    def handle(self, *args, **options):
+        scheduler = PlanScheduler(get_model(), options['interval'])
+
+        if options['once']:
+            scheduler.run_pending()
+            return
+
+        self.stdout.write('Processing plans every {} seconds'.format(options['interval']))
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
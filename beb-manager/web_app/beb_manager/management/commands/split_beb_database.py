@@ -0,0 +1,89 @@
+import os
+import re
+import sqlite3
+
+from beb_lib.storage.models import CardListModel
+from beb_lib.storage.provider import StorageProvider
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Moves beb_lib tables from the Django database file, where older versions kept them, '
+            'to BEB_LIB_DATABASE_PATH')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=settings.DATABASES['default']['NAME'],
+                            help='Database file that contains beb_lib tables now')
+        parser.add_argument('--target', default=settings.BEB_LIB_DATABASE_PATH,
+                            help='Database file for beb_lib tables')
+        parser.add_argument('--keep-source', action='store_true',
+                            help="Copy tables and don't drop them in the source database")
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+
+        if not os.path.exists(source):
+            raise CommandError("{} doesn't exist".format(source))
+        if os.path.abspath(source) == os.path.abspath(target):
+            raise CommandError('Source and target are the same file, set BEB_LIB_DATABASE_PATH to another one')
+
+        connection = sqlite3.connect(source, isolation_level=None)
+        try:
+            connection.execute('ATTACH DATABASE ? AS beb', (target,))
+            tables = self._tables(connection, 'main')
+            if not tables:
+                self.stdout.write('There are no beb_lib tables in {}'.format(source))
+                return
+            target_tables = self._tables(connection, 'beb')
+            if any(not self._is_empty(connection, table) for table in target_tables):
+                raise CommandError('{} already contains beb_lib data'.format(target))
+
+            connection.execute('BEGIN')
+            try:
+                # Tables created by a model that opened the target before the split hold nothing worth keeping
+                for table in target_tables:
+                    connection.execute('DROP TABLE beb."{}"'.format(table))
+                for table in tables:
+                    self._copy_table(connection, table)
+                    if not options['keep_source']:
+                        connection.execute('DROP TABLE main."{}"'.format(table))
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+        finally:
+            connection.close()
+
+        self.stdout.write('Moved {} tables to {}'.format(len(tables), target))
+
+    @staticmethod
+    def _tables(connection: sqlite3.Connection, schema: str) -> list:
+        names = StorageProvider.table_names()
+        query = 'SELECT name FROM {}.sqlite_master WHERE type = \'table\''.format(schema)
+        existing = {row[0] for row in connection.execute(query)}
+        return [name for name in names if name in existing]
+
+    @staticmethod
+    def _is_empty(connection: sqlite3.Connection, table: str) -> bool:
+        """
+        The only row of a new database is the Archived list every model creates when it opens the database
+        """
+        query = 'SELECT COUNT(*) FROM beb."{}"'.format(table)
+        if table == CardListModel._meta.table_name:
+            query += ' WHERE NOT (name = \'Archived\' AND board_id IS NULL)'
+        return connection.execute(query).fetchone()[0] == 0
+
+    @staticmethod
+    def _copy_table(connection: sqlite3.Connection, table: str) -> None:
+        """
+        Creates the table and its indexes in the target with the statements they were created with in the source
+        """
+        statements = connection.execute('SELECT type, sql FROM main.sqlite_master '
+                                        'WHERE tbl_name = ? AND sql IS NOT NULL '
+                                        'ORDER BY type = \'index\'', (table,)).fetchall()
+        for object_type, sql in statements:
+            keyword = 'TABLE' if object_type == 'table' else 'INDEX'
+            connection.execute(re.sub(r'^(CREATE\s+(?:UNIQUE\s+)?{}\s+(?:IF NOT EXISTS\s+)?)'.format(keyword),
+                                      r'\1beb.', sql, count=1, flags=re.IGNORECASE))
+        connection.execute('INSERT INTO beb."{0}" SELECT * FROM main."{0}"'.format(table))
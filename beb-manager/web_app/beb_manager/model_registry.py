@@ -0,0 +1,77 @@
+"""
+The one library Model of the web app process. It's created on first use, so importing views, forms or management
+commands doesn't open the database, and then shared by all of them. Peewee keeps a connection per thread, every worker
+thread opens its own on its first request
+"""
+import logging
+import threading
+
+from beb_lib.model.model import Model
+from beb_lib.storage.queued_provider import QueuedStorageProvider
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+LOGGER = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_MODEL = None
+
+
+def get_model() -> Model:
+    """
+    Creates the model, its tables and migrations on the first call, returns the same model later
+    """
+    global _MODEL
+    if _MODEL is None:
+        with _LOCK:
+            if _MODEL is None:
+                provider = None
+                if getattr(settings, 'BEB_LIB_QUEUED_WRITES', False):
+                    provider = QueuedStorageProvider(settings.BEB_LIB_DATABASE_PATH)
+                _MODEL = Model(settings.BEB_LIB_DATABASE_PATH, custom_storage_provider=provider)
+    return _MODEL
+
+
+def warmup() -> None:
+    """
+    Does the slow part of the first request in advance: creates the model and opens the connection of the calling
+    thread. Called by the WSGI module when BEB_LIB_WARMUP is True
+    """
+    if not get_model().ping():
+        LOGGER.error("Database %s doesn't answer after warmup", settings.BEB_LIB_DATABASE_PATH)
+
+
+def health() -> bool:
+    """
+    :return: True if the database answers the calling thread. The model is created if it wasn't yet
+    """
+    try:
+        return get_model().ping()
+    except Exception:
+        LOGGER.exception("Health check failed")
+        return False
+
+
+# Proxy to get_model() for modules that use the model at many places
+MODEL = SimpleLazyObject(get_model)
+
+
+class ReadMemoMiddleware:
+    """
+    Answers repeated library reads of one request from memory, see Model.memoized_reads. The counters of the request
+    are in request.beb_read_memo and, with DEBUG, in the X-Beb-Read-Memo response header
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with get_model().memoized_reads() as memo:
+            request.beb_read_memo = memo
+            response = self.get_response(request)
+
+        LOGGER.debug("%s %s: %r", request.method, request.path, memo)
+        if settings.DEBUG:
+            response['X-Beb-Read-Memo'] = 'hits={}; misses={}; invalidations={}'.format(memo.hits, memo.misses,
+                                                                                       memo.invalidations)
+        return response
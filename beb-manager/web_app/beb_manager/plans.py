@@ -0,0 +1,99 @@
+"""
+Creates cards by recurring plans outside of request handling. Either the web process does it in a background thread,
+that is started by requests not more often than once per BEB_PLAN_SCHEDULER_INTERVAL seconds, or a separate
+`manage.py run_plan_scheduler` process does it
+"""
+import logging
+import threading
+import time
+
+from beb_lib.model.model import Model
+from django.conf import settings
+
+from beb_manager.model_registry import get_model
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 60
+
+
+class PlanScheduler:
+    """
+    Coalesces plan triggering: concurrent and too frequent calls do nothing while a run is in progress or the last one
+    was less than `interval` seconds ago
+    """
+
+    def __init__(self, model: Model, interval: float = DEFAULT_INTERVAL):
+        self.model = model
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_run = None
+
+    def is_due(self) -> bool:
+        return self._last_run is None or time.monotonic() - self._last_run >= self.interval
+
+    def run_pending(self) -> bool:
+        """
+        Creates cards by plans if it's time to
+
+        :return: True if plans were processed by this call
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if not self.is_due():
+                return False
+            self._last_run = time.monotonic()
+            try:
+                self.model.trigger_card_plan_creation()
+            except Exception:
+                LOGGER.exception("Cards creation by plans failed")
+            return True
+        finally:
+            self._lock.release()
+
+    def kick(self) -> None:
+        """
+        Starts processing of plans in a background thread if it's time to, returns at once
+        """
+        if self.is_due() and not self._lock.locked():
+            threading.Thread(target=self.run_pending, name='beb-plan-scheduler', daemon=True).start()
+
+    def run_forever(self, stop_event: threading.Event = None) -> None:
+        stop_event = stop_event if stop_event is not None else threading.Event()
+        while not stop_event.is_set():
+            self.run_pending()
+            stop_event.wait(self.interval)
+
+
+_LOCK = threading.Lock()
+_SCHEDULER = None
+
+
+def get_scheduler() -> PlanScheduler:
+    """
+    Creates the scheduler of the process on the first call, returns the same one later
+    """
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = PlanScheduler(get_model(),
+                                           getattr(settings, 'BEB_PLAN_SCHEDULER_INTERVAL', DEFAULT_INTERVAL))
+    return _SCHEDULER
+
+
+class PlanSchedulerMiddleware:
+    """
+    Kicks the scheduler on requests unless BEB_PLAN_SCHEDULER_IN_WEB is False, e.g. when a separate
+    `run_plan_scheduler` process is deployed
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'BEB_PLAN_SCHEDULER_IN_WEB', True)
+
+    def __call__(self, request):
+        if self.enabled:
+            get_scheduler().kick()
+        return self.get_response(request)
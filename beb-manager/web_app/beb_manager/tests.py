@@ -1,3 +1,166 @@
+import os
+import tempfile
+import threading
+import types
+import unittest
+from unittest import mock
+
+from beb_lib.domain_entities.board import Board
+from beb_lib.domain_entities.supporting import AccessType
+from beb_lib.model.model import Model
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from beb_manager import plans
+from beb_manager.plans import PlanScheduler
+
+
+class PlanSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = mock.Mock()
+        self.now = 1000.0
+        patcher = mock.patch('beb_manager.plans.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = PlanScheduler(self.model, interval=60)
+
+    def test_run_pending_once_per_interval(self):
+        self.assertTrue(self.scheduler.is_due())
+        self.assertTrue(self.scheduler.run_pending())
+        self.assertFalse(self.scheduler.is_due())
+
+        self.now += 59
+        self.assertFalse(self.scheduler.run_pending())
+
+        self.now += 1
+        self.assertTrue(self.scheduler.run_pending())
+        self.assertEqual(self.model.trigger_card_plan_creation.call_count, 2)
+
+    def test_failed_run_waits_for_interval(self):
+        self.model.trigger_card_plan_creation.side_effect = RuntimeError('database is locked')
+
+        self.assertTrue(self.scheduler.run_pending())
+        self.assertFalse(self.scheduler.run_pending())
+        self.assertEqual(self.model.trigger_card_plan_creation.call_count, 1)
+
+    def test_concurrent_runs_coalesce(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def trigger():
+            started.set()
+            release.wait(5)
+
+        self.model.trigger_card_plan_creation.side_effect = trigger
+        self.scheduler.kick()
+        self.assertTrue(started.wait(5))
+
+        # The run in progress is not due anymore, but the calls must not wait for it either
+        self.now += 60
+        self.assertFalse(self.scheduler.run_pending())
+        with mock.patch('beb_manager.plans.threading.Thread') as thread:
+            self.scheduler.kick()
+        thread.assert_not_called()
+
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == 'beb-plan-scheduler':
+                thread.join()
+        self.assertTrue(self.scheduler.run_pending())
+        self.assertEqual(self.model.trigger_card_plan_creation.call_count, 2)
+
+    def test_kick_when_not_due(self):
+        self.scheduler.run_pending()
+
+        with mock.patch('beb_manager.plans.threading.Thread') as thread:
+            self.scheduler.kick()
+        thread.assert_not_called()
+
+
+class GetSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        patchers = [mock.patch('beb_manager.plans._SCHEDULER', None),
+                    mock.patch('beb_manager.plans.get_model', mock.Mock()),
+                    mock.patch('beb_manager.plans.settings', types.SimpleNamespace(BEB_PLAN_SCHEDULER_INTERVAL=5))]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_scheduler_for_all_threads(self):
+        schedulers = []
+        threads = [threading.Thread(target=lambda: schedulers.append(plans.get_scheduler())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(map(id, schedulers))), 1)
+        self.assertEqual(schedulers[0].interval, 5)
+        plans.get_model.assert_called_once_with()
+
+
+class RightsFieldsTest(TestCase):
+
+    def setUp(self):
+        from beb_manager import views
+
+        self.views = views
+        self.directory = tempfile.TemporaryDirectory()
+        self.model = Model(os.path.join(self.directory.name, 'beb.sqlite3'))
+        patcher = mock.patch.object(views, 'MODEL', self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.owner, self.alice, self.bob = [User.objects.create_user(name) for name in ('owner', 'alice', 'bob')]
+        self.board_id = self.model.board_write(board_name='Board', request_user_id=self.owner.id).unique_id
+
+    def tearDown(self):
+        self.model.storage_provider.close()
+        self.directory.cleanup()
+
+    def users(self, *users):
+        return User.objects.filter(id__in=[user.id for user in users])
+
+    def rights(self) -> dict:
+        return self.model.get_rights_matrix(Board, self.board_id, [self.owner.id, self.alice.id, self.bob.id])
+
+    def test_restrict(self):
+        self.views._save_rights(Board, self.board_id, self.users(self.owner, self.alice), self.users(self.owner))
+
+        self.assertEqual(self.rights(), {self.owner.id: AccessType.READ_WRITE,
+                                         self.alice.id: AccessType.READ,
+                                         self.bob.id: AccessType.NONE})
+        self.assertEqual(self.views._users_with_rights(Board, self.board_id),
+                         ([self.owner.id, self.alice.id], [self.owner.id]))
+
+    def test_single_field(self):
+        self.views._save_rights(Board, self.board_id, self.users(self.owner, self.alice), User.objects.none())
+
+        self.assertEqual(self.rights(), {self.owner.id: AccessType.READ_WRITE,
+                                         self.alice.id: AccessType.READ_WRITE,
+                                         self.bob.id: AccessType.WRITE})
+
+        self.views._save_rights(Board, self.board_id, User.objects.none(), self.users(self.owner))
+
+        self.assertEqual(self.rights(), {self.owner.id: AccessType.READ_WRITE,
+                                         self.alice.id: AccessType.READ,
+                                         self.bob.id: AccessType.NONE})
+
+    def test_unrestricted_fields_are_empty(self):
+        self.assertEqual(self.views._users_with_rights(Board, self.board_id), ([], []))
+
+        self.views._save_rights(Board, self.board_id, User.objects.none(), User.objects.none())
+        self.assertEqual(set(self.rights().values()), {AccessType.READ_WRITE})
+
+    def test_group_access_is_kept(self):
+        group = self.model.group_write(group_name='Readers', user_ids=[self.alice.id])
+        self.model.set_group_rights(Board, self.board_id, {group.unique_id: AccessType.READ})
+
+        can_read, can_write = self.views._users_with_rights(Board, self.board_id)
+        self.views._save_rights(Board, self.board_id, User.objects.filter(id__in=can_read),
+                                User.objects.filter(id__in=can_write))
+        self.model.set_group_rights(Board, self.board_id, {group.unique_id: AccessType.READ_WRITE})
+
+        self.assertEqual(self.rights()[self.alice.id], AccessType.READ_WRITE)
@@ -2,7 +2,7 @@ from django.conf.urls import include, url
 from django.contrib.auth import views as auth_views
 from django.views.generic import RedirectView
 
-from . import views
+from . import api, export, views
 
 app_name = "beb_manager"
 
@@ -15,6 +15,7 @@ concrete_lists_patterns = [
     url(r'^edit/$', views.edit_list, name='edit_list'),
     url(r'^delete/$', views.delete_list, name='delete_list'),
     url(r'^add/$', views.add_card, name='add_card'),
+    url(r'^cards/$', views.list_cards, name='list_cards'),
 ]
 
 tags_patterns = [
@@ -33,6 +34,7 @@ concrete_board_patterns = [
     url(r'^card/(?P<card_id>[0-9]+)/', include(concrete_card_patterns)),
     url(r'^assigned/$', views.assigned, name='assigned'),
     url(r'^owned/$', views.owned, name='owned'),
+    url(r'^export/$', export.export_board, name='export_board'),
 ]
 
 board_patterns = [
@@ -48,7 +50,21 @@ registration_patterns = [
     url(r'^.*$', RedirectView.as_view(url='/', permanent=False), name='home'),
 ]
 
+api_patterns = [
+    url(r'^health/$', api.health, name='api_health'),
+    url(r'^boards/$', api.boards, name='api_boards'),
+    url(r'^boards/(?P<board_id>[0-9]+)/$', api.board, name='api_board'),
+    url(r'^boards/(?P<board_id>[0-9]+)/lists/$', api.lists, name='api_lists'),
+    url(r'^lists/(?P<list_id>[0-9]+)/cards/$', api.list_cards, name='api_list_cards'),
+    url(r'^cards/(?P<card_id>[0-9]+)/$', api.card, name='api_card'),
+    url(r'^tags/$', api.tags, name='api_tags'),
+    url(r'^autocomplete/boards/(?P<board_id>[0-9]+)/cards/$', api.autocomplete_cards, name='autocomplete_cards'),
+    url(r'^autocomplete/tags/$', api.autocomplete_tags, name='autocomplete_tags'),
+    url(r'^autocomplete/users/$', api.autocomplete_users, name='autocomplete_users'),
+]
+
 urlpatterns = [
+    url(r'^api/', include(api_patterns)),
     url(r'^', include(board_patterns)),
     url(r'^accounts/', include(registration_patterns)),
 ]
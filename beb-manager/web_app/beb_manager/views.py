@@ -7,29 +7,146 @@ from beb_lib.domain_entities.board import Board
 from beb_lib.domain_entities.card import Card
 from beb_lib.domain_entities.card_list import CardsList
 from beb_lib.domain_entities.supporting import Priority, AccessType
-from beb_lib.model.model import Model
 from django.conf import settings
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
 from django.shortcuts import render, redirect
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from beb_manager.forms import SingleInputForm, CardFormWithoutLists, CardForm, TagForm
+from beb_manager.model_registry import MODEL
 
-MODEL = Model(settings.BEB_LIB_DATABASE_PATH)
 
-
-def process_plans(func):
-    def wrap(request, *args, **kwargs):
-        MODEL.trigger_card_plan_creation()
-        return func(request, *args, **kwargs)
-
-    return wrap
+def _board_etag(request, board_id, *args, **kwargs):
+    """
+    Board version grows with every change of the board content and access, so the page of the same user stays the same
+    while the version does. Reads only the board row
+    """
+    try:
+        version = MODEL.board_version(board_id)
+    except beb_exceptions.BoardDoesNotExistError:
+        return None
+    return '{}-{}-{}'.format(board_id, version, request.user.id)
+
+
+def _board_page_etag(request, board_id, *args, **kwargs):
+    """
+    Overdue cards are highlighted on the board page, so the page also changes every minute
+    """
+    etag = _board_etag(request, board_id, *args, **kwargs)
+    if etag is None:
+        return None
+    return '{}-{}'.format(etag, datetime.datetime.today().strftime('%Y%m%d%H%M'))
+
+
+def _is_on_board(object_type: type, object_id, board_id) -> bool:
+    return MODEL.boards_of(object_type, [int(object_id)]).get(int(object_id)) == int(board_id)
+
+
+def _list_page_etag(request, board_id, list_id, *args, **kwargs):
+    """
+    No ETag for a list of another board, the view answers 404 for it
+    """
+    if not _is_on_board(CardsList, list_id, board_id):
+        return None
+    return _board_page_etag(request, board_id, list_id, *args, **kwargs)
+
+
+def _card_etag(request, board_id, card_id, *args, **kwargs):
+    """
+    The card page also shows names of the children cards, they may be on other boards. So the page stays the same
+    while the versions of all these boards do
+    """
+    if not _is_on_board(Card, card_id, board_id):
+        return None
+    versions = MODEL.card_board_versions(int(card_id))
+    return '{}-{}-{}'.format(card_id, ','.join('{}:{}'.format(board, version)
+                                               for board, version in sorted(versions.items())), request.user.id)
+
+
+def _card_tile_key(card: Card) -> str:
+    """
+    Everything the rendered card tile depends on. Changes of the card itself, including its tags, update last_modified
+    """
+    tags = ','.join('{}:{}:{}'.format(tag.unique_id, tag.name, tag.color) for tag in card.tags)
+    return '{}|{}|{}|{}'.format(card.last_modified, int(card.access), card.overdue, tags)
+
+
+def _prepare_card_tiles(cards, tags: dict, today: datetime.datetime) -> None:
+    """
+    Sets everything card_tile.html needs
+    :param tags: Tags with colors for HTML by their ids
+    """
+    for card in cards:
+        card.editable = bool(card.access & AccessType.WRITE)
+        card._tags = [tags[tag_id] for tag_id in card.tags if tag_id in tags]
+        card.overdue = (card.expiration_date is not None and
+                        card.expiration_date.date() <= today.date() and
+                        card.expiration_date.time() < today.time())
+        card.tile_key = _card_tile_key(card)
+
+
+def _users_by_id(user_ids) -> dict:
+    """
+    Users live in the Django database and cards in the beb_lib one, so they can't be joined in SQL. Collect user ids of
+    the read cards and load all of them with one query instead
+    """
+    return User.objects.in_bulk({user_id for user_id in user_ids if user_id is not None})
+
+
+def _users_with_rights(object_type: type, object_id: int) -> (list, list):
+    """
+    Ids of the users that can read and write the object. A field is left empty while all users have that access, an
+    empty field keeps the access as it is. Users without the access are found among the users with access rows, so
+    the rights matrix isn't read for all users
+    """
+    rights = MODEL.get_rights_matrix(object_type, object_id)
+    user_ids = None
+
+    fields = []
+    for access_type in (AccessType.READ, AccessType.WRITE):
+        denied = {user_id for user_id, access in rights.items() if not bool(access & access_type)}
+        if not denied:
+            fields.append([])
+            continue
+        if user_ids is None:
+            user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        fields.append([user_id for user_id in user_ids if user_id not in denied])
+
+    return fields[0], fields[1]
+
+
+def _save_rights(object_type: type, object_id: int, can_read, can_write) -> None:
+    """
+    Grants the access to the selected users and revokes it from the rest. An empty field leaves that access as it is.
+    Only users whose access changes get rows of their own, the rest keep following their groups and the parents
+    """
+    if not can_read and not can_write:
+        return
+
+    user_ids = list(User.objects.values_list('id', flat=True))
+    current = MODEL.get_rights_matrix(object_type, object_id, user_ids)
+    readers = {user.id for user in can_read}
+    writers = {user.id for user in can_write}
+
+    rights = {}
+    for user_id in user_ids:
+        access = current[user_id]
+        if readers:
+            access = access | AccessType.READ if user_id in readers else (access | AccessType.READ) ^ AccessType.READ
+        if writers:
+            access = access | AccessType.WRITE if user_id in writers else (access | AccessType.WRITE) ^ AccessType.WRITE
+        if access != current[user_id]:
+            rights[user_id] = access
+
+    if rights:
+        MODEL.set_rights(object_type, object_id, rights)
 
 
-@process_plans
 def signup(request):
     if request.method == 'POST':
         form = UserCreationForm(request.POST)
@@ -45,21 +162,19 @@ def signup(request):
     return render(request, 'registration/signup.html', {'form': form})
 
 
-@process_plans
 @login_required
 def boards(request):
     try:
         beb_boards = MODEL.board_read(request_user_id=request.user.id)
         Board.editable = True
         for board in beb_boards:
-            board. editable = bool(MODEL.get_right(board.unique_id, Board, request.user.id) & AccessType.WRITE)
+            board.editable = bool(board.access & AccessType.WRITE)
     except beb_exceptions.Error:
         beb_boards = []
 
     return render(request, 'beb_manager/boards/boards.html', {'user_boards': beb_boards, 'container_editable': True})
 
 
-@process_plans
 @login_required
 def add_board(request):
     try:
@@ -82,7 +197,6 @@ def add_board(request):
         return redirect('beb_manager:boards')
 
 
-@process_plans
 @login_required
 def edit_board(request, board_id):
     try:
@@ -99,30 +213,12 @@ def edit_board(request, board_id):
 
                     MODEL.board_write(board.unique_id, new_name, request_user_id=request.user.id)
 
-                    if can_read:
-                        for user in can_read:
-                            MODEL.add_right(board_id, Board, user.id, AccessType.READ)
-                    if can_write:
-                        for user in can_write:
-                            MODEL.add_right(board_id, Board, user.id, AccessType.WRITE)
-
-                    for user in User.objects.all():
-                        if user not in can_read and can_read:
-                            MODEL.remove_right(board_id, Board, user.id, AccessType.READ)
-                        if user not in can_write and can_write:
-                            MODEL.remove_right(board_id, Board, user.id, AccessType.WRITE)
+                    _save_rights(Board, board_id, can_read, can_write)
                 elif 'delete' in request.POST:
                     MODEL.board_delete(board_id, request_user_id=request.user.id)
                 return redirect('beb_manager:boards')
         else:
-            can_write = []
-            can_read = []
-
-            for user in User.objects.all():
-                if bool(MODEL.get_right(board_id, Board, user.id) & AccessType.READ):
-                    can_read.append(user)
-                if bool(MODEL.get_right(board_id, Board, user.id) & AccessType.WRITE):
-                    can_write.append(user)
+            can_read, can_write = _users_with_rights(Board, board_id)
 
             form = SingleInputForm(initial={'name': board.name, 'can_read': can_read, 'can_write': can_write})
         editable = bool(MODEL.get_right(board_id, Board, request.user.id) & AccessType.WRITE)
@@ -133,7 +229,6 @@ def edit_board(request, board_id):
         return redirect('beb_manager:boards')
 
 
-@process_plans
 @login_required
 def delete_board(request, board_id):
     try:
@@ -144,54 +239,72 @@ def delete_board(request, board_id):
         return HttpResponse('<h1>Access Denied</h1>')
 
 
-@process_plans
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_board_page_etag)
 def lists(request, board_id):
+    today = datetime.datetime.today()
     try:
-        tags = MODEL.tag_read()
-        for i in range(len(tags)):
-            tags[i].color = '#{0:06X}'.format(tags[i].color)
-    except beb_exceptions.TagDoesNotExistError:
-        tags = []
-    editable = bool(MODEL.get_right(board_id, Board, request.user.id) & AccessType.WRITE)
-    try:
-        today = datetime.datetime.today()
-        lists_models = MODEL.list_read(board_id, request_user_id=request.user.id)
-        beb_lists = []
-        Card.editable = True
-        CardsList.editable = True
-
-        for card_list in lists_models:
-            card_list.editable = bool(MODEL.get_right(card_list.unique_id, CardsList, request.user.id)
-                                      & AccessType.WRITE)
-            try:
-                cards = MODEL.card_read(card_list.unique_id, request_user_id=request.user.id)
-                for card in cards:
-                    card.editable = bool(MODEL.get_right(card.unique_id, Card, request.user.id) & AccessType.WRITE)
-                    for i in range(len(card.tags)):
-                        card.tags[i] = MODEL.tag_read(tag_id=card.tags[i])[0]
-                        card.tags[i].color = '#{0:06X}'.format(card.tags[i].color)
-            except beb_exceptions.CardDoesNotExistError:
-                cards = []
-
-            card_list._cards = cards
-            beb_lists.append(card_list)
-
-        return render(request, 'beb_manager/lists/lists.html',
-                      {'beb_lists': beb_lists, 'board_id': board_id, 'tags': tags,
-                       'today': today, 'container_editable': editable})
-
-    except beb_exceptions.ListDoesNotExistError:
-        return render(request, 'beb_manager/lists/lists.html',
-                      {'beb_lists': [], 'board_id': board_id, 'tags': tags,
-                       'today': today, 'container_editable': editable})
+        snapshot = MODEL.board_snapshot(board_id, request_user_id=request.user.id,
+                                        cards_limit=settings.BEB_BOARD_PAGE_SIZE)
     except beb_exceptions.AccessDeniedError:
         return HttpResponse('<h1>Access Denied</h1>')
     except beb_exceptions.Error:
         return redirect('beb_manager:boards')
 
+    for tag in snapshot.tags.values():
+        tag.color = '#{0:06X}'.format(tag.color)
+    tags = list(snapshot.tags.values())
+
+    Card.editable = True
+    CardsList.editable = True
+    beb_lists = []
+
+    for card_list in snapshot.lists:
+        card_list.editable = bool(card_list.access & AccessType.WRITE)
+        cards = snapshot.cards_of(card_list.unique_id)
+        _prepare_card_tiles(cards, snapshot.tags, today)
+
+        card_list._cards = cards
+        card_list.next_cursor = snapshot.next_cursor_of(card_list.unique_id)
+        card_list.column_key = '|'.join([card_list.name, str(int(card_list.access)), str(card_list.next_cursor)] +
+                                        ['{}:{}'.format(card.unique_id, card.tile_key) for card in cards])
+        beb_lists.append(card_list)
+
+    editable = bool(snapshot.board.access & AccessType.WRITE)
+    return render(request, 'beb_manager/lists/lists.html',
+                  {'beb_lists': beb_lists, 'board_id': board_id, 'tags': tags,
+                   'today': today, 'container_editable': editable})
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_list_page_etag)
+def list_cards(request, board_id, list_id):
+    """
+    Next cards of a list of the board page, they are added to the page by "Show more" button
+    """
+    if not _is_on_board(CardsList, list_id, board_id):
+        return HttpResponseNotFound()
+
+    try:
+        page = MODEL.card_page(list_id, request.GET.get('after'), settings.BEB_BOARD_PAGE_SIZE,
+                               request_user_id=request.user.id)
+    except beb_exceptions.AccessDeniedError:
+        return HttpResponseForbidden()
+    except beb_exceptions.Error:
+        return HttpResponseNotFound()
+
+    tags = {}
+    for tag in MODEL.tag_read():
+        tag.color = '#{0:06X}'.format(tag.color)
+        tags[tag.unique_id] = tag
+    _prepare_card_tiles(page.cards, tags, datetime.datetime.today())
+
+    return render(request, 'beb_manager/lists/cards_page.html',
+                  {'cards': page.cards, 'board_id': board_id, 'list_id': list_id, 'next_cursor': page.next_cursor})
+
 
-@process_plans
 @login_required
 def add_list(request, board_id):
     try:
@@ -210,7 +323,6 @@ def add_list(request, board_id):
         return HttpResponse('<h1>Access Denied</h1>')
 
 
-@process_plans
 @login_required
 def delete_list(request, board_id, list_id):
     if request.method == 'POST':
@@ -218,7 +330,6 @@ def delete_list(request, board_id, list_id):
     return redirect('beb_manager:lists', board_id)
 
 
-@process_plans
 @login_required
 def edit_list(request, board_id, list_id):
     try:
@@ -234,31 +345,12 @@ def edit_list(request, board_id, list_id):
                     can_write = form.cleaned_data['can_write']
                     MODEL.list_write(board_id, list_id, new_name, request.user.id)
 
-                    if can_read:
-                        for user in can_read:
-                            MODEL.add_right(list_id, CardsList, user.id, AccessType.READ)
-                    if can_write:
-                        for user in can_write:
-                            MODEL.add_right(list_id, CardsList, user.id, AccessType.WRITE)
-
-                    for user in User.objects.all():
-                        if user not in can_read and can_read:
-                            MODEL.remove_right(list_id, CardsList, user.id, AccessType.READ)
-                        if user not in can_write and can_write:
-                            MODEL.remove_right(list_id, CardsList, user.id, AccessType.WRITE)
+                    _save_rights(CardsList, list_id, can_read, can_write)
                 elif 'delete' in request.POST:
                     MODEL.list_delete(list_id, request_user_id=request.user.id)
                 return redirect('beb_manager:lists', board_id)
         else:
-
-            can_write = []
-            can_read = []
-
-            for user in User.objects.all():
-                if bool(MODEL.get_right(list_id, CardsList, user.id) & AccessType.READ):
-                    can_read.append(user)
-                if bool(MODEL.get_right(list_id, CardsList, user.id) & AccessType.WRITE):
-                    can_write.append(user)
+            can_read, can_write = _users_with_rights(CardsList, list_id)
 
             form = SingleInputForm(initial={'name': card_list.name, 'can_read': can_read, 'can_write': can_write})
         editable = bool(MODEL.get_right(board_id, Board, request.user.id) & AccessType.WRITE)
@@ -268,14 +360,18 @@ def edit_list(request, board_id, list_id):
         return HttpResponse('<h1>Access Denied</h1>')
 
 
-@process_plans
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_card_etag)
 def show_card(request, board_id, card_id):
+    if not _is_on_board(Card, card_id, board_id):
+        return HttpResponseNotFound()
+
     try:
         card = MODEL.card_read(None, card_id, request_user_id=request.user.id)[0]
         card_list = MODEL.get_list_of_card(card.unique_id, request.user.id)
         Card.editable = True
-        card.editable = bool(MODEL.get_right(card.unique_id, Card, request.user.id) & AccessType.WRITE)
+        card.editable = bool(card.access & AccessType.WRITE)
 
         if card.plan is not None:
             plan = MODEL.plan_read(card.unique_id, request.user.id)
@@ -288,16 +384,15 @@ def show_card(request, board_id, card_id):
             card.tags[i] = MODEL.tag_read(tag_id=card.tags[i])[0]
             card.tags[i].color = '#{0:06X}'.format(card.tags[i].color)
 
-        if card.children is not None and card.children:
-            for i in range(len(card.children)):
-                try:
-                    child = MODEL.card_read(None, card.children[i], request_user_id=request.user.id)[0]
-                    card.children[i] = child
-                except beb_exceptions.Error:
-                    pass
+        if card.children:
+            card._children = MODEL.card_read_many(card.children, request_user_id=request.user.id)
+            boards = MODEL.boards_of(Card, [child.unique_id for child in card._children])
+            for child in card._children:
+                child.board_id = boards.get(child.unique_id)
 
-        card.assignee_id = User.objects.get(pk=card.assignee_id) if card.assignee_id is not None else None
-        card.user_id = User.objects.get(pk=card.user_id)
+        users = _users_by_id([card.user_id, card.assignee_id])
+        card.assignee_id = users.get(card.assignee_id)
+        card.user_id = users.get(card.user_id)
 
         editable = bool(MODEL.get_right(board_id, Board, request.user.id) & AccessType.WRITE)
         return render(request, 'beb_manager/cards/show.html', {'card': card,
@@ -311,7 +406,6 @@ def show_card(request, board_id, card_id):
         return redirect('beb_manager:lists', board_id)
 
 
-@process_plans
 @login_required
 def add_card(request, board_id, list_id):
     try:
@@ -364,18 +458,7 @@ def add_card(request, board_id, list_id):
                                 children=children_cards)
                 new_card = MODEL.card_write(list_id, new_card, request.user.id)
 
-                if can_read:
-                    for user in can_read:
-                        MODEL.add_right(new_card.unique_id, Card, user.id, AccessType.READ)
-                if can_write:
-                    for user in can_write:
-                        MODEL.add_right(new_card.unique_id, Card, user.id, AccessType.WRITE)
-
-                for user in User.objects.all():
-                    if user not in can_read and can_read:
-                        MODEL.remove_right(new_card.unique_id, Card, user.id, AccessType.READ)
-                    if user not in can_write and can_write:
-                        MODEL.remove_right(new_card.unique_id, Card, user.id, AccessType.WRITE)
+                _save_rights(Card, new_card.unique_id, can_read, can_write)
 
                 if interval is not None:
                     interval = datetime.timedelta(seconds=interval)
@@ -393,7 +476,6 @@ def add_card(request, board_id, list_id):
         return HttpResponse('<h1>Access Denied</h1>')
 
 
-@process_plans
 @login_required
 def edit_card(request, board_id, card_id):
     try:
@@ -453,18 +535,7 @@ def edit_card(request, board_id, card_id):
                                        children=children_cards)
                     edited_card = MODEL.card_write(card_list, edited_card, request.user.id)
 
-                    if can_read:
-                        for user in can_read:
-                            MODEL.add_right(card_id, Card, user.id, AccessType.READ)
-                    if can_write:
-                        for user in can_write:
-                            MODEL.add_right(card_id, Card, user.id, AccessType.WRITE)
-
-                    for user in User.objects.all():
-                        if user not in can_read and can_read:
-                            MODEL.remove_right(card_id, Card, user.id, AccessType.READ)
-                        if user not in can_write and can_write:
-                            MODEL.remove_right(card_id, Card, user.id, AccessType.WRITE)
+                    _save_rights(Card, card_id, can_read, can_write)
 
                     if interval is not None:
                         interval = datetime.timedelta(seconds=interval)
@@ -490,15 +561,7 @@ def edit_card(request, board_id, card_id):
             else:
                 plan = None
 
-            can_write = []
-            can_read = []
-
-            for user in User.objects.all():
-                print(MODEL.get_right(card_id, Card, user.id))
-                if bool(MODEL.get_right(card_id, Card, user.id) & AccessType.READ):
-                    can_read.append(user)
-                if bool(MODEL.get_right(card_id, Card, user.id) & AccessType.WRITE):
-                    can_write.append(user)
+            can_read, can_write = _users_with_rights(Card, card_id)
 
             form = CardForm(request.user.id, board_id, initial={
                 'name': card.name,
@@ -519,7 +582,6 @@ def edit_card(request, board_id, card_id):
         return HttpResponse('<h1>Access Denied</h1>')
 
 
-@process_plans
 @login_required
 def add_tag(request, board_id):
     if request.method == 'POST':
@@ -537,7 +599,6 @@ def add_tag(request, board_id):
     return render(request, 'beb_manager/tags/add.html', {'form': form})
 
 
-@process_plans
 @login_required
 def edit_tag(request, tag_id, board_id):
     try:
@@ -561,8 +622,9 @@ def edit_tag(request, tag_id, board_id):
     return render(request, 'beb_manager/tags/edit.html', {'form': form})
 
 
-@process_plans
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_board_etag)
 def show_tag(request, tag_id, board_id):
     try:
         tag = MODEL.tag_read(tag_id)[0]
@@ -577,7 +639,6 @@ def show_tag(request, tag_id, board_id):
     return render(request, 'beb_manager/tags/show.html', {'board_id': board_id, 'tag': tag, 'cards': cards})
 
 
-@process_plans
 @login_required
 def assigned(request, board_id):
     try:
@@ -589,7 +650,6 @@ def assigned(request, board_id):
                   {'board_id': board_id, 'cards': cards, 'header_title': "Showing assigned cards"})
 
 
-@process_plans
 @login_required
 def owned(request, board_id):
     try:
@@ -51,6 +51,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'beb_manager.plans.PlanSchedulerMiddleware',
+    'beb_manager.model_registry.ReadMemoMiddleware',
 ]
 
 ROOT_URLCONF = 'web_app.urls'
@@ -84,7 +86,42 @@ DATABASES = {
     }
 }
 
-BEB_LIB_DATABASE_PATH = os.path.join(BASE_DIR, 'db.sqlite3')
+# Boards, lists and cards are kept apart from users and sessions, so that they don't wait for each other's writes.
+# Databases created before they were separated are split with `manage.py split_beb_database`
+BEB_LIB_DATABASE_PATH = os.path.join(BASE_DIR, 'beb_lib.sqlite3')
+
+# Open the beb_lib database when a WSGI worker starts instead of on its first request
+BEB_LIB_WARMUP = True
+
+# Make all writes to the beb_lib database on one thread that commits waiting writes together, instead of letting
+# request threads wait for each other's locks
+BEB_LIB_QUEUED_WRITES = False
+
+# Cards are created by recurring plans at most once per this number of seconds. Set BEB_PLAN_SCHEDULER_IN_WEB to False
+# when `manage.py run_plan_scheduler` does it instead of the web process
+BEB_PLAN_SCHEDULER_INTERVAL = 60
+BEB_PLAN_SCHEDULER_IN_WEB = True
+
+# The board page shows this number of cards per list, the rest are loaded by "Show more" button
+BEB_BOARD_PAGE_SIZE = 50
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+# Rendered lists and cards of the board page are kept in memory of the process
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'beb-manager-fragments',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+}
 
 
 # Password validation